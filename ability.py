@@ -1,3 +1,5 @@
+from effects import compile_pipeline
+
 class Ability:
     """
     Represents a special ability or spell that a character can use.
@@ -13,13 +15,25 @@ class Ability:
                        {'type': 'heal', 'amount': 30}
         :param status_effect: A dictionary describing a status effect to apply, e.g.,
                        {'type': 'poison', 'damage': 5, 'duration': 3}
-
+                       See effects.py for every effect type and option.
         """
         self.name = name
         self.description = description
         self.mana_cost = mana_cost
         self.effect = effect
         self.status_effect = status_effect
+        self.pipeline = compile_pipeline(effect, status_effect) # Compiled once, run on every cast
+        self.area = any(part.get('area') for part in (effect, status_effect) if part) # Hits every enemy
+
+    def cast(self, caster, targets, events):
+        """
+        Runs the ability's effects.
+        :param caster: The Combatant using the ability.
+        :param targets: A sequence of Combatants; single-target effects hit the first one.
+        :param events: The combat event list to append to.
+        """
+        for step in self.pipeline:
+            step(caster, targets, events)
 
 # --- Player-learnable Abilities ---
 heal_light = Ability("Heal Light", "A minor spell that restores a small amount of health.", mana_cost=8, effect={'type': 'heal', 'amount': 25})
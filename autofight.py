@@ -0,0 +1,135 @@
+"""
+Auto-resolved combat.
+
+auto_resolve() plays a whole fight through the combat rules in combat.py,
+choosing the player's action each round with a policy, and returns the final
+state with a summary instead of a stream of events. Nothing is printed, so a
+fight resolves in microseconds; the front end shows one summary at the end.
+
+auto_resolve_encounter() does the same for a group fight (see encounter.py),
+pointing the policy at one monster at a time.
+
+A policy is a function policy(player, monster) -> (action, spell index) over
+the combatants' Fighter snapshots. Policies are built by make_policy() from a
+few thresholds, and the named presets in POLICIES are what 'autofight'
+offers. New presets can be added to POLICIES.
+"""
+from collections import Counter
+
+import combat
+
+MAX_ROUNDS = 500 # A fight still going after this many rounds is abandoned
+
+
+def make_policy(heal_below=0.5, flee_below=0.0, cast_damage=True, stance='a', low_stance=None, low_health=0.3):
+    """
+    Builds a policy from simple heuristics.
+    :param heal_below: Cast the best affordable heal below this fraction of max HP.
+    :param flee_below: Try to flee below this fraction of max HP (0 never flees).
+    :param cast_damage: Cast the strongest affordable damage spell instead of attacking.
+    :param stance: The action otherwise taken: 'a', 'd' or 'p'.
+    :param low_stance: The action taken instead below low_health, if any.
+    :param low_health: The HP fraction under which low_stance applies.
+    """
+    def policy(player, monster):
+        health = player.health / player.max_health
+        if health < flee_below:
+            return 'f', None
+        best_heal = best_damage = None
+        for i, ability in enumerate(player.abilities):
+            if ability.effect is None or player.mana < ability.mana_cost:
+                continue
+            amount = ability.effect.get('amount', 0)
+            if ability.effect['type'] == 'heal':
+                if best_heal is None or amount > player.abilities[best_heal].effect['amount']:
+                    best_heal = i
+            elif best_damage is None or amount > player.abilities[best_damage].effect['amount']:
+                best_damage = i
+        if best_heal is not None and health < heal_below:
+            return 'c', best_heal
+        if low_stance and health < low_health:
+            return low_stance, None
+        if cast_damage and best_damage is not None:
+            return 'c', best_damage
+        return stance, None
+    return policy
+
+
+# Named policies offered by the 'autofight' command
+POLICIES = {
+    'balanced': make_policy(),
+    'aggressive': make_policy(heal_below=0.25),
+    'cautious': make_policy(heal_below=0.6, flee_below=0.2, low_stance='d'),
+    'parry': make_policy(cast_damage=False, stance='p'),
+    'melee': make_policy(heal_below=0.0, cast_damage=False),
+}
+
+
+def auto_resolve(player, monster, policy, rng, max_rounds=MAX_ROUNDS, ai_rng=None):
+    """
+    Fights until one side wins, the player flees, or max_rounds pass.
+    :param player: The player's Fighter snapshot.
+    :param monster: The monster's Fighter snapshot.
+    :param policy: A function (player, monster) -> (action, spell).
+    :param rng: The random number generator.
+    :param ai_rng: The generator for the monster's decisions; defaults to rng.
+    :return: A tuple of (CombatState, summary). The summary holds 'rounds',
+             'damage_dealt', 'damage_taken' and 'xp' (a Counter of skill -> XP).
+             The outcome is None if the fight was abandoned.
+    """
+    summary = {'rounds': 0, 'damage_dealt': 0, 'damage_taken': 0, 'xp': Counter()}
+    state = combat.CombatState(player, monster, None)
+    for rounds in range(1, max_rounds + 1):
+        action, spell = policy(state.player, state.monster)
+        state, events = combat.combat_round(state.player, state.monster, action, rng, spell, ai_rng)
+        _tally(events, summary)
+        if state.outcome:
+            break
+    summary['rounds'] = rounds
+    return state, summary
+
+
+def auto_resolve_encounter(encounter, target, policy, rng, max_rounds=MAX_ROUNDS, ai_rng=None):
+    """
+    Plays a group encounter until it is over, or until the player has taken
+    max_rounds turns. The policy is pointed at the target until it falls, then
+    at the next monster still standing.
+    :param encounter: The Encounter, which is played in place.
+    :param target: The index of the monster to fight first.
+    :param policy: A function (player, monster) -> (action, spell).
+    :param rng: The random number generator.
+    :param ai_rng: The generator for the monsters' decisions; defaults to rng.
+    :return: A summary like auto_resolve()'s, where 'rounds' counts the player's
+             turns, plus 'slain': the indexes of the monsters that fell, in order.
+    """
+    summary = {'rounds': 0, 'damage_dealt': 0, 'damage_taken': 0, 'xp': Counter(), 'slain': []}
+    while encounter.outcome is None and summary['rounds'] < max_rounds:
+        actor = encounter.next_actor()
+        if actor == combat.PLAYER:
+            summary['rounds'] += 1
+            if encounter.monsters[target].health <= 0:
+                target = encounter.living_monsters()[0] # Move on to the next foe
+            action, spell = policy(encounter.player, encounter.monsters[target])
+            events = encounter.player_turn(action, target, rng, spell)
+        else:
+            events = encounter.monster_turn(actor, rng, ai_rng)
+        _tally(events, summary)
+    return summary
+
+
+def _tally(events, summary):
+    """Adds a turn's damage, XP and kills to a summary."""
+    for event in events:
+        kind = event[0]
+        if kind == 'damage' or kind == 'effect_damage':
+            amount = event[-1]
+            if event[1] == combat.PLAYER:
+                summary['damage_taken'] += amount
+            else:
+                summary['damage_dealt'] += amount
+        elif kind == 'player_blocks':
+            summary['damage_taken'] += event[3]
+        elif kind == 'xp':
+            summary['xp'][event[1]] += event[2]
+        elif kind == 'slain':
+            summary['slain'].append(event[1])
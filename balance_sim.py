@@ -0,0 +1,210 @@
+"""
+Monte Carlo combat balance simulator.
+
+Runs many independent fights at once as NumPy array operations, following
+the rules in combat.combat_round() and the enemy weights in
+enemy_ai.decide_many(), for every monster in monster_mapping against a
+grid of player skill levels and gear. The simulated player takes the same
+stance every round (attack by default) and never casts or flees; use
+balance_sweep.py to sweep spells through the full combat engine.
+
+Example:
+
+    python balance_sim.py --fights 5000 --attack-levels 1 10 20 --weapons none "Iron Sword"
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+import combat
+from enemy_ai import decide_many
+from item import Weapon, Armor
+import world as world_module
+from world import monster_mapping
+
+MAX_ROUNDS = 200 # Fights still going after this many rounds count as losses
+
+
+def simulate(monster, player, fights, rng, action='a'):
+    """
+    Simulates a number of fights between a player and a monster.
+    :param monster: The monster's Fighter snapshot (see combat.monster_state()).
+    :param player: The player's Fighter snapshot (see combat.make_player()).
+    :param fights: How many independent fights to run.
+    :param rng: A numpy.random.Generator.
+    :param action: The player's stance every round: 'a', 'd' or 'p'.
+    :return: A dictionary with win_rate, mean_turns and mean_hp_lost.
+    """
+    n = fights
+    p_hp = np.full(n, player.health, dtype=np.int64)
+    m_hp = np.full(n, monster.health, dtype=np.int64)
+    m_mana = np.full(n, monster.mana, dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    won = np.zeros(n, dtype=bool)
+    active = np.ones(n, dtype=bool)
+
+    # Status effects from the monster's abilities, one array set per type: buffs
+    # stay on the monster (see effects.status_step), the rest go on the player.
+    abilities = list(monster.abilities)
+    status_types = {ab.status_effect['type'] for ab in abilities if ab.status_effect}
+    effect_types = sorted(t for t in status_types if not t.endswith('_buff'))
+    buff_types = sorted(t for t in status_types if t.endswith('_buff'))
+    effect_turns = {t: np.zeros(n, dtype=np.int64) for t in status_types}
+    effect_value = {t: np.zeros(n, dtype=np.int64) for t in status_types}
+    effect_stacks = {t: np.zeros(n, dtype=np.int64) for t in status_types}
+    costs = np.array([ab.mana_cost for ab in abilities], dtype=np.int64)
+
+    parry_block = min(0.4 + player.agility * 0.01, 0.8)
+
+    def modifier(stat, types=effect_types):
+        bonus = np.zeros(n, dtype=np.int64)
+        for t in types:
+            if t == stat + '_buff':
+                bonus += np.where(effect_turns[t] > 0, effect_value[t], 0)
+            elif t == stat + '_debuff':
+                bonus -= np.where(effect_turns[t] > 0, effect_value[t], 0)
+        return bonus
+
+    for _ in range(MAX_ROUNDS):
+        if not active.any():
+            break
+        turns += active
+
+        # --- Player's turn: status effects, then the chosen stance ---
+        stunned = np.zeros(n, dtype=bool)
+        for t in effect_types:
+            live = active & (effect_turns[t] > 0)
+            if t == 'poison':
+                p_hp -= np.where(live, effect_value[t], 0)
+            elif t == 'stun':
+                stunned |= live
+            effect_turns[t] -= live
+        active &= p_hp > 0
+        acting = active & ~stunned
+
+        # --- Monster's turn starts: its buffs tick down ---
+        for t in buff_types:
+            effect_turns[t] -= active & (effect_turns[t] > 0)
+
+        # --- Enemy decision ---
+        # A stunned player took no action for the enemy to respond to
+        monster_action = decide_many(m_hp, monster.max_health, np.where(acting, action, None), rng) # attack, defend, parry
+
+        p_attack = player.attack + modifier('attack')
+        p_defense = player.defense + modifier('defense')
+        m_defense = monster.defense + modifier('defense', buff_types)
+        enemy_damage = ((monster.attack + modifier('attack', buff_types)) * combat.ENEMY_ATTACK_PENALTY).astype(np.int64)
+
+        # --- The player's attack lands ---
+        if action == 'a':
+            damage = (p_attack * combat.PLAYER_ATTACK_BONUS).astype(np.int64)
+            dealt = np.select(
+                [monster_action == 1, monster_action == 2],
+                [damage - np.minimum(damage, m_defense), damage - (damage * combat.ENEMY_PARRY_BLOCK).astype(np.int64)],
+                np.maximum(1, damage - m_defense)
+            )
+            hits = acting & (dealt > 0)
+            m_hp -= np.where(hits, np.maximum(1, dealt - m_defense), 0)
+            killed = active & (m_hp <= 0)
+            won |= killed
+            active &= ~killed
+
+        # --- Monster's action: an ability half the time if one is affordable ---
+        use_ability = np.zeros(n, dtype=bool)
+        if abilities:
+            affordable = m_mana[:, None] >= costs[None, :]
+            counts = affordable.sum(axis=1)
+            use_ability = active & (counts > 0) & (rng.random(n) < combat.ABILITY_CHANCE)
+            pick = (rng.random(n) * counts).astype(np.int64)
+            chosen = np.argmax(np.cumsum(affordable, axis=1) > pick[:, None], axis=1)
+            for k, ability in enumerate(abilities):
+                rows = use_ability & (chosen == k)
+                if not rows.any():
+                    continue
+                m_mana -= np.where(rows, ability.mana_cost, 0)
+                effect = ability.effect
+                if effect and effect['type'] in ('damage', 'lifesteal'):
+                    taken = np.maximum(1, effect['amount'] - p_defense)
+                    p_hp -= np.where(rows, taken, 0)
+                    if effect['type'] == 'lifesteal':
+                        healed = (taken * effect.get('ratio', 0.5)).astype(np.int64)
+                        m_hp = np.where(rows, np.minimum(monster.max_health, m_hp + healed), m_hp)
+                elif effect and effect['type'] == 'heal':
+                    m_hp = np.where(rows, np.minimum(monster.max_health, m_hp + effect['amount']), m_hp)
+                if ability.status_effect:
+                    status = ability.status_effect
+                    t = status['type']
+                    value = status.get('damage', status.get('amount', 0))
+                    fresh = rows & (effect_turns[t] <= 0)
+                    stacking = rows & ~fresh & (effect_stacks[t] < status.get('max_stacks', 1))
+                    effect_value[t][fresh] = value
+                    effect_stacks[t][fresh] = 1
+                    effect_value[t][stacking] += value
+                    effect_stacks[t][stacking] += 1
+                    effect_turns[t][rows] = status['duration']
+
+        basic = active & ~use_ability & (monster_action == 0)
+        if action == 'p':
+            blocked = np.where(acting, (enemy_damage * parry_block).astype(np.int64), np.minimum(enemy_damage, p_defense))
+        else:
+            blocked = np.minimum(enemy_damage, p_defense)
+        p_hp -= np.where(basic, enemy_damage - blocked, 0)
+        if action == 'p':
+            counter = basic & acting & (rng.random(n) < combat.COUNTER_CHANCE)
+            m_hp -= np.where(counter, np.maximum(1, (p_attack * 0.5).astype(np.int64) - m_defense), 0)
+
+        active &= p_hp > 0
+        killed = active & (m_hp <= 0)
+        won |= killed
+        active &= ~killed
+
+    return {
+        "win_rate": float(won.mean()),
+        "mean_turns": float(turns.mean()),
+        "mean_hp_lost": float((player.health - np.maximum(p_hp, 0)).mean()),
+    }
+
+
+def world_gear(kind):
+    """Returns the items of a given class (Weapon or Armor) defined in world.py, by name."""
+    return {obj.name: obj for obj in vars(world_module).values() if isinstance(obj, kind)}
+
+
+def main():
+    weapons, armors = world_gear(Weapon), world_gear(Armor)
+    parser = argparse.ArgumentParser(description="Monte Carlo combat balance simulator.")
+    parser.add_argument("--fights", type=int, default=5000, help="Fights per monster and player setup.")
+    parser.add_argument("--monsters", nargs="*", default=list(monster_mapping), help="monster_mapping keys to simulate.")
+    parser.add_argument("--attack-levels", type=int, nargs="*", default=[1, 10, 20])
+    parser.add_argument("--defense-levels", type=int, nargs="*", default=[1, 10, 20])
+    parser.add_argument("--agility-levels", type=int, nargs="*", default=[1])
+    parser.add_argument("--weapons", nargs="*", default=["none"], help=f"'none' or any of: {', '.join(weapons)}")
+    parser.add_argument("--armors", nargs="*", default=["none"], help=f"'none' or any of: {', '.join(armors)}")
+    parser.add_argument("--action", choices=["a", "d", "p"], default="a", help="The player's stance every round.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    for option, names, known in (("--monsters", args.monsters, list(monster_mapping)),
+                                 ("--weapons", args.weapons, ["none", *weapons]), ("--armors", args.armors, ["none", *armors])):
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            parser.error(f"{option}: unknown {', '.join(unknown)}; choose from {', '.join(known)}")
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    print(f"{'Monster':<24}{'Atk':>4}{'Def':>4}{'Agi':>4}  {'Weapon':<16}{'Armor':<22}{'Win %':>7}{'Turns':>7}{'HP lost':>9}")
+    for name in args.monsters:
+        monster = combat.monster_state(monster_mapping[name]())
+        for attack, defense, agility, weapon, armor in itertools.product(
+                args.attack_levels, args.defense_levels, args.agility_levels, args.weapons, args.armors):
+            player = combat.make_player(attack, defense, agility,
+                                        weapon=weapons.get(weapon), armor=armors.get(armor))
+            result = simulate(monster, player, args.fights, rng, args.action)
+            print(f"{monster.name:<24}{attack:>4}{defense:>4}{agility:>4}  {weapon:<16}{armor:<22}"
+                  f"{result['win_rate']:>7.1%}{result['mean_turns']:>7.1f}{result['mean_hp_lost']:>9.1f}")
+    print(f"\nSimulated in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Process-pool combat balance sweep.
+
+Fights every monster class in monster.py against every combination of
+player skill level, weapon and armor from world.py, and spell from
+word_combinations, using the full combat engine (combat.combat_round()).
+Setups are sharded across a multiprocessing pool and every result row is
+streamed to a CSV file (one column per field) as soon as it is ready, so the
+sweep can be regression-checked after every content change:
+
+    python balance_sweep.py --fights 500 --levels 1 10 20 --output balance.csv
+
+Each setup draws from its own random generator, seeded from --seed and the
+setup's position in the sweep, so results do not depend on the number of
+workers or the order in which they finish.
+"""
+import argparse
+import csv
+import inspect
+import itertools
+import multiprocessing
+import os
+import random
+import time
+
+import combat
+from rng import derive_seed
+import monster as monster_module
+from item import Weapon, Armor
+import world as world_module
+from world import word_combinations
+
+MAX_ROUNDS = 200 # Fights still going after this many rounds count as losses
+COLUMNS = ["monster", "level", "weapon", "armor", "spell", "fights", "win_rate", "mean_turns", "mean_hp_lost", "mean_xp", "mean_loot_value"]
+
+
+def monster_classes():
+    """Returns every concrete monster class defined in monster.py, by class name."""
+    return {name: cls for name, cls in vars(monster_module).items()
+            if inspect.isclass(cls) and issubclass(cls, monster_module.Monster) and cls is not monster_module.Monster}
+
+
+def world_gear(kind):
+    """Returns the items of a given class (Weapon or Armor) defined in world.py, by name."""
+    return {obj.name: obj for obj in vars(world_module).values() if isinstance(obj, kind)}
+
+
+def spells():
+    """Returns the spells that can be bound from word_combinations, by name."""
+    return {ability.name: ability for ability in word_combinations.values()}
+
+
+def choose_action(player, ability):
+    """
+    The sweep's player policy: cast the swept spell whenever it is affordable
+    (healing only below half health), otherwise attack.
+    Returns (action, spell index).
+    """
+    if ability is not None and player.mana >= ability.mana_cost:
+        if not (ability.effect and ability.effect['type'] == 'heal') or player.health < player.max_health // 2:
+            return 'c', 0
+    return 'a', None
+
+
+def run_setup(job):
+    """
+    Runs all fights for one setup. Executed in the worker processes.
+    :param job: A tuple of (seed, monster class name, level, weapon name, armor name, spell name, fights).
+    :return: A result row as a list, in COLUMNS order.
+    """
+    seed, monster_name, level, weapon_name, armor_name, spell_name, fights = job
+    rng = random.Random(seed)
+    ability = spells().get(spell_name)
+    player = combat.make_player(level, level, level, level,
+                                weapon=world_gear(Weapon).get(weapon_name), armor=world_gear(Armor).get(armor_name),
+                                abilities=(ability,) if ability else ())
+    template = monster_classes()[monster_name]()
+    monster = combat.monster_state(template)
+
+    wins = turns = hp_lost = xp = 0
+    for _ in range(fights):
+        p, m = player, monster
+        for round_number in range(1, MAX_ROUNDS + 1):
+            action, spell = choose_action(p, ability)
+            state, events = combat.combat_round(p, m, action, rng, spell)
+            p, m = state.player, state.monster
+            xp += sum(event[2] for event in events if event[0] == 'xp')
+            if state.outcome:
+                break
+        wins += state.outcome == 'victory'
+        turns += round_number
+        hp_lost += player.health - max(p.health, 0)
+
+    # Loot for every win: the guaranteed drops plus a batch of weighted rolls
+    loot_value = wins * sum(item.value for item in template.loot_table)
+    if template.bonus_loot is not None:
+        loot_value += sum(item.value for drops in template.bonus_loot.roll_many(wins, rng) for item in drops)
+    return [monster.name, level, weapon_name, armor_name, spell_name, fights,
+            round(wins / fights, 4), round(turns / fights, 2), round(hp_lost / fights, 2), round(xp / fights, 1),
+            round(loot_value / fights, 1)]
+
+
+def build_jobs(args):
+    """Builds the list of sweep setups, each with its own seed."""
+    names = ["none"]
+    combos = itertools.product(
+        args.monsters or sorted(monster_classes()), args.levels,
+        names + sorted(world_gear(Weapon)), names + sorted(world_gear(Armor)), names + sorted(spells())
+    )
+    base = args.seed if args.seed is not None else random.SystemRandom().randrange(2**32)
+    return [(derive_seed(base, "sweep", index),) + combo + (args.fights,) for index, combo in enumerate(combos)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep combat balance across a process pool.")
+    parser.add_argument("--fights", type=int, default=200, help="Fights per setup.")
+    parser.add_argument("--levels", type=int, nargs="*", default=[1, 10, 20], help="Combat skill levels to sweep (Attack, Defense, Agility and Magic together).")
+    parser.add_argument("--monsters", nargs="*", help="Monster class names to sweep (default: all in monster.py).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    parser.add_argument("--seed", type=int, default=None, help="Base seed for reproducible sweeps.")
+    parser.add_argument("--output", default="balance_sweep.csv", help="CSV file to write.")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args)
+    started = time.perf_counter()
+    # Small chunks keep every worker busy; results are written in completion order.
+    chunksize = max(1, len(jobs) // (args.workers * 16))
+    with open(args.output, "w", newline="") as output, multiprocessing.Pool(args.workers) as pool:
+        writer = csv.writer(output)
+        writer.writerow(COLUMNS)
+        for done, row in enumerate(pool.imap_unordered(run_setup, jobs, chunksize=chunksize), 1):
+            writer.writerow(row)
+            if done % 100 == 0:
+                output.flush()
+                print(f"{done}/{len(jobs)} setups done")
+    print(f"Wrote {len(jobs)} setups to {args.output} in {time.perf_counter() - started:.1f}s using {args.workers} workers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Bank storage.
+
+A Bank is an Inventory that also indexes its stacks by category (weapons,
+materials, consumables and so on), so 'withdraw all materials' or 'bank
+weapons' only looks at the stacks in that category. Moving items between
+the bank and an inventory moves whole stacks at once: the cost depends on
+how many different items move, not how many copies.
+
+Banks are saved as a single {item name: count} mapping, which keeps even a
+large bank to one short line per item in the save file.
+"""
+from inventory import Inventory
+from item import Weapon, Armor, Consumable, Spellbook, RecipeScroll, Key, Word
+from crafting import recipe_book
+from names import normalize
+
+# Categories, in the order the bank shows them
+CATEGORIES = ("Weapons", "Armor", "Tools", "Consumables", "Materials", "Scrolls", "Words", "Keys", "Quest Items", "Other")
+
+# What players may type for each category, besides its name
+_CATEGORY_ALIASES = {
+    "armour": "Armor", "potions": "Consumables", "food": "Consumables",
+    "ores": "Materials", "quest": "Quest Items", "spellbooks": "Scrolls", "recipes": "Scrolls",
+}
+_category_words = dict(_CATEGORY_ALIASES)
+for _category in CATEGORIES:
+    _category_words[normalize(_category)] = _category
+for _word, _category in list(_category_words.items()):
+    _category_words.setdefault(_word.rstrip("s"), _category) # 'weapon' as well as 'weapons'
+
+
+def find_category(query):
+    """Returns the category a player typed, or None."""
+    return _category_words.get(normalize(query))
+
+
+def category_of(item):
+    """Returns the bank category of an item."""
+    if item.quest_item:
+        return "Quest Items"
+    if isinstance(item, Weapon):
+        return "Weapons"
+    if isinstance(item, Armor):
+        return "Armor"
+    if any(node.required_tool == item.name for nodes in recipe_book.sources.values() for node in nodes):
+        return "Tools"
+    if isinstance(item, Consumable):
+        return "Consumables"
+    if isinstance(item, (Spellbook, RecipeScroll)):
+        return "Scrolls"
+    if isinstance(item, Word):
+        return "Words"
+    if isinstance(item, Key):
+        return "Keys"
+    if item.name in recipe_book.by_ingredient or item.name in recipe_book.sources:
+        return "Materials"
+    return "Other"
+
+
+def transfer(source, destination, name, count):
+    """
+    Moves up to `count` of an item from one inventory to another as one stack.
+    :return: A tuple of (the item or None, how many moved).
+    """
+    item, moved = source.take(name, count)
+    if moved:
+        destination.add(item, moved)
+    return item, moved
+
+
+class Bank(Inventory):
+    """
+    An inventory indexed by category, for the player's bank.
+    """
+    __slots__ = ('_categories', '_category_of')
+
+    def __init__(self, items=()):
+        self._categories = {category: {} for category in CATEGORIES} # category -> item names, in order
+        self._category_of = {} # item name -> category
+        super().__init__(items)
+
+    def add(self, item, count=1):
+        if count > 0 and item.name not in self._stacks:
+            category = self._category_of[item.name] = category_of(item)
+            self._categories[category][item.name] = None
+        super().add(item, count)
+
+    def remove(self, item, count=1):
+        item = super().remove(item, count)
+        if item.name not in self._stacks:
+            del self._categories[self._category_of.pop(item.name)][item.name]
+        return item
+
+    def clear(self):
+        super().clear()
+        self._category_of.clear()
+        for names in self._categories.values():
+            names.clear()
+
+    def in_category(self, category):
+        """Returns the (item, count) stacks in a category."""
+        return [tuple(self._stacks[name]) for name in self._categories[category]]
+
+    def by_category(self):
+        """Returns a list of (category, stacks) for every category that has any."""
+        return [(category, self.in_category(category)) for category in CATEGORIES if self._categories[category]]
+
+    def search(self, query):
+        """Returns the (item, count) stacks whose names contain every word of a query."""
+        words = normalize(query).split()
+        return [(item, count) for item, count in self._stacks.values()
+                if all(word in normalize(item.name) for word in words)]
+
+    def to_saved(self):
+        """Returns the bank as an {item name: count} mapping."""
+        return {item.name: count for item, count in self._stacks.values()}
@@ -1,9 +1,19 @@
 import random
+from record import Record
 
-class Character:
+class Character(Record):
     """
     A base class for any character in the game (Player, Monster).
     """
+    __slots__ = ('name', 'description', 'max_health', 'health', 'money', 'base_attack', 'base_defense',
+                 'max_mana', 'mana', 'abilities', 'status_effects', 'loot_table',
+                 '_attack_modifier', '_defense_modifier')
+
+    # The modifier totals are derived from status_effects and rebuilt on load.
+    _record_exclude = ('_attack_modifier', '_defense_modifier')
+
+    bonus_loot = None # A weighted.LootTable rolled on top of loot_table, set per class
+
     def __init__(self, name, health, attack_power, defense, description=""):
         self.name = name
         self.description = description
@@ -15,32 +25,51 @@ class Character:
         self.max_mana = 20
         self.mana = self.max_mana
         self.abilities = []
-        self.status_effects = []
+        self.status_effects = {} # Effect type -> effect dictionary; one effect per type
         self.loot_table = []
+        self._attack_modifier = 0
+        self._defense_modifier = 0
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds a character from a saved record, restoring its status effect totals."""
+        character = super().from_record(record)
+        effects = getattr(character, 'status_effects', {})
+        if isinstance(effects, list): # Older saves kept effects in a list
+            effects = {effect['type']: effect for effect in effects}
+        character.set_status_effects(effects.values())
+        return character
 
     @property
     def attack_power(self):
         """Returns the character's total attack power."""
-        bonus = 0
-        # Check for attack buff status effect
-        for effect in self.status_effects:
-            if effect.get('type') == 'attack_buff':
-                bonus += effect.get('amount', 0)
-            elif effect.get('type') == 'attack_debuff':
-                bonus -= effect.get('amount', 0)
-        return self.base_attack + bonus
+        return self.base_attack + self._attack_modifier
 
     @property
     def defense(self):
         """Returns the character's total defense."""
-        bonus = 0
-        # Check for defense buff status effect
-        for effect in self.status_effects:
-            if effect.get('type') == 'defense_buff':
-                bonus += effect.get('amount', 0)
-            elif effect.get('type') == 'defense_debuff':
-                bonus -= effect.get('amount', 0)
-        return self.base_defense + bonus
+        return self.base_defense + self._defense_modifier
+
+    def set_status_effects(self, effects):
+        """
+        Replaces all status effects with the given effect dictionaries and
+        recomputes the attack and defense totals. Effects are added, refreshed
+        and expired by the combat rules (effects.py), which write the result
+        back through here.
+        """
+        self.status_effects = {effect['type']: effect for effect in effects}
+        attack = defense = 0
+        for effect_type, effect in self.status_effects.items():
+            if effect_type == 'attack_buff':
+                attack += effect.get('amount', 0)
+            elif effect_type == 'attack_debuff':
+                attack -= effect.get('amount', 0)
+            elif effect_type == 'defense_buff':
+                defense += effect.get('amount', 0)
+            elif effect_type == 'defense_debuff':
+                defense -= effect.get('amount', 0)
+        self._attack_modifier = attack
+        self._defense_modifier = defense
         
     def is_alive(self):
         """Check if the character is still alive."""
@@ -58,67 +87,13 @@ class Character:
         self.mana += amount_to_restore
         return amount_to_restore
 
-    def add_status_effect(self, effect_data):
-        """Adds a new status effect to the character."""
-        # Check if a similar, non-stackable effect is already active
-        for existing_effect in self.status_effects:
-            if existing_effect['type'] == effect_data['type']:
-                # Refresh the duration of the existing effect instead of stacking
-                existing_effect['turns_left'] = effect_data['duration']
-                print(f"The {effect_data['type']} on {self.name} has been refreshed.")
-                return
-
-        new_effect = effect_data.copy()
-        new_effect['turns_left'] = new_effect.pop('duration')
-        self.status_effects.append(new_effect)
-        print(f"{self.name} is now afflicted with {new_effect['type']}!")
-
-    def process_turn_effects(self):
-        """
-        Processes all active status effects at the start of a turn.
-        Returns True if the character is stunned, False otherwise.
-        """
-        is_stunned = False
-        effects_to_remove = []
-
-        for effect in self.status_effects:
-            effect_type = effect.get('type')
-            if effect_type == 'poison':
-                damage = effect.get('damage', 0)
-                self.take_damage(damage, bypass_defense=True)
-                print(f"{self.name} takes {damage} damage from poison!")
-                if not self.is_alive(): break
-            
-            if effect_type == 'stun':
-                is_stunned = True
-                print(f"{self.name} is stunned and cannot act!")
-            
-            if effect_type == 'defense_buff':
-                print(f"{self.name}'s defenses are bolstered by a magical effect.")
-
-            if effect_type == 'attack_buff':
-                print(f"{self.name} feels a surge of strength!")
-
-            effect['turns_left'] -= 1
-            if effect['turns_left'] <= 0:
-                effects_to_remove.append(effect)
-                if effect_type == 'defense_buff':
-                    print(f"The magical defense around {self.name} fades.")
-                elif effect_type == 'attack_buff':
-                    print(f"The surge of strength in {self.name} fades.")
-                else:
-                    print(f"{self.name} is no longer afflicted with {effect['type']}.")
-
-        self.status_effects = [eff for eff in self.status_effects if eff not in effects_to_remove]
-        return is_stunned
-
     def get_status_effects_string(self):
         """Returns a formatted string of active status effects."""
         if not self.status_effects:
             return "None"
         
         effect_strings = []
-        for effect in self.status_effects:
+        for effect in self.status_effects.values():
             effect_type = effect.get('type', 'Unknown').replace('_', ' ').title()
             turns_left = effect.get('turns_left', '?')
             
@@ -150,7 +125,13 @@ class Character:
         print(f"{self.name} attacks {target.name}!")
         target.take_damage(self.attack_power)
 
-    def drop_loot(self):
-        """Determines and returns loot dropped by the character upon defeat."""
-        # For now, we'll assume a 100% drop rate for all items in the loot table.
-        return self.loot_table
+    def drop_loot(self, rng=random):
+        """
+        Determines and returns loot dropped by the character upon defeat.
+        Everything in loot_table always drops; the class's weighted
+        bonus_loot table (if any) is rolled on top.
+        """
+        loot = list(self.loot_table)
+        if self.bonus_loot is not None:
+            loot.extend(self.bonus_loot.roll(rng))
+        return loot
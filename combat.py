@@ -0,0 +1,396 @@
+"""
+The combat rules, as a pure function of the combatants' state.
+
+combat_round() takes a snapshot of the player and the monster, the player's
+chosen action and a random number generator, and returns the new snapshots
+along with a list of events describing what happened. It never prints, asks
+for input or touches game objects, so the same rules drive the text game,
+the GUI and headless balance tools. Front ends convert objects to snapshots
+with player_state()/monster_state(), write results back with apply_state(),
+grant ('xp', skill, amount) events, and turn events into text with describe().
+
+Events are tuples whose first element is the event kind:
+    ('turn', side)                          a side's turn begins
+    ('effect_damage', side, type, amount)   a status effect hurts a side
+    ('effect_active', side, type)           a lasting buff is in effect
+    ('stunned', side)                       a side loses its action
+    ('effect_ends', side, type)             a status effect wears off
+    ('effect_applied', side, type)          a new status effect takes hold
+    ('effect_refreshed', side, type)        an existing status effect is renewed
+    ('effect_stacked', side, type, stacks)  a stacking status effect grows stronger
+    ('attack',) ('defend',) ('parry',)      the player's chosen stance
+    ('cast', ability_name) ('no_mana',)     the player casts, or fails to
+    ('flee_chance', chance) ('fled',) ('flee_failed',)
+    ('hesitate',)                           an unknown action wastes the turn
+    ('enemy_considers', weights)            the enemy's action weights
+    ('enemy_blocks', stance, blocked)       the monster defends or parries
+    ('player_hits',)                        the player's attack lands cleanly
+    ('damage', side, amount)                a side takes mitigated damage
+    ('heal', side, amount)                  a side is healed
+    ('enemy_ability', ability_name)         the monster uses an ability
+    ('enemy_attack', potential)             the monster attacks
+    ('player_blocks', how, blocked, taken)  how is 'defend', 'parry' or 'armor'
+    ('counter', amount)                     the player counter-attacks
+    ('enemy_stance', stance)                the monster defends or parries
+    ('xp', skill, amount)                   the player earns skill XP
+    ('victory',) ('defeat',)                the fight is over
+
+Abilities run through their compiled effect pipelines (see effects.py).
+"""
+from collections import namedtuple
+
+from effects import Combatant, effect_from_dict, mitigate, modifier
+from enemy_ai import enemy_decision
+
+PLAYER = 'player'
+MONSTER = 'monster'
+
+# attack and defense are the combatant's own values including gear, but not
+# status effects, which are applied by the rules as the fight goes on.
+Fighter = namedtuple('Fighter', ['name', 'health', 'max_health', 'mana', 'attack', 'defense',
+                                 'effects', 'abilities', 'agility', 'xp_yield'], defaults=(0, 0))
+CombatState = namedtuple('CombatState', ['player', 'monster', 'outcome'])
+
+PLAYER_ATTACK_BONUS = 1.1  # Player attacks do 10% more damage
+ENEMY_ATTACK_PENALTY = 0.9 # Enemies do 10% less damage
+ENEMY_PARRY_BLOCK = 0.5    # An enemy parry blocks half of the player's attack
+COUNTER_CHANCE = 0.25      # Chance for the player to counter after a parry
+ABILITY_CHANCE = 0.5       # Chance for a monster to use an affordable ability
+
+
+def player_state(player):
+    """Takes a snapshot of a Player for the combat rules."""
+    return Fighter(
+        player.name, player.health, player.max_health, player.mana,
+        player.base_attack + (player.weapon.attack_bonus if player.weapon else 0),
+        player.base_defense + (player.armor.defense_bonus if player.armor else 0),
+        tuple(effect_from_dict(effect) for effect in player.status_effects.values()),
+        tuple(player.abilities), player.skills["Agility"].level
+    )
+
+
+def monster_state(monster):
+    """Takes a snapshot of a Monster for the combat rules."""
+    return Fighter(
+        monster.name, monster.health, monster.max_health, monster.mana,
+        monster.base_attack, monster.base_defense,
+        tuple(effect_from_dict(effect) for effect in monster.status_effects.values()),
+        tuple(monster.abilities), 0, monster.xp_yield
+    )
+
+
+def make_player(attack_level=1, defense_level=1, agility_level=1, magic_level=1, weapon=None, armor=None, abilities=(), name="Adventurer"):
+    """
+    Builds a full-health player snapshot from skill levels and gear, for
+    headless fights. Uses a new Player's starting stats plus the per-level
+    bonuses in skill.LEVEL_UP_EFFECTS.
+    """
+    max_health = 100 + 10 * (defense_level - 1)
+    return Fighter(
+        name, max_health, max_health, 20 + 10 * (magic_level - 1),
+        10 + (attack_level - 1) + (weapon.attack_bonus if weapon else 0),
+        5 + (defense_level - 1) + (armor.defense_bonus if armor else 0),
+        (), tuple(abilities), agility_level
+    )
+
+
+def apply_state(character, fighter):
+    """Writes a combat snapshot's health, mana and status effects back to a character."""
+    character.health = fighter.health
+    character.mana = fighter.mana
+    character.set_status_effects(_effect_to_dict(effect) for effect in fighter.effects)
+
+
+def _effect_to_dict(effect):
+    return {key: value for key, value in effect._asdict().items() if value is not None}
+
+
+def is_stunned(fighter):
+    """Returns True if the fighter will lose its next action to a stun."""
+    return any(effect.type == 'stun' for effect in fighter.effects)
+
+
+def tick_effects(health, effects, side, events):
+    """Runs start-of-turn status effects. Returns (health, effects, stunned)."""
+    stunned = False
+    remaining = []
+    for i, effect in enumerate(effects):
+        if effect.type == 'poison':
+            health -= effect.damage or 0
+            events.append(('effect_damage', side, 'poison', effect.damage or 0))
+            if health <= 0:
+                remaining.extend(effects[i:])
+                break
+        if effect.type == 'stun':
+            stunned = True
+            events.append(('stunned', side))
+        elif effect.type in ('defense_buff', 'attack_buff'):
+            events.append(('effect_active', side, effect.type))
+        if effect.turns_left > 1:
+            remaining.append(effect._replace(turns_left=effect.turns_left - 1))
+        else:
+            events.append(('effect_ends', side, effect.type))
+    return health, tuple(remaining), stunned
+
+
+def flee_chance(player, monster):
+    """Returns the player's chance to escape, from Agility against the monster's attack."""
+    monster_attack = monster.attack + modifier(monster.effects, 'attack')
+    level_difference = player.agility - (monster_attack / 4) # A higher level or lower monster attack helps
+    return max(0.1, min(0.5 + level_difference * 0.05, 0.9)) # Base 50%, clamped to 10%-90%
+
+
+def player_strike(attack, defense, stance, side, events):
+    """
+    Resolves the player's weapon attack against a monster's stance.
+    :param attack: The player's attack, including status effects.
+    :param defense: The monster's defense, including status effects.
+    :param stance: The monster's current action: 'attack', 'defend' or 'parry'.
+    :param side: The side to report the damage against.
+    :return: The damage the monster takes.
+    """
+    player_damage = int(attack * PLAYER_ATTACK_BONUS)
+    if stance == 'defend':
+        blocked = min(player_damage, defense)
+        dealt = player_damage - blocked
+        events.append(('enemy_blocks', 'defend', blocked))
+    elif stance == 'parry':
+        blocked = int(player_damage * ENEMY_PARRY_BLOCK)
+        dealt = player_damage - blocked
+        events.append(('enemy_blocks', 'parry', blocked))
+    else:
+        dealt = mitigate(player_damage, defense)
+        events.append(('player_hits',))
+    if dealt <= 0:
+        return 0
+    taken = mitigate(dealt, defense)
+    events.append(('damage', side, taken))
+    events.append(('xp', 'Attack', dealt))
+    return taken
+
+
+def enemy_strike(attack, defense, player_action, agility, events):
+    """
+    Resolves a monster's basic attack against the player's stance.
+    :param attack: The monster's attack, including status effects.
+    :param defense: The player's defense, including status effects.
+    :param player_action: The player's current action ('d' and 'p' block more).
+    :param agility: The player's Agility level, which improves parrying.
+    :return: The damage the player takes.
+    """
+    enemy_damage = int(attack * ENEMY_ATTACK_PENALTY)
+    events.append(('enemy_attack', enemy_damage))
+    if player_action == 'd':
+        blocked = min(enemy_damage, defense)
+        events.append(('player_blocks', 'defend', blocked, enemy_damage - blocked))
+    elif player_action == 'p':
+        block_percentage = min(0.4 + agility * 0.01, 0.8) # Cap parry at 80%
+        blocked = int(enemy_damage * block_percentage)
+        events.append(('player_blocks', 'parry', blocked, enemy_damage - blocked))
+    else:
+        blocked = min(enemy_damage, defense)
+        events.append(('player_blocks', 'armor', blocked, enemy_damage - blocked))
+    events.append(('xp', 'Defense', blocked))
+    return enemy_damage - blocked
+
+
+def counter_strike(attack, defense, side, events):
+    """Resolves the player's counter-attack after a successful parry. Returns the damage dealt."""
+    counter = int(attack * 0.5)
+    events.append(('counter', counter))
+    taken = mitigate(counter, defense)
+    events.append(('damage', side, taken))
+    events.append(('xp', 'Attack', counter))
+    return taken
+
+
+def combat_round(player, monster, action, rng, spell=None, ai_rng=None):
+    """
+    Resolves one round of combat.
+    :param player: The player's Fighter snapshot.
+    :param monster: The monster's Fighter snapshot.
+    :param action: 'a' (attack), 'd' (defend), 'p' (parry), 'c' (cast), 'f' (flee), or None to pass.
+                   Ignored if the player is stunned.
+    :param rng: A random.Random instance (or the random module) used for every roll.
+    :param ai_rng: The generator for the monster's decisions; defaults to rng.
+    :param spell: For 'c', the index of the ability in player.abilities.
+    :return: A tuple of (CombatState, list of events).
+    """
+    if ai_rng is None:
+        ai_rng = rng
+    events = [('turn', PLAYER)]
+    p_health, p_effects, p_stunned = tick_effects(player.health, player.effects, PLAYER, events)
+    p_mana = player.mana
+    m_health, m_mana, m_effects = monster.health, monster.mana, monster.effects
+
+    def finish(outcome):
+        new_player = player._replace(health=p_health, mana=p_mana, effects=p_effects)
+        new_monster = monster._replace(health=m_health, mana=m_mana, effects=m_effects)
+        if outcome == 'victory':
+            events.append(('victory',))
+            events.append(('xp', 'Attack', monster.xp_yield // 2))
+            events.append(('xp', 'Defense', monster.xp_yield // 2))
+        elif outcome == 'defeat':
+            events.append(('defeat',))
+        return CombatState(new_player, new_monster, outcome), events
+
+    if p_health <= 0:
+        return finish('defeat')
+
+    # --- Player's action ---
+    player_action = None if p_stunned else action
+    if player_action == 'a':
+        events.append(('attack',))
+    elif player_action == 'd':
+        events.append(('defend',))
+    elif player_action == 'p':
+        events.append(('parry',))
+        events.append(('xp', 'Attack', 2)) # Minor XP for attempting a parry
+    elif player_action == 'c':
+        if spell is not None and 0 <= spell < len(player.abilities):
+            ability = player.abilities[spell]
+            if p_mana >= ability.mana_cost:
+                p_mana -= ability.mana_cost
+                events.append(('cast', ability.name))
+                if ability.effect:
+                    events.append(('xp', 'Magic', 5))
+                caster = Combatant(PLAYER, p_health, player.max_health, player.defense, p_effects)
+                target = Combatant(MONSTER, m_health, monster.max_health, monster.defense, m_effects)
+                ability.cast(caster, (target,), events)
+                p_health, p_effects = caster.health, caster.effects
+                m_health, m_effects = target.health, target.effects
+            else:
+                events.append(('no_mana',))
+    elif player_action == 'f':
+        chance = flee_chance(player._replace(effects=p_effects), monster)
+        events.append(('flee_chance', chance))
+        if rng.random() < chance:
+            events.append(('fled',))
+            return finish('fled')
+        events.append(('flee_failed',))
+    elif player_action is not None:
+        events.append(('hesitate',))
+
+    if m_health <= 0:
+        return finish('victory')
+
+    # --- Monster's turn ---
+    events.append(('turn', MONSTER))
+    m_health, m_effects, m_stunned = tick_effects(m_health, m_effects, MONSTER, events)
+    if m_health <= 0:
+        return finish('victory')
+
+    monster_action, weights = enemy_decision(m_health, monster.max_health, player_action, ai_rng)
+    events.append(('enemy_considers', weights))
+    m_defense = monster.defense + modifier(m_effects, 'defense')
+    p_attack = player.attack + modifier(p_effects, 'attack')
+
+    # The player's attack lands once the monster has chosen how to meet it.
+    if player_action == 'a':
+        m_health -= player_strike(p_attack, m_defense, monster_action, MONSTER, events)
+        if m_health <= 0:
+            return finish('victory')
+
+    if not m_stunned:
+        p_defense = player.defense + modifier(p_effects, 'defense')
+        affordable = [ability for ability in monster.abilities if m_mana >= ability.mana_cost]
+        if affordable and ai_rng.random() < ABILITY_CHANCE:
+            ability = ai_rng.choice(affordable)
+            m_mana -= ability.mana_cost
+            events.append(('enemy_ability', ability.name))
+            caster = Combatant(MONSTER, m_health, monster.max_health, monster.defense, m_effects)
+            target = Combatant(PLAYER, p_health, player.max_health, player.defense, p_effects)
+            ability.cast(caster, (target,), events)
+            m_health, m_effects = caster.health, caster.effects
+            p_health, p_effects = target.health, target.effects
+        elif monster_action == 'attack':
+            p_health -= enemy_strike(monster.attack + modifier(m_effects, 'attack'), p_defense, player_action, player.agility, events)
+            if player_action == 'p' and rng.random() < COUNTER_CHANCE:
+                m_health -= counter_strike(p_attack, m_defense, MONSTER, events)
+        elif monster_action in ('defend', 'parry'):
+            events.append(('enemy_stance', monster_action))
+
+    if p_health <= 0:
+        return finish('defeat')
+    if m_health <= 0:
+        return finish('victory')
+    return finish(None)
+
+
+def describe(event, player_name, monster_name):
+    """Returns the text shown to the player for an event, or None if it has none."""
+    kind = event[0]
+    if kind in ('turn', 'effect_damage', 'effect_active', 'stunned', 'effect_ends',
+                'effect_applied', 'effect_refreshed', 'effect_stacked', 'damage'):
+        name = player_name if event[1] == PLAYER else monster_name
+    if kind == 'turn':
+        return "\n" + "=" * 15 + " Your Turn " + "=" * 15 if event[1] == PLAYER else "\n" + "=" * 14 + " Enemy Turn " + "=" * 14
+    if kind == 'effect_damage':
+        return f"{name} takes {event[3]} damage from {event[2]}!"
+    if kind == 'effect_active':
+        if event[2] == 'defense_buff':
+            return f"{name}'s defenses are bolstered by a magical effect."
+        return f"{name} feels a surge of strength!"
+    if kind == 'stunned':
+        return f"{name} is stunned and cannot act!"
+    if kind == 'effect_ends':
+        if event[2] == 'defense_buff':
+            return f"The magical defense around {name} fades."
+        if event[2] == 'attack_buff':
+            return f"The surge of strength in {name} fades."
+        return f"{name} is no longer afflicted with {event[2]}."
+    if kind == 'effect_applied':
+        return f"{name} is now afflicted with {event[2]}!"
+    if kind == 'effect_refreshed':
+        return f"The {event[2]} on {name} has been refreshed."
+    if kind == 'effect_stacked':
+        return f"The {event[2]} on {name} grows stronger ({event[3]} stacks)!"
+    if kind == 'damage':
+        return f"{name} takes {event[2]} damage!"
+    if kind == 'attack':
+        return f"You attack the {monster_name}!"
+    if kind == 'defend':
+        return "You brace yourself for an attack, focusing on defense."
+    if kind == 'parry':
+        return "You take a ready stance, preparing to parry the next blow."
+    if kind == 'cast':
+        return f"You cast {event[1]}!"
+    if kind == 'no_mana':
+        return "Not enough mana!"
+    if kind == 'flee_chance':
+        return f"(Your chance to flee is {int(event[1] * 100)}%)"
+    if kind == 'fled':
+        return "You successfully escape from the battle!"
+    if kind == 'flee_failed':
+        return "You failed to escape!"
+    if kind == 'hesitate':
+        return "Invalid action. You hesitate and do nothing."
+    if kind == 'enemy_considers':
+        return f"({monster_name} considers its options: {event[1]})"
+    if kind == 'enemy_blocks':
+        verb = "defends" if event[1] == 'defend' else "parries"
+        return f"{monster_name} {verb}, blocking {event[2]} damage!"
+    if kind == 'player_hits':
+        return "Your attack hits!"
+    if kind == 'enemy_ability':
+        return f"The {monster_name} uses {event[1]}!"
+    if kind == 'enemy_attack':
+        return f"The {monster_name} attacks you for {event[1]} potential damage!"
+    if kind == 'player_blocks':
+        _, how, blocked, taken = event
+        if how == 'defend':
+            return f"You defend, blocking {blocked} damage and taking {taken} damage."
+        if how == 'parry':
+            return f"You parry, blocking {blocked} damage and taking {taken} damage."
+        return f"Your armor mitigates {blocked} damage. You take {taken} damage."
+    if kind == 'counter':
+        return f"You seize an opening and counter-attack for {event[1]} damage!"
+    if kind == 'enemy_stance':
+        if event[1] == 'defend':
+            return f"{monster_name} takes a defensive stance, preparing for your next move."
+        return f"{monster_name} readies itself to parry an attack."
+    if kind == 'victory':
+        return f"\nYou have defeated the {monster_name}!"
+    if kind == 'defeat':
+        return "\nYou have been defeated. Game Over."
+    return None
@@ -1,11 +1,19 @@
-import random
 import sys
 
 from item import Item, Weapon, Armor, Consumable, Spellbook, RecipeScroll, Key
 from npc import QuestGiver, Shopkeeper, Banker, Guard, ProceduralQuestGiver
 from monster import Mimic
-from world import cooking_recipes, herblore_recipes, smelting_recipes, word_combinations
+from world import word_combinations
+import crafting
+from planner import crafting_planner
 from ui import print_bordered
+from rng import random_streams, THIEVING
+from commands import command_registry, split_quantity
+from names import find_by_name, AMBIGUOUS
+from bank import Bank, find_category, category_of, transfer
+from economy import regional_economy
+
+thieving_random = random_streams.get(THIEVING) # This module's random stream
 
 
 def handle_movement(player, direction, context):
@@ -20,7 +28,7 @@ def handle_movement(player, direction, context):
 
         if isinstance(destination, dict) and destination.get('locked'):
             key_id = destination.get('key_id')
-            key_in_inventory = next((item for item in player.inventory if isinstance(item, Key) and item.unlocks_what == key_id), None)
+            key_in_inventory = next((item for item in player.inventory.unique_items() if isinstance(item, Key) and item.unlocks_what == key_id), None)
             
             if key_in_inventory:
                 print(f"You use the {key_in_inventory.name} to unlock the door.")
@@ -65,8 +73,10 @@ def handle_take_item(player, item_name, context):
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
     items_in_room = current_location.get("items", [])
     
-    item_to_take = next((item for item in items_in_room if item_name.lower() in item.name.lower()), None)
-    
+    item_to_take = find_by_name(items_in_room, item_name)
+    if item_to_take is AMBIGUOUS:
+        return
+
     if item_to_take:
         player.inventory.append(item_to_take)
         items_in_room.remove(item_to_take)
@@ -79,7 +89,9 @@ def handle_take_item(player, item_name, context):
 
 def handle_drop_item(player, item_name, context):
     """Handles the player dropping an item from their inventory."""
-    item_to_drop = next((item for item in player.inventory if item_name.lower() in item.name.lower()), None)
+    item_to_drop = find_by_name(player.inventory, item_name)
+    if item_to_drop is AMBIGUOUS:
+        return
 
     if not item_to_drop:
         print(f"You don't have a '{item_name}' in your inventory.")
@@ -95,12 +107,14 @@ def handle_inventory(player):
     if not player.inventory:
         content = ["Your inventory is empty."]
     else:
-        content = [f"- A {item.name}" for item in player.inventory]
+        content = [f"- A {item.name}" if count == 1 else f"- {count}x {item.name}" for item, count in player.inventory.stacks()]
     print_bordered("Inventory", content)
 
 def handle_look_at(player, target_name, context):
     """Handles the player looking at an item or detail."""
-    item_in_inventory = next((item for item in player.inventory if target_name.lower() in item.name.lower()), None)
+    item_in_inventory = find_by_name(player.inventory, target_name)
+    if item_in_inventory is AMBIGUOUS:
+        return
     if item_in_inventory:
         print(item_in_inventory.description)
         for quest in player.active_quests:
@@ -109,7 +123,9 @@ def handle_look_at(player, target_name, context):
 
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
     items_in_room = current_location.get("items", [])
-    item_in_room = next((item for item in items_in_room if target_name.lower() in item.name.lower()), None)
+    item_in_room = find_by_name(items_in_room, target_name)
+    if item_in_room is AMBIGUOUS:
+        return
     if item_in_room:
         print(item_in_room.description)
         for quest in player.active_quests:
@@ -117,13 +133,17 @@ def handle_look_at(player, target_name, context):
         return
 
     npcs_in_room = current_location.get("npcs", [])
-    npc_in_room = next((npc for npc in npcs_in_room if target_name.lower() in npc.name.lower()), None)
+    npc_in_room = find_by_name(npcs_in_room, target_name)
+    if npc_in_room is AMBIGUOUS:
+        return
     if npc_in_room:
         print(npc_in_room.description)
         return
 
     monsters_in_room = current_location.get("monsters", [])
-    monster_in_room = next((monster for monster in monsters_in_room if target_name.lower() in monster.name.lower()), None)
+    monster_in_room = find_by_name(monsters_in_room, target_name)
+    if monster_in_room is AMBIGUOUS:
+        return
     if monster_in_room:
         print(monster_in_room.description)
         return
@@ -134,12 +154,11 @@ def handle_talk_to(player, npc_name, context):
     """Handles the player talking to an NPC."""
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
     game_state = context['game_state']
-    if game_state['time_of_day'] == "Night":
-        npcs_in_room = current_location.get("npcs", []) + current_location.get("night_npcs", [])
-    else:
-        npcs_in_room = current_location.get("npcs", [])
-
-    target_npc = next((npc for npc in npcs_in_room if npc_name.lower() in npc.name.lower()), None)
+    target_npc = find_by_name(current_location.get("npcs", []), npc_name)
+    if target_npc is None and game_state['time_of_day'] == "Night":
+        target_npc = find_by_name(current_location.get("night_npcs", []), npc_name)
+    if target_npc is AMBIGUOUS:
+        return
 
     if not target_npc:
         print(f"You don't see a '{npc_name}' here to talk to.")
@@ -167,7 +186,9 @@ def handle_talk_to(player, npc_name, context):
 def handle_insult(player, npc_name, context):
     """Handles the player insulting an NPC."""
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-    target_npc = next((npc for npc in current_location.get("npcs", []) if npc_name.lower() in npc.name.lower()), None)
+    target_npc = find_by_name(current_location.get("npcs", []), npc_name)
+    if target_npc is AMBIGUOUS:
+        return
 
     if not target_npc:
         print(f"You shout insults at the air. No one named '{npc_name}' is here.")
@@ -177,31 +198,97 @@ def handle_insult(player, npc_name, context):
     target_npc.record_interaction('insult', context['game_state']['turn_count'])
     target_npc.talk(player, context['game_state'])
 
-def handle_bank_view(player, context):
-    """Displays the contents of the player's bank."""
+def _at_bank(player, context):
+    """Returns True if there is an available banker here, and says so if not."""
     location = context['get_current_location'](player, context['world'], context['current_dungeon'])
     if not any(isinstance(npc, Banker) and npc.is_available for npc in location.get("npcs", [])):
         print("You must be at an available bank to do that.")
+        return False
+    return True
+
+def _stack_line(item, count):
+    return f"- {item.name}" if count == 1 else f"- {count}x {item.name}"
+
+def handle_bank_view(player, context, args=()):
+    """
+    Displays the contents of the player's bank, grouped by category.
+    :param args: An optional category ('bank materials') or words to search for ('bank iron').
+    """
+    if not _at_bank(player, context):
         return
 
-    content = [f"Gold: {player.bank_gold}", "", "Items:"]
-    if not player.bank_items:
-        content.append("- Empty")
+    content = [f"Gold: {player.bank_gold}", ""]
+    query = " ".join(args)
+    category = find_category(query) if query else None
+    if category:
+        title = f"Your Bank: {category}"
+        groups = [(category, player.bank_items.in_category(category))]
+    elif query:
+        title = f"Your Bank: '{query}'"
+        groups = [("Matching items", player.bank_items.search(query))]
     else:
-        for item in player.bank_items:
-            content.append(f"- {item.name}")
-    
-    print_bordered("Your Bank", content)
+        title = "Your Bank"
+        groups = player.bank_items.by_category() or [("Items", [])]
+
+    for name, stacks in groups:
+        content.append(f"{name}:")
+        content.extend(_stack_line(item, count) for item, count in stacks)
+        if not stacks:
+            content.append("- Empty" if not query else "- Nothing found")
+        content.append("")
+    content.pop()
+    if not query and player.bank_items:
+        content.extend(["", "(Use 'bank <category>' or 'bank <words>' to narrow it down.)"])
+    print_bordered(title, content)
+
+def _move_items(source, destination, args, verb, place, direction):
+    """
+    Moves items between the inventory and the bank.
+    :param args: '<item>', '20 <item>', 'all <item>', 'all <category>' or 'all'.
+    :param verb: 'deposit' or 'withdraw', for the messages.
+    :param place: 'inventory' or 'bank', where the items come from.
+    :param direction: 'into your bank' or 'from your bank'.
+    """
+    if args[0].lower() == 'all':
+        query = " ".join(args[1:])
+        category = find_category(query) if query else None
+        if category or not query:
+            if isinstance(source, Bank):
+                stacks = source.in_category(category) if category else source.stacks()
+            else:
+                stacks = [(item, count) for item, count in source.stacks() if not category or category_of(item) == category]
+            if not stacks:
+                print(f"You don't have any {category.lower() if category else 'items'} in your {place}.")
+                return
+            moved = [(item, transfer(source, destination, item.name, count)[1]) for item, count in stacks]
+            print(f"You {verb} {direction}: " + ", ".join(item.name if n == 1 else f"{n}x {item.name}" for item, n in moved) + ".")
+            return
+        item_name, count = query, None
+    else:
+        item_name, count = split_quantity(args)
+        count = count or 1
+
+    item = find_by_name(source, item_name)
+    if item is AMBIGUOUS:
+        return
+    if not item:
+        print(f"You don't have a '{item_name}' in your {place}.")
+        return
+    if count is not None and source.count(item) < count:
+        print(f"You only have {source.count(item)} {item.name} in your {place}.")
+    item, moved = transfer(source, destination, item.name, count or source.count(item))
+    if moved == 1:
+        print(f"You {verb} the {item.name} {direction}.")
+    else:
+        print(f"You {verb} {moved}x {item.name} {direction}.")
 
 def handle_deposit(player, args, context):
     """Handles depositing items or gold into the bank."""
-    location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-    if not any(isinstance(npc, Banker) and npc.is_available for npc in location.get("npcs", [])):
-        print("You must be at an available bank to do that.")
+    if not _at_bank(player, context):
         return
 
     if not args:
-        print("Deposit what? (e.g., 'deposit gold 100' or 'deposit rusty sword')")
+        print("Deposit what? (e.g., 'deposit gold 100', 'deposit 20 logs' or 'deposit all materials')")
         return
 
     if args[0].lower() == 'gold':
@@ -218,24 +305,15 @@ def handle_deposit(player, args, context):
         except (ValueError, IndexError):
             print("Invalid amount. Usage: 'deposit gold <amount>'")
     else:
-        item_name = " ".join(args)
-        item_to_deposit = next((item for item in player.inventory if item_name.lower() in item.name.lower()), None)
-        if item_to_deposit:
-            player.inventory.remove(item_to_deposit)
-            player.bank_items.append(item_to_deposit)
-            print(f"You deposit the {item_to_deposit.name} into your bank.")
-        else:
-            print(f"You don't have a '{item_name}' in your inventory.")
+        _move_items(player.inventory, player.bank_items, args, "deposit", "inventory", "into your bank")
 
 def handle_withdraw(player, args, context):
     """Handles withdrawing items or gold from the bank."""
-    location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-    if not any(isinstance(npc, Banker) and npc.is_available for npc in location.get("npcs", [])):
-        print("You must be at an available bank to do that.")
+    if not _at_bank(player, context):
         return
 
     if not args:
-        print("Withdraw what? (e.g., 'withdraw gold 100' or 'withdraw rusty sword')")
+        print("Withdraw what? (e.g., 'withdraw gold 100', 'withdraw 50 logs' or 'withdraw all potions')")
         return
 
     if args[0].lower() == 'gold':
@@ -252,14 +330,7 @@ def handle_withdraw(player, args, context):
         except (ValueError, IndexError):
             print("Invalid amount. Usage: 'withdraw gold <amount>'")
     else:
-        item_name = " ".join(args)
-        item_to_withdraw = next((item for item in player.bank_items if item_name.lower() in item.name.lower()), None)
-        if item_to_withdraw:
-            player.bank_items.remove(item_to_withdraw)
-            player.inventory.append(item_to_withdraw)
-            print(f"You withdraw the {item_to_withdraw.name} from your bank.")
-        else:
-            print(f"You don't have a '{item_name}' in your bank.")
+        _move_items(player.bank_items, player.inventory, args, "withdraw", "bank", "from your bank")
 
 def handle_help():
     """Displays a list of available commands and their usage."""
@@ -286,11 +357,17 @@ def handle_help():
         "  brew <potion>    - Brew a potion from herbs.",
         "  smelt <bar>      - Smelt ore into a bar at a forge.",
         "  craft <item>     - Craft a new item from materials.",
+        "  (Put a number first to do it several times: 'chop 20 tree', 'smelt 10 iron bar'.)",
         "  recipes          - Show a list of known crafting recipes.",
+        "  recipes here     - Show what you can make here right now.",
+        "  plan <item> [xN] - Work out every step needed to make an item.",
+        "  make [<item>]    - Follow the plan and make it in one go.",
         "  bind <word1> ... - Attempt to bind words of power into a new spell.",
         "",
         "Combat & Thievery:",
         "  attack <monster> - Engage a monster in combat.",
+        "  autofight <monster> [using <policy>] - Resolve a fight automatically.",
+        "                     Policies: balanced, aggressive, cautious, parry, melee.",
         "  cast <spell_num> - Cast a known spell during combat.",
         "  defend / parry   - Take a defensive stance in combat.",
         "  flee             - Attempt to escape from combat.",
@@ -306,10 +383,16 @@ def handle_help():
         "  factions         - View your reputation with various factions.",
         "  equip <item>     - Equip a weapon or armor.",
         "  unequip <slot>   - Unequip an item ('weapon' or 'armor').",
-        "  bank             - View your bank balance.",
-        "  deposit/withdraw - Manage your bank account.",
+        "  bank [<what>]    - View your bank, or part of it (e.g., 'bank materials').",
+        "  deposit/withdraw - Manage your bank account ('deposit 20 logs', 'withdraw all potions').",
+        "  buy / sell       - Trade with a shopkeeper ('buy 5 healing potion', 'sell all logs').",
         "  save / quit      - Save your progress or exit the game.",
     ]
+    # Commands added by plugins describe themselves
+    extra = [f"  {command.name:<16} - {command.help}" for command in command_registry.commands.values() if command.help]
+    if extra:
+        content += ["", "More:"] + extra
+    content += ["", "Commands can be shortened (e.g., 'inv'), and Tab completes them."]
     print_bordered("Help: Available Commands", content)
 
 def handle_factions(player):
@@ -469,7 +552,7 @@ def handle_lockpick(player, context):
         print("There's nothing to lockpick here.")
         return
 
-    lockpick = next((item for item in player.inventory if item.name == "Lockpick"), None)
+    lockpick = player.inventory.get("Lockpick")
     if not lockpick:
         print("You need a lockpick to attempt this.")
         return
@@ -480,7 +563,7 @@ def handle_lockpick(player, context):
     print("You carefully work the lockpick in the keyhole...")
     context['advance_time']()
 
-    if random.random() < success_chance:
+    if thieving_random.random() < success_chance:
         player.jail_time_remaining = 0
         player.location = current_location["exits"]["out"]
         print("Click! The lock springs open. You slip out of the cell and back into the town square.")
@@ -499,12 +582,8 @@ def handle_recipes(player):
         content = ["You don't know any recipes yet."]
     else:
         content = []
-        inventory_counts = {}
-        for item in player.inventory:
-            inventory_counts[item.name] = inventory_counts.get(item.name, 0) + 1
-
         for recipe in player.known_recipes:
-            can_craft = all(inventory_counts.get(ing, 0) >= count for ing, count in recipe.ingredients.items())
+            can_craft = player.inventory.has_all(recipe.ingredients)
             craftable_tag = "(Craftable)" if can_craft else ""
             content.append(f"- {recipe.name} {craftable_tag}")
             ingredients_str = ", ".join([f"{count}x {name}" for name, count in recipe.ingredients.items()])
@@ -514,42 +593,80 @@ def handle_recipes(player):
             content.append("")
     print_bordered("Known Recipes", content)
 
-def handle_cook_item(player, item_name, context):
-    """Handles the player attempting to cook an item."""
-    recipe_to_cook = next((r for r in cooking_recipes for ingredient in r.ingredients if item_name.lower() in ingredient.lower()), None)
-    
-    if not recipe_to_cook:
-        print(f"You don't know how to cook '{item_name}'.")
-        return
-
+def handle_makeable(player, context):
+    """Displays everything the player can make here with what they are carrying."""
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-
-    if recipe_to_cook.station:
-        available_stations = current_location.get("stations", [])
-        if recipe_to_cook.station not in available_stations:
-            print(f"You need to be at a {recipe_to_cook.station} to do that.")
+    makeable = crafting.recipe_book.makeable(player, current_location.get("stations", []))
+    if not makeable:
+        content = ["You can't make anything here with what you are carrying."]
+    else:
+        content = []
+        for recipe, times in makeable:
+            verb = crafting.recipe_book.kind_of[recipe.name]
+            content.append(f"- {recipe.name} (up to {times}) - '{verb} {recipe.name.lower()}'")
+    print_bordered("You Can Make", content)
+
+def _print_plan(plan):
+    """Displays a crafting plan."""
+    content = ["Steps:"]
+    for i, step in enumerate(plan.steps):
+        station = f" (at the {step.source.station})" if getattr(step.source, 'station', None) else ""
+        content.append(f"  {i+1}. {step.verb} {step.name} x{step.count}{station}")
+    if plan.missing:
+        content += ["", "Missing (can't be made or gathered):"]
+        content += [f"  - {count}x {name}" for name, count in plan.missing.items()]
+    if plan.problems:
+        content += ["", "Problems:"]
+        content += [f"  - {problem}" for problem in plan.problems]
+    if not plan.missing and not plan.problems and all(step.verb in crafting.CRAFTING_KINDS for step in plan.steps):
+        content += ["", "You have everything you need. Type 'make' to follow the plan."]
+    print_bordered(f"Plan: {plan.item} x{plan.count}", content)
+
+def handle_plan(player, args, context):
+    """Plans every step needed to make an item, e.g. 'plan iron sword x2'."""
+    query, count = split_quantity(args)
+    item_name = crafting_planner.find(query)
+    if item_name is AMBIGUOUS:
+        return
+    if not item_name:
+        print(f"You don't know of any way to make '{query}'.")
+        return
+    crafting_planner.last_request = (item_name, count or 1)
+    _print_plan(crafting_planner.plan(player, item_name, count or 1))
+
+def handle_make(player, args, context):
+    """Follows a crafting plan: the last one shown, or a new one for 'make <item> [xN]'."""
+    if args:
+        query, count = split_quantity(args)
+        item_name = crafting_planner.find(query)
+        if item_name is AMBIGUOUS:
             return
-
-    if recipe_to_cook.skill_req:
-        skill_name, required_level = recipe_to_cook.skill_req
-        if player.skills[skill_name].level < required_level:
-            print(f"Your {skill_name} level is too low. You need level {required_level}.")
+        if not item_name:
+            print(f"You don't know of any way to make '{query}'.")
             return
+        crafting_planner.last_request = (item_name, count or 1)
+    elif not crafting_planner.last_request:
+        print("Make what? Use 'plan <item>' first, or 'make <item>'.")
+        return
 
-    inventory_counts = {item.name: player.inventory.count(item) for item in set(player.inventory)}
-    if not all(inventory_counts.get(ing, 0) >= count for ing, count in recipe_to_cook.ingredients.items()):
-        print("You don't have the required ingredients.")
+    # Plan again, in case the inventory has changed since the plan was shown
+    plan = crafting_planner.plan(player, *crafting_planner.last_request)
+    gathering = [step for step in plan.steps if step.verb not in crafting.CRAFTING_KINDS]
+    if plan.missing or plan.problems or gathering:
+        _print_plan(plan)
+        print("You can't follow this plan yet.")
         return
 
-    for ingredient, required_count in recipe_to_cook.ingredients.items():
-        for _ in range(required_count):
-            item_to_remove = next(item for item in player.inventory if item.name == ingredient)
-            player.inventory.remove(item_to_remove)
+    for step in plan.steps:
+        if crafting.make(player, step.source, context, step.count) < step.count:
+            print(f"The plan stops at: {step.verb} {step.name}.")
+            return
+    crafting_planner.last_request = None
+    print(f"Plan complete: you made {plan.count}x {plan.item}.")
 
-    cooked_item = recipe_to_cook.result
-    player.inventory.append(cooked_item)
-    player.add_skill_xp("Cooking", 20)
-    print(f"You successfully cook a {cooked_item.name}!")
+def handle_cook_item(player, item_name, context, count=1):
+    """Handles the player attempting to cook an item."""
+    crafting.craft(player, 'cook', item_name, context, count)
 
 def handle_open_chest(player, context):
     """Handles the player opening a treasure chest."""
@@ -612,7 +729,7 @@ def handle_disarm_chest(player, context):
         return
 
     success_chance = 0.2 + (player.skills["Thieving"].level * 0.05)
-    if random.random() < success_chance:
+    if thieving_random.random() < success_chance:
         chest['disarmed'] = True
         print("You carefully disable the trap mechanism. The chest is now safe to open.")
         player.add_skill_xp("Thieving", 30)
@@ -622,79 +739,13 @@ def handle_disarm_chest(player, context):
         del current_location['chest']
         player.add_skill_xp("Thieving", 5)
 
-def handle_brew_potion(player, item_name, context):
+def handle_brew_potion(player, item_name, context, count=1):
     """Handles the player attempting to brew a potion."""
-    recipe_to_brew = next((r for r in herblore_recipes if item_name.lower() in r.name.lower()), None)
-    
-    if not recipe_to_brew:
-        print(f"You don't know how to brew '{item_name}'.")
-        return
-
-    if recipe_to_brew.skill_req:
-        skill_name, required_level = recipe_to_brew.skill_req
-        if player.skills[skill_name].level < required_level:
-            print(f"Your {skill_name} level is too low. You need level {required_level}.")
-            return
-
-    inventory_counts = {item.name: player.inventory.count(item) for item in set(player.inventory)}
-    if not all(inventory_counts.get(ing, 0) >= count for ing, count in recipe_to_brew.ingredients.items()):
-        print("You don't have the required ingredients.")
-        for ing, count in recipe_to_brew.ingredients.items():
-            if inventory_counts.get(ing, 0) < count:
-                print(f"  (Missing {count - inventory_counts.get(ing, 0)}x {ing})")
-        return
+    crafting.craft(player, 'brew', item_name, context, count)
 
-    for ingredient, required_count in recipe_to_brew.ingredients.items():
-        for _ in range(required_count):
-            item_to_remove = next(item for item in player.inventory if item.name == ingredient)
-            player.inventory.remove(item_to_remove)
-
-    brewed_item = recipe_to_brew.result
-    player.inventory.append(brewed_item)
-    player.add_skill_xp("Herblore", 40)
-    print(f"You carefully combine the ingredients and brew a {brewed_item.name}!")
-    context['advance_time']()
-
-def handle_craft_item(player, item_name, context):
+def handle_craft_item(player, item_name, context, count=1):
     """Handles the player attempting to craft an item."""
-    recipe_to_craft = next((r for r in player.known_recipes if item_name.lower() in r.name.lower()), None)
-
-    if not recipe_to_craft:
-        print(f"You don't know how to craft '{item_name}'.")
-        return
-
-    if recipe_to_craft.station:
-        current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-        available_stations = current_location.get("stations", [])
-        if recipe_to_craft.station not in available_stations:
-            print(f"You need to be at a {recipe_to_craft.station} to craft this item.")
-            return
-
-    if recipe_to_craft.skill_req:
-        skill_name, required_level = recipe_to_craft.skill_req
-        if player.skills[skill_name].level < required_level:
-            print(f"Your {skill_name} level is too low. You need level {required_level}.")
-            return
-
-    inventory_counts = {item.name: player.inventory.count(item) for item in set(player.inventory)}
-    if not all(inventory_counts.get(ing, 0) >= count for ing, count in recipe_to_craft.ingredients.items()):
-        print(f"You don't have enough ingredients.")
-        return
-
-    print("You use your materials to craft the item...")
-    for ingredient, required_count in recipe_to_craft.ingredients.items():
-        for _ in range(required_count):
-            item_to_remove = next(item for item in player.inventory if item.name == ingredient)
-            player.inventory.remove(item_to_remove)
-
-    crafted_item = recipe_to_craft.result
-    player.inventory.append(crafted_item)
-    
-    xp_skill = recipe_to_craft.skill_req[0] if recipe_to_craft.skill_req else "Crafting"
-    player.add_skill_xp(xp_skill, 25)
-    print(f"You successfully crafted a {crafted_item.name}!")
-    for quest in player.active_quests:
-        quest.update_progress('activity', 'craft')
+    crafting.craft(player, 'craft', item_name, context, count)
 
 def handle_bind_words(player, words_to_bind, context):
     """Handles the player attempting to bind words into a spell."""
@@ -732,7 +783,9 @@ def handle_bind_words(player, words_to_bind, context):
 def handle_pickpocket(player, npc_name, context):
     """Handles the player attempting to pickpocket an NPC."""
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-    target_npc = next((npc for npc in current_location.get("npcs", []) if npc_name.lower() in npc.name.lower()), None)
+    target_npc = find_by_name(current_location.get("npcs", []), npc_name)
+    if target_npc is AMBIGUOUS:
+        return
 
     if not target_npc:
         print(f"You don't see a '{npc_name}' here to pickpocket.")
@@ -750,11 +803,11 @@ def handle_pickpocket(player, npc_name, context):
     success_chance = 0.5 + (level_diff * 0.05)
     success_chance = max(0.1, min(success_chance, 0.9))
 
-    if random.random() < success_chance:
+    if thieving_random.random() < success_chance:
         if not target_npc.pickpocket_loot:
             print(f"You successfully pick {target_npc.name}'s pockets but find nothing.")
         else:
-            looted_item = random.choice(target_npc.pickpocket_loot)
+            looted_item = thieving_random.choice(target_npc.pickpocket_loot)
             player.inventory.append(looted_item)
             print(f"Success! You deftly lift a {looted_item.name} from {target_npc.name}.")
             player.add_skill_xp("Thieving", 50)
@@ -769,52 +822,25 @@ def handle_pickpocket(player, npc_name, context):
 
     target_npc.has_been_pickpocketed = True
 
-def handle_smelt_item(player, item_name, context):
+def handle_smelt_item(player, item_name, context, count=1):
     """Handles the player attempting to smelt ore into a bar."""
-    recipe_to_smelt = next((r for r in smelting_recipes if item_name.lower() in r.name.lower()), None)
+    crafting.craft(player, 'smelt', item_name, context, count)
 
-    if not recipe_to_smelt:
-        print(f"You don't know how to smelt '{item_name}'.")
-        return
-
-    if recipe_to_smelt.station:
-        current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-        available_stations = current_location.get("stations", [])
-        if recipe_to_smelt.station not in available_stations:
-            print(f"You need to be at a {recipe_to_smelt.station} to do that.")
-            return
-
-    if recipe_to_smelt.skill_req:
-        skill_name, required_level = recipe_to_smelt.skill_req
-        if player.skills[skill_name].level < required_level:
-            print(f"Your {skill_name} level is too low. You need level {required_level}.")
-            return
-
-    inventory_counts = {item.name: player.inventory.count(item) for item in set(player.inventory)}
-    if not all(inventory_counts.get(ing, 0) >= count for ing, count in recipe_to_smelt.ingredients.items()):
-        print("You don't have the required ore.")
-        return
-
-    for ingredient, required_count in recipe_to_smelt.ingredients.items():
-        for _ in range(required_count):
-            item_to_remove = next(item for item in player.inventory if item.name == ingredient)
-            player.inventory.remove(item_to_remove)
-
-    smelted_item = recipe_to_smelt.result
-    player.inventory.append(smelted_item)
-    player.add_skill_xp("Smelting", 15)
-    print(f"You smelt the ore and successfully create a {smelted_item.name}!")
-
-def handle_gather_node(player, verb, node_name, context):
-    """Handles the player attempting to gather from a resource node (e.g., mine, chop)."""
+def handle_gather_node(player, verb, node_name, context, count=1):
+    """
+    Handles the player attempting to gather from a resource node (e.g., mine, chop).
+    Gathering several at once is checked once and takes one turn per item.
+    """
     current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
-    node_to_gather = next((node for node in current_location.get("nodes", []) if node_name.lower() in node.name.lower() and node.verb == verb), None)
+    node_to_gather = find_by_name(current_location.get("nodes", []), node_name, where=lambda node: node.verb == verb)
+    if node_to_gather is AMBIGUOUS:
+        return
 
     if not node_to_gather:
         print(f"You can't {verb} that here.")
         return
 
-    if not any(item.name == node_to_gather.required_tool for item in player.inventory):
+    if node_to_gather.required_tool not in player.inventory:
         print(f"You need a {node_to_gather.required_tool} to do that.")
         return
 
@@ -824,14 +850,19 @@ def handle_gather_node(player, verb, node_name, context):
         return
 
     yielded_item = node_to_gather.item_yield
-    player.inventory.append(yielded_item)
-    player.add_skill_xp(skill_name, node_to_gather.xp_yield)
-    print(f"You successfully get some {yielded_item.name}.")
+    player.inventory.add(yielded_item, count)
+    player.add_skill_xp(skill_name, node_to_gather.xp_yield * count)
+    regional_economy.record_supply(player.location, yielded_item.name, count)
+    if count == 1:
+        print(f"You successfully get some {yielded_item.name}.")
+    else:
+        print(f"You successfully get {count}x {yielded_item.name}.")
     if verb == 'fish':
         for quest in player.active_quests:
-            quest.update_progress('activity', 'fish')
+            for _ in range(count):
+                quest.update_progress('activity', 'fish')
     
-    context['advance_time']()
+    context['advance_time'](count)
 
 def handle_accept_quest(player):
     """Handles the player accepting a quest."""
@@ -869,7 +900,7 @@ def handle_quests_log(player):
 
 def handle_equip_item(player, item_name):
     """Equips an item from the player's inventory."""
-    item_to_equip = next((item for item in player.inventory if item.name.lower() == item_name.lower()), None)
+    item_to_equip = next((item for item in player.inventory.unique_items() if item.name.lower() == item_name.lower()), None)
 
     if not item_to_equip:
         print(f"You don't have a {item_name} in your inventory.")
@@ -913,7 +944,9 @@ def handle_unequip_item(player, slot):
 
 def handle_use_item(player, item_name):
     """Handles the player using a consumable item."""
-    item_to_use = next((item for item in player.inventory if item_name.lower() in item.name.lower()), None)
+    item_to_use = find_by_name(player.inventory, item_name)
+    if item_to_use is AMBIGUOUS:
+        return
 
     if isinstance(item_to_use, Spellbook):
         player.learn_ability(item_to_use.ability)
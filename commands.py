@@ -0,0 +1,161 @@
+"""
+The command registry.
+
+Every command the player can type is registered once with its verbs, its
+argument count and where it may be used. Typed verbs are looked up in a
+dictionary; anything that isn't an exact verb is resolved through a prefix
+trie, so unambiguous abbreviations work ("inv" for "inventory") and the
+same trie drives tab completion. Plugins add commands with register() or
+the command() decorator:
+
+    @command_registry.command("dance", min_args=0, in_jail=True, help="Dance a little jig.")
+    def dance(player, args):
+        print("You dance a little jig.")
+"""
+
+
+class Command:
+    """
+    A registered command.
+    """
+    __slots__ = ('name', 'handler', 'verbs', 'min_args', 'max_args', 'missing', 'in_jail', 'in_combat', 'help')
+
+    def __init__(self, name, handler, verbs, min_args, max_args, missing, in_jail, in_combat, help):
+        self.name = name
+        self.handler = handler
+        self.verbs = verbs
+        self.min_args = min_args
+        self.max_args = max_args
+        self.missing = missing
+        self.in_jail = in_jail
+        self.in_combat = in_combat
+        self.help = help
+
+
+class _TrieNode:
+    __slots__ = ('children', 'verbs')
+
+    def __init__(self):
+        self.children = {}
+        self.verbs = [] # Every verb that starts with this node's prefix, sorted
+
+
+class CommandRegistry:
+    """
+    Maps verbs to commands and dispatches typed lines.
+    """
+    JAIL_MESSAGE = "You can't do that in jail. You must serve your time. (Type 'wait', 'bribe', or 'lockpick')."
+    COMBAT_MESSAGE = "You can't do that in the middle of a fight."
+
+    def __init__(self):
+        self.commands = {}  # name -> Command
+        self._verbs = {}    # verb or alias -> Command
+        self._trie = _TrieNode()
+
+    def register(self, name, handler, aliases=(), min_args=0, max_args=None, missing=None,
+                 in_jail=False, in_combat=False, help=None):
+        """
+        Registers a command.
+        :param name: The command's main verb.
+        :param handler: A function handler(player, args) taking the words after the verb.
+        :param aliases: Other verbs for the same command.
+        :param min_args: The fewest words allowed after the verb.
+        :param max_args: The most words allowed after the verb, or None for any number.
+        :param missing: What to say when too few words are given (e.g. "Take what?").
+        :param in_jail: True if the command can be used while serving jail time.
+        :param in_combat: True if the command can be used during a fight without costing a turn.
+        :param help: A one-line description.
+        :return: The Command.
+        """
+        verbs = (name,) + tuple(aliases)
+        for verb in verbs:
+            if verb in self._verbs:
+                raise ValueError(f"The verb '{verb}' is already registered to '{self._verbs[verb].name}'.")
+        command = Command(name, handler, verbs, min_args, max_args, missing, in_jail, in_combat, help)
+        self.commands[name] = command
+        for verb in verbs:
+            self._verbs[verb] = command
+            node = self._trie
+            for char in verb:
+                node = node.children.setdefault(char, _TrieNode())
+                node.verbs.append(verb)
+                node.verbs.sort()
+        return command
+
+    def command(self, name, **options):
+        """Decorator form of register(), for handlers defined as functions."""
+        def decorator(handler):
+            self.register(name, handler, **options)
+            return handler
+        return decorator
+
+    def complete(self, prefix):
+        """Returns every verb that starts with a prefix, sorted."""
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return list(node.verbs) if prefix else sorted(self._verbs)
+
+    def resolve(self, verb):
+        """
+        Finds the command for a typed verb or an abbreviation of one.
+        :return: A tuple of (Command or None, candidate verbs). The command is
+                 None if nothing matches, or if the abbreviation is ambiguous.
+        """
+        command = self._verbs.get(verb)
+        if command is not None:
+            return command, [verb]
+        candidates = self.complete(verb)
+        commands = {self._verbs[candidate].name for candidate in candidates}
+        if len(commands) == 1:
+            return self._verbs[candidates[0]], candidates
+        return None, candidates
+
+    def dispatch(self, line, player, in_jail=False, in_combat=False):
+        """
+        Runs a typed line.
+        :param line: The player's input.
+        :param in_jail: True if only jail commands are allowed.
+        :param in_combat: True if only combat-safe commands are allowed.
+        :return: True if the line named a command (even if it was refused), False otherwise.
+        """
+        parts = line.lower().split()
+        if not parts:
+            return False
+        command, candidates = self.resolve(parts[0])
+        if command is None:
+            if len(candidates) > 1:
+                print(f"'{parts[0]}' could mean: {', '.join(candidates)}.")
+                return True
+            return False
+        if in_jail and not command.in_jail:
+            print(self.JAIL_MESSAGE)
+            return True
+        if in_combat and not command.in_combat:
+            print(self.COMBAT_MESSAGE)
+            return True
+        args = parts[1:]
+        if len(args) < command.min_args:
+            print(command.missing or f"{command.name.capitalize()} what?")
+            return True
+        if command.max_args is not None and len(args) > command.max_args:
+            args = args[:command.max_args]
+        command.handler(player, args)
+        return True
+
+
+def split_quantity(args):
+    """
+    Splits a quantity off a command's words: "20 iron bar" or "iron bar x20".
+    :return: A tuple of (the remaining words joined, the quantity or None if none was given).
+    """
+    if len(args) > 1 and args[0].isdigit():
+        return " ".join(args[1:]), int(args[0])
+    if len(args) > 1 and args[-1][:1] == "x" and args[-1][1:].isdigit():
+        return " ".join(args[:-1]), int(args[-1][1:])
+    return " ".join(args), None
+
+# A global instance to be used throughout the game
+command_registry = CommandRegistry()
@@ -0,0 +1,216 @@
+"""
+The crafting engine and the recipe book.
+
+Crafting, smelting, cooking and brewing all follow the same steps: find the
+recipe, check the station and the skill, check and consume the ingredients,
+then hand out the result and the XP. craft() runs those steps for any kind
+of recipe; what differs between the kinds (which skill earns XP, the
+messages, whether time passes) is data in CRAFTING_KINDS.
+
+Every recipe is kept in the RecipeBook, indexed by its output, kind,
+station, skill and ingredients, so the book can answer "what can I make
+here right now" by looking only at the recipes that use something the
+player is carrying.
+"""
+from collections import namedtuple
+
+from names import find_by_name, normalize, AMBIGUOUS
+
+# How one kind of recipe is made
+CraftingKind = namedtuple('CraftingKind', [
+    'verb',             # The command, e.g. 'smelt'
+    'xp_skill',         # The skill that earns XP, or None for the recipe's own skill (default Crafting)
+    'xp',               # XP per item made
+    'known_only',       # True if only recipes the player has learned can be made
+    'by_ingredient',    # True if the recipe may also be named by an ingredient ('cook trout')
+    'station_message',  # Shown when the station is missing; formatted with {station}
+    'missing_message',  # Shown when ingredients are missing
+    'show_missing',     # True to list which ingredients are short
+    'start_message',    # Shown before making, or None
+    'done_message',     # Shown after making one; formatted with {item}
+    'batch_message',    # Shown after making several; formatted with {count} and {item}
+    'takes_time',       # True if making it advances time
+    'activity',         # The quest activity it counts towards, or None
+])
+
+CRAFTING_KINDS = {
+    'craft': CraftingKind('craft', None, 25, True, False,
+                          "You need to be at a {station} to craft this item.", "You don't have enough ingredients.", False,
+                          "You use your materials to craft the item...", "You successfully crafted a {item}!",
+                          "You successfully crafted {count}x {item}!", False, 'craft'),
+    'smelt': CraftingKind('smelt', "Smelting", 15, False, False,
+                          "You need to be at a {station} to do that.", "You don't have the required ore.", False,
+                          None, "You smelt the ore and successfully create a {item}!",
+                          "You smelt the ore and successfully create {count}x {item}!", False, None),
+    'cook': CraftingKind('cook', "Cooking", 20, False, True,
+                         "You need to be at a {station} to do that.", "You don't have the required ingredients.", False,
+                         None, "You successfully cook a {item}!", "You successfully cook {count}x {item}!", False, None),
+    'brew': CraftingKind('brew', "Herblore", 40, False, False,
+                         "You need to be at a {station} to do that.", "You don't have the required ingredients.", True,
+                         None, "You carefully combine the ingredients and brew a {item}!",
+                         "You carefully combine the ingredients and brew {count}x {item}!", True, None),
+}
+
+
+class RecipeBook:
+    """
+    Every recipe in the game, indexed for lookups.
+    """
+    def __init__(self):
+        self.recipes = []
+        self.by_name = {}        # recipe name -> recipe
+        self.kind_of = {}        # recipe name -> kind
+        self.by_output = {}      # result item name -> recipes
+        self.by_kind = {kind: [] for kind in CRAFTING_KINDS}
+        self.by_station = {}     # station (None for none) -> recipes
+        self.by_skill = {}       # skill name -> recipes
+        self.by_ingredient = {}  # ingredient name -> recipes
+        self.sources = {}        # item name -> resource nodes that yield it
+        self.revision = 0        # Bumped whenever the book changes
+
+    def add(self, recipe, kind):
+        """
+        Adds a recipe to the book.
+        :param kind: A key of CRAFTING_KINDS.
+        """
+        if recipe.name in self.kind_of:
+            return
+        self.recipes.append(recipe)
+        self.by_name[recipe.name] = recipe
+        self.kind_of[recipe.name] = kind
+        self.by_output.setdefault(recipe.result.name, []).append(recipe)
+        self.by_kind[kind].append(recipe)
+        self.by_station.setdefault(recipe.station, []).append(recipe)
+        if recipe.skill_req:
+            self.by_skill.setdefault(recipe.skill_req[0], []).append(recipe)
+        for ingredient in recipe.ingredients:
+            self.by_ingredient.setdefault(ingredient, []).append(recipe)
+        self.revision += 1
+
+    def add_all(self, recipes, kind):
+        for recipe in recipes:
+            self.add(recipe, kind)
+
+    def add_source(self, node):
+        """Records a resource node as a place to gather its item."""
+        self.sources.setdefault(node.item_yield.name, []).append(node)
+        self.revision += 1
+
+    def get(self, name):
+        """Returns the recipe with a given name, or None."""
+        return self.by_name.get(name)
+
+    def find(self, player, kind, query):
+        """
+        Finds the recipe of a kind that a player means.
+        :return: The recipe, None, or names.AMBIGUOUS (after asking which one was meant).
+        """
+        recipes = player.known_recipes if CRAFTING_KINDS[kind].known_only else self.by_kind[kind]
+        recipe = find_by_name(recipes, query)
+        if recipe is None and CRAFTING_KINDS[kind].by_ingredient:
+            query = normalize(query)
+            recipe = next((r for r in recipes for ingredient in r.ingredients if query in normalize(ingredient)), None)
+        return recipe
+
+    def can_use(self, player, recipe):
+        """Returns True if a player may make a recipe: it's known (if it must be) and their skill is high enough."""
+        if CRAFTING_KINDS[self.kind_of[recipe.name]].known_only and recipe not in player.known_recipes:
+            return False
+        if recipe.skill_req:
+            skill_name, required_level = recipe.skill_req
+            return player.skills[skill_name].level >= required_level
+        return True
+
+    def makeable(self, player, stations):
+        """
+        Finds everything a player can make right now.
+        Only recipes that use something the player is carrying are looked at.
+        :param stations: The stations at hand.
+        :return: A list of (recipe, how many times it can be made).
+        """
+        candidates = {}
+        for item, count in player.inventory.stacks():
+            for recipe in self.by_ingredient.get(item.name, ()):
+                candidates[recipe.name] = recipe
+        found = []
+        for recipe in candidates.values():
+            if recipe.station and recipe.station not in stations:
+                continue
+            if not self.can_use(player, recipe):
+                continue
+            times = min(player.inventory.count(name) // count for name, count in recipe.ingredients.items())
+            if times:
+                found.append((recipe, times))
+        return found
+
+# A global instance to be used throughout the game
+recipe_book = RecipeBook()
+
+
+def craft(player, kind, item_name, context, times=1):
+    """
+    Makes something from a recipe of a given kind.
+    :param kind: A key of CRAFTING_KINDS.
+    :param item_name: What the player typed.
+    :param times: How many to make.
+    :return: How many were made.
+    """
+    recipe = recipe_book.find(player, kind, item_name)
+    if recipe is AMBIGUOUS:
+        return 0
+    if not recipe:
+        print(f"You don't know how to {CRAFTING_KINDS[kind].verb} '{item_name}'.")
+        return 0
+    return make(player, recipe, context, times)
+
+
+def make(player, recipe, context, times=1):
+    """
+    Makes a recipe one or more times. Everything is checked once, then the
+    ingredients, results, XP and time for the whole batch are applied together.
+    :param times: How many to make; fewer are made if there are only ingredients for fewer.
+    :return: How many were made.
+    """
+    spec = CRAFTING_KINDS[recipe_book.kind_of[recipe.name]]
+    if recipe.station:
+        current_location = context['get_current_location'](player, context['world'], context['current_dungeon'])
+        if recipe.station not in current_location.get("stations", []):
+            print(spec.station_message.format(station=recipe.station))
+            return 0
+
+    if recipe.skill_req:
+        skill_name, required_level = recipe.skill_req
+        if player.skills[skill_name].level < required_level:
+            print(f"Your {skill_name} level is too low. You need level {required_level}.")
+            return 0
+
+    possible = min(player.inventory.count(ingredient) // count for ingredient, count in recipe.ingredients.items())
+    if not possible:
+        print(spec.missing_message)
+        if spec.show_missing:
+            for ingredient, count in recipe.ingredients.items():
+                if player.inventory.count(ingredient) < count:
+                    print(f"  (Missing {count - player.inventory.count(ingredient)}x {ingredient})")
+        return 0
+    if possible < times:
+        print(f"You only have the materials for {possible}.")
+        times = possible
+
+    if spec.start_message:
+        print(spec.start_message)
+    player.inventory.remove_all({ingredient: count * times for ingredient, count in recipe.ingredients.items()})
+    player.inventory.add(recipe.result, times)
+
+    xp_skill = spec.xp_skill or (recipe.skill_req[0] if recipe.skill_req else "Crafting")
+    player.add_skill_xp(xp_skill, spec.xp * times)
+    if times == 1:
+        print(spec.done_message.format(item=recipe.result.name))
+    else:
+        print(spec.batch_message.format(count=times, item=recipe.result.name))
+    if spec.activity:
+        for quest in player.active_quests:
+            for _ in range(times):
+                quest.update_progress('activity', spec.activity)
+    if spec.takes_time:
+        context['advance_time'](times)
+    return times
@@ -1,5 +1,8 @@
-import random
+from rng import random_streams, WORLDGEN
 from item import Key, pouch_of_gold, healing_potion, mana_potion
+from weighted import AliasTable, LootTable
+
+worldgen_random = random_streams.get(WORLDGEN) # This module's random stream
 
 class DungeonGenerator:
     """Generates procedural dungeon maps."""
@@ -14,11 +17,14 @@ class DungeonGenerator:
             "This room is filled with the skeletal remains of previous adventurers. A grim warning."
         ]
         self.end_game_monsters = ["troll", "giant_eagle"]
-        self.loot_pool = [
-            healing_potion,
-            mana_potion,
-            pouch_of_gold
-        ]
+        # What a room holds: 25% of rooms have a chest, a fifth of those are
+        # mimics and half of the real ones are trapped.
+        self.chest_table = AliasTable([(None, 75), ('mimic', 5), ('trapped', 10), ('plain', 10)])
+        self.chest_loot = LootTable([
+            (healing_potion, 'common'),
+            (mana_potion, 'common'),
+            (pouch_of_gold, 'uncommon')
+        ], rolls=(1, 2))
 
     def _generate_single_floor(self, num_rooms):
         """
@@ -39,7 +45,7 @@ class DungeonGenerator:
         current_pos = start_pos
         for _ in range(num_rooms - 1):
             possible_directions = ["north", "south", "east", "west"]
-            random.shuffle(possible_directions)
+            worldgen_random.shuffle(possible_directions)
             
             moved = False
             for direction in possible_directions:
@@ -47,23 +53,21 @@ class DungeonGenerator:
                 if next_pos not in layout:
                     layout[next_pos] = {
                         "name": "Deep Cavern",
-                        "description_day": random.choice(self.room_descriptions),
-                        "description_night": random.choice(self.room_descriptions),
+                        "description_day": worldgen_random.choice(self.room_descriptions),
+                        "description_night": worldgen_random.choice(self.room_descriptions),
                         "exits": {},
-                        "monsters": [self.monster_mapping[random.choice(self.end_game_monsters)]()],
+                        "monsters": [self.monster_mapping[worldgen_random.choice(self.end_game_monsters)]()],
                     }
                     # Add a chance for a chest
-                    if random.random() < 0.25: # 25% chance for a chest
-                        if random.random() < 0.2: # 20% of chests are mimics
-                            layout[next_pos]['chest'] = {'is_mimic': True}
-                        else:
-                            chest_loot = [random.choice(self.loot_pool) for _ in range(random.randint(1, 2))]
-                            is_trapped = random.random() < 0.5 # 50% of real chests are trapped
-                            layout[next_pos]['chest'] = {
-                                'trapped': is_trapped,
-                                'disarmed': False,
-                                'loot': chest_loot
-                            }
+                    chest = self.chest_table.sample(worldgen_random)
+                    if chest == 'mimic':
+                        layout[next_pos]['chest'] = {'is_mimic': True}
+                    elif chest is not None:
+                        layout[next_pos]['chest'] = {
+                            'trapped': chest == 'trapped',
+                            'disarmed': False,
+                            'loot': self.chest_loot.roll(worldgen_random)
+                        }
                     opposite_direction = {"north": "south", "south": "north", "east": "west", "west": "east"}[direction]
                     layout[current_pos]["exits"][direction] = next_pos
                     layout[next_pos]["exits"][opposite_direction] = current_pos
@@ -72,7 +76,7 @@ class DungeonGenerator:
                     break
             
             if not moved:
-                current_pos = random.choice(list(layout.keys()))
+                current_pos = worldgen_random.choice(list(layout.keys()))
         
         return layout
 
@@ -126,7 +130,7 @@ class DungeonGenerator:
             }
             # Place the key on the second floor
             key_floor = all_floor_layouts[1]
-            key_room_pos = random.choice(list(key_floor.keys()))
+            key_room_pos = worldgen_random.choice(list(key_floor.keys()))
             shadow_key = Key("Shadow Key", "A heavy, ornate key made of dark metal, pulsing with faint shadow energy.", value=0, unlocks_what="shadow_throne_door")
             if "items" not in key_floor[key_room_pos]:
                 key_floor[key_room_pos]["items"] = []
@@ -152,15 +156,16 @@ class DungeonGenerator:
                 room_key = coord_to_key_map[(i, coord)]
                 new_exits = {}
                 for direction, dest in room_data["exits"].items():
-                    if isinstance(dest, dict): # Locked door
-                        dest_floor, dest_coord = dest['destination']
-                        dest['destination'] = coord_to_key_map[(dest_floor, dest_coord)]
+                    if direction == "out": # Back to the world grid
                         new_exits[direction] = dest
-                    elif isinstance(dest, tuple): # Standard exit
+                    elif isinstance(dest, dict): # Locked door, on the same floor
+                        dest['destination'] = coord_to_key_map[(i, dest['destination'])]
+                        new_exits[direction] = dest
+                    elif direction in ("up", "down"): # Stairs, as (floor, coord)
                         dest_floor, dest_coord = dest
                         new_exits[direction] = coord_to_key_map[(dest_floor, dest_coord)]
-                    else: # Special exit like 'out'
-                        new_exits[direction] = dest
+                    else: # Standard exit on the same floor
+                        new_exits[direction] = coord_to_key_map[(i, dest)]
                 room_data["exits"] = new_exits
                 final_dungeon[room_key] = room_data
 
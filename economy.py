@@ -0,0 +1,178 @@
+"""
+Regional supply, demand and market prices.
+
+The world grid is split into regions, each with its own supply of and demand
+for every traded good. Gathering and trade are recorded as they happen, and
+raids and caravans disturb the regions they strike. Every TICK_INTERVAL
+turns the economy settles and publishes a price for every good in every
+region, which shops (shop.py) fold into what they charge.
+"""
+import numpy as np
+
+# Faction event types that disturb a region's trade, and how much per economy tick:
+# (change to supply, change to demand) of every good in the region.
+EVENT_EFFECTS = {
+    "bandit_raid": (-0.2, 0.1),     # Raids cut off supplies and leave people short
+    "merchant_caravan": (0.2, 0.0), # Caravans bring goods to market
+}
+
+
+class RegionalEconomy:
+    """
+    Supply, demand and prices of every traded good in every region of the map.
+
+    The grid is split into square regions, and each (good, region) pair has a
+    supply, a demand and a price multiplier, stored as NumPy arrays with a row
+    per good and a column per region (so a new good just appends one row).
+    Gathering and trade are recorded as they happen, into inflow arrays. Every
+    TICK_INTERVAL turns a few whole-array expressions fold in the inflows and
+    the effects of any raids or caravans (one column each), let supply and
+    demand drift back to normal, and work out every price. The prices are then
+    published as a snapshot that shops read with one lookup until the next
+    tick.
+    """
+    REGION_SIZE = 5          # Regions are REGION_SIZE x REGION_SIZE tiles
+    TICK_INTERVAL = 24       # Turns between economy ticks
+    PER_ITEM = 0.01          # Supply (or demand) one item gathered or traded adds
+    RECOVERY = 0.25          # Share of the way supply and demand return to normal each tick
+    ELASTICITY = 0.5         # How strongly prices follow demand / supply
+    PRICE_RANGE = (0.5, 2.0) # Lowest and highest price multiplier
+
+    def __init__(self):
+        self.goods = {}   # item name -> good index (row of every array)
+        self.regions = 0
+        self.supply = np.ones((0, 0))
+        self.demand = np.ones((0, 0))
+        self.prices = np.ones((0, 0))     # The published snapshot
+        self.supply_in = np.zeros((0, 0)) # Recorded since the last tick
+        self.demand_in = np.zeros((0, 0))
+        self.next_tick = 0
+        self.revision = 0 # Bumped whenever a new snapshot is published
+        self._grid = None
+        self._region_cols = 0
+
+    def attach(self, world_state, turn, state=None):
+        """Sizes the arrays for a world grid and indexes the goods its shops trade in."""
+        from npc import Shopkeeper # Import here to avoid circular dependency issues
+        grid = world_state["grid"]
+        self._grid = grid
+        self._region_cols = -(-len(grid[0]) // self.REGION_SIZE)
+        self.regions = -(-len(grid) // self.REGION_SIZE) * self._region_cols
+        self.goods = {}
+        self.supply, self.demand, self.prices = (np.ones((0, self.regions)) for _ in range(3))
+        self.supply_in, self.demand_in = np.zeros((0, self.regions)), np.zeros((0, self.regions))
+        self.next_tick = turn + self.TICK_INTERVAL
+
+        if state and state.get("regions") == self.regions:
+            # Saved values are restored by good name; anything else starts at normal
+            for name, supply, demand in zip(state["goods"], state["supply"], state["demand"]):
+                good = self._good(name)
+                self.supply[good] = supply
+                self.demand[good] = demand
+            self.next_tick = state.get("next_tick", self.next_tick)
+        locations = [location for row in grid for location in row] + list(world_state["special"].values())
+        for location in locations:
+            for npc in location.get("npcs", []):
+                if isinstance(npc, Shopkeeper):
+                    for item, _ in npc.stock_levels.stacks() + npc.inventory.stacks():
+                        self._good(item.name)
+        self._publish()
+
+    def region_of(self, location_key):
+        """Returns the region of a grid location key, or None for places off the grid."""
+        if not isinstance(location_key, tuple) or self._grid is None:
+            return None
+        r, c = location_key
+        return (r // self.REGION_SIZE) * self._region_cols + c // self.REGION_SIZE
+
+    def _good(self, item_name):
+        """Returns the row of a good, adding a row to every array if the good is new."""
+        good = self.goods.get(item_name)
+        if good is None:
+            good = self.goods[item_name] = len(self.goods)
+            ones, zeros = np.ones((1, self.regions)), np.zeros((1, self.regions))
+            self.supply = np.vstack((self.supply, ones))
+            self.demand = np.vstack((self.demand, ones))
+            self.prices = np.vstack((self.prices, ones))
+            self.supply_in = np.vstack((self.supply_in, zeros))
+            self.demand_in = np.vstack((self.demand_in, zeros))
+        return good
+
+    def record_supply(self, location_key, item_name, count=1):
+        """Records goods brought to market in a region: gathered, or sold to a shop."""
+        region = self.region_of(location_key)
+        if region is not None:
+            self.supply_in[self._good(item_name), region] += count * self.PER_ITEM
+
+    def record_demand(self, location_key, item_name, count=1):
+        """Records goods bought in a region."""
+        region = self.region_of(location_key)
+        if region is not None:
+            self.demand_in[self._good(item_name), region] += count * self.PER_ITEM
+
+    def price_factor(self, location_key, item_name):
+        """Returns the published price multiplier of a good where a shop stands."""
+        region = self.region_of(location_key)
+        good = self.goods.get(item_name)
+        if region is None or good is None:
+            return 1.0
+        return float(self.prices[good, region])
+
+    def process(self, world_state, game_state, active_events=()):
+        """
+        Runs the economy tick if one is due.
+        :param active_events: The faction events running now (dictionaries with a type and location key).
+        """
+        if self._grid is not world_state["grid"]:
+            self.attach(world_state, game_state["turn_count"])
+        turn = game_state["turn_count"]
+        if turn < self.next_tick:
+            return
+        ticks = (turn - self.next_tick) // self.TICK_INTERVAL + 1
+        since = self.next_tick - self.TICK_INTERVAL # The turn of the last tick
+        self.next_tick += ticks * self.TICK_INTERVAL
+
+        # Raids and caravans count as inflows for every good in their region,
+        # in proportion to how many ticks' worth of turns they have been running.
+        for event in active_events:
+            effect = EVENT_EFFECTS.get(event["type"])
+            region = self.region_of(tuple(event["location_key"]))
+            if effect is None or region is None:
+                continue
+            active = min(ticks, (turn - max(since, event.get("start_turn", since))) / self.TICK_INTERVAL)
+            if active <= 0:
+                continue
+            self.supply_in[:, region] += effect[0] * active
+            self.demand_in[:, region] += effect[1] * active
+
+        # Every good in every region at once. Over several ticks the drift back
+        # to normal compounds, so a long wait costs no more than a single tick.
+        keep = (1.0 - self.RECOVERY) ** ticks
+        self.supply = np.maximum(0.1, 1.0 + (self.supply + self.supply_in - 1.0) * keep)
+        self.demand = np.maximum(0.1, 1.0 + (self.demand + self.demand_in - 1.0) * keep)
+        self.supply_in = np.zeros_like(self.supply)
+        self.demand_in = np.zeros_like(self.demand)
+        self._publish()
+
+    def _publish(self):
+        """Works out every price from supply and demand and publishes the snapshot."""
+        self.prices = np.clip((self.demand / self.supply) ** self.ELASTICITY, *self.PRICE_RANGE)
+        self.revision += 1
+
+    def get_state(self):
+        """Returns the economy for saving."""
+        return {
+            "regions": self.regions,
+            "goods": sorted(self.goods, key=self.goods.get),
+            "supply": self.supply.round(4).tolist(),
+            "demand": self.demand.round(4).tolist(),
+            "next_tick": self.next_tick,
+        }
+
+    def load_state(self, state, world_state, turn):
+        """Restores a saved economy onto a loaded world, or starts it afresh."""
+        self.attach(world_state, turn, state)
+
+
+# A global instance to be used throughout the game
+regional_economy = RegionalEconomy()
@@ -0,0 +1,158 @@
+"""
+Ability effects, compiled into pipelines of small steps.
+
+An Ability's effect and status_effect dictionaries are turned into a tuple
+of step functions once, when the ability is defined. Casting runs the steps
+in order. Each step is called as step(caster, targets, events), where caster
+and targets are Combatant views and events is the combat event list. New
+effect types are added with register_effect(), without touching the combat
+rules.
+
+Effect dictionaries:
+    {'type': 'damage', 'amount': 20}                 damage the target
+    {'type': 'damage', 'amount': 20, 'area': True}   damage every target
+    {'type': 'heal', 'amount': 25}                   heal the caster
+    {'type': 'lifesteal', 'amount': 20, 'ratio': 0.5}
+                                                     damage the target and heal the caster
+                                                     for a share of the damage done
+Status effect dictionaries ('area': True also works here):
+    {'type': 'poison', 'damage': 5, 'duration': 3}   afflict the target
+    {'type': 'poison', 'damage': 5, 'duration': 3, 'max_stacks': 3}
+                                                     damage over time that stacks on reapplication
+    {'type': 'defense_buff', 'amount': 5, 'duration': 3}
+                                                     *_buff effects are applied to the caster
+"""
+from collections import namedtuple
+
+Effect = namedtuple('Effect', ['type', 'turns_left', 'damage', 'amount', 'stacks'], defaults=(None, None, None))
+
+
+class Combatant:
+    """A mutable view of one side of a fight while a round is being resolved."""
+    __slots__ = ('side', 'health', 'max_health', 'base_defense', 'effects')
+
+    def __init__(self, side, health, max_health, base_defense, effects):
+        self.side = side
+        self.health = health
+        self.max_health = max_health
+        self.base_defense = base_defense
+        self.effects = effects
+
+    @property
+    def defense(self):
+        return self.base_defense + modifier(self.effects, 'defense')
+
+
+def modifier(effects, stat):
+    """Returns the total buff minus debuff for 'attack' or 'defense'."""
+    bonus = 0
+    for effect in effects:
+        if effect.type == stat + '_buff':
+            bonus += effect.amount or 0
+        elif effect.type == stat + '_debuff':
+            bonus -= effect.amount or 0
+    return bonus
+
+
+def mitigate(damage, defense):
+    """Damage that gets through defense; at least 1, so you can always hurt an enemy."""
+    return max(1, damage - defense)
+
+
+def effect_from_dict(effect):
+    """Converts a status effect dictionary (with 'duration' or 'turns_left') to an Effect."""
+    return Effect(effect['type'], effect.get('turns_left', effect.get('duration', 1)),
+                  effect.get('damage'), effect.get('amount'), effect.get('stacks'))
+
+
+def add_effect(effects, status_effect, side, events):
+    """
+    Returns the effects with a status effect added. An effect of the same type
+    is refreshed instead of stacking, unless the status allows 'max_stacks',
+    in which case its damage grows by one application per stack.
+    """
+    for i, existing in enumerate(effects):
+        if existing.type == status_effect['type']:
+            stacks = existing.stacks or 1
+            if stacks < status_effect.get('max_stacks', 1):
+                existing = existing._replace(damage=(existing.damage or 0) + status_effect.get('damage', 0), stacks=stacks + 1)
+                events.append(('effect_stacked', side, existing.type, stacks + 1))
+            else:
+                events.append(('effect_refreshed', side, existing.type))
+            return effects[:i] + (existing._replace(turns_left=status_effect['duration']),) + effects[i + 1:]
+    events.append(('effect_applied', side, status_effect['type']))
+    return effects + (effect_from_dict(status_effect),)
+
+
+def _chosen(targets, area):
+    return targets if area else targets[:1]
+
+
+def damage_step(effect):
+    amount, area = effect['amount'], effect.get('area', False)
+    def step(caster, targets, events):
+        for target in _chosen(targets, area):
+            taken = mitigate(amount, target.defense)
+            target.health -= taken
+            events.append(('damage', target.side, taken))
+    return step
+
+
+def heal_step(effect):
+    amount = effect['amount']
+    def step(caster, targets, events):
+        healed = min(amount, caster.max_health - caster.health)
+        caster.health += healed
+        events.append(('heal', caster.side, healed))
+    return step
+
+
+def lifesteal_step(effect):
+    amount, ratio, area = effect['amount'], effect.get('ratio', 0.5), effect.get('area', False)
+    def step(caster, targets, events):
+        total = 0
+        for target in _chosen(targets, area):
+            taken = mitigate(amount, target.defense)
+            target.health -= taken
+            total += taken
+            events.append(('damage', target.side, taken))
+        healed = min(int(total * ratio), caster.max_health - caster.health)
+        caster.health += healed
+        events.append(('heal', caster.side, healed))
+    return step
+
+
+def status_step(status_effect):
+    area = status_effect.get('area', False)
+    on_caster = status_effect['type'].endswith('_buff')
+    def step(caster, targets, events):
+        for target in ((caster,) if on_caster else _chosen(targets, area)):
+            target.effects = add_effect(target.effects, status_effect, target.side, events)
+    return step
+
+
+# Effect type -> function that compiles an effect dictionary into a step
+EFFECT_STEPS = {
+    'damage': damage_step,
+    'heal': heal_step,
+    'lifesteal': lifesteal_step,
+}
+
+
+def register_effect(effect_type, compile_step):
+    """
+    Adds a new effect type.
+    :param effect_type: The 'type' used in ability effect dictionaries.
+    :param compile_step: A function taking the effect dictionary and returning a step(caster, targets, events).
+    """
+    EFFECT_STEPS[effect_type] = compile_step
+
+
+def compile_pipeline(effect, status_effect):
+    """Compiles an ability's effect and status effect into a tuple of steps."""
+    steps = []
+    if effect:
+        steps.append(EFFECT_STEPS[effect['type']](effect))
+    if status_effect:
+        steps.append(status_step(status_effect))
+    return tuple(steps)
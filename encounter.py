@@ -0,0 +1,242 @@
+"""
+Group encounters: the player against several monsters at once.
+
+Turns are taken in initiative order from a priority queue keyed on the time
+of each combatant's next action, so faster combatants act more often and
+finding who acts next costs O(log n) however many monsters join the fight.
+Fallen monsters are not removed from the queue; they are skipped when their
+entry comes up. Status effects tick only at the start of their owner's turn.
+
+The rules are the ones in combat.py: the player's stance lasts until their
+next turn, each monster's stance lasts until its next turn, and abilities
+run their effect pipelines, with area abilities hitting every living enemy.
+Like combat_round(), Encounter never prints or asks for input; front ends
+call next_actor(), then player_turn() or monster_turn(), and turn the
+returned events into text with describe(). Monster sides in events are the
+monster's index in the encounter. Besides combat.py's events there are:
+    ('slain', index)                        a monster falls
+"""
+import heapq
+
+import combat
+from effects import Combatant, modifier
+from enemy_ai import enemy_decision
+
+INITIATIVE_BASE = 10   # Speed of a combatant with no Agility
+INITIATIVE_SCALE = 100 # Time between actions is INITIATIVE_SCALE / speed
+
+# Events whose second element is the side they happen to
+SIDE_EVENTS = {'turn', 'effect_damage', 'effect_active', 'stunned', 'effect_ends', 'effect_applied',
+               'effect_refreshed', 'effect_stacked', 'damage', 'heal', 'slain'}
+
+
+def speed(fighter):
+    """Returns how often a fighter acts; Agility makes the player faster."""
+    return INITIATIVE_BASE + fighter.agility
+
+
+class Encounter:
+    """
+    The state of one group fight.
+    """
+    def __init__(self, player, monsters, rng):
+        """
+        Starts an encounter with rolled initiative.
+        :param player: The player's Fighter snapshot.
+        :param monsters: A list of monster Fighter snapshots.
+        :param rng: The random number generator for initiative rolls.
+        """
+        self.player = player
+        self.monsters = list(monsters)
+        self.stances = [None] * len(self.monsters) # Each monster's action from its last turn
+        self.player_action = None # The player's action from their last turn
+        self.living = sum(1 for monster in self.monsters if monster.health > 0)
+        self.outcome = None
+        self.now = 0.0
+        self._seq = 0
+        self._queue = []
+        self._schedule(combat.PLAYER, rng.random() * INITIATIVE_SCALE / speed(player))
+        for index, monster in enumerate(self.monsters):
+            if monster.health > 0:
+                self._schedule(index, rng.random() * INITIATIVE_SCALE / speed(monster))
+
+    def _schedule(self, actor, time):
+        self._seq += 1
+        heapq.heappush(self._queue, (time, self._seq, actor))
+
+    def _fighter(self, actor):
+        return self.player if actor == combat.PLAYER else self.monsters[actor]
+
+    def next_actor(self):
+        """Returns who acts next: combat.PLAYER or a monster index."""
+        while True:
+            time, _, actor = heapq.heappop(self._queue)
+            fighter = self._fighter(actor)
+            if fighter.health > 0:
+                self.now = time
+                self._schedule(actor, time + INITIATIVE_SCALE / speed(fighter))
+                return actor
+
+    def living_monsters(self):
+        """Returns the indexes of the monsters still standing."""
+        return [index for index, monster in enumerate(self.monsters) if monster.health > 0]
+
+    def _hurt_monster(self, index, damage, events):
+        monster = self.monsters[index]
+        self.monsters[index] = monster._replace(health=monster.health - damage)
+        self._check_slain(index, monster.health, events)
+
+    def _check_slain(self, index, health_before, events):
+        monster = self.monsters[index]
+        if health_before > 0 and monster.health <= 0:
+            self.living -= 1
+            events.append(('slain', index))
+            events.append(('xp', 'Attack', monster.xp_yield // 2))
+            events.append(('xp', 'Defense', monster.xp_yield // 2))
+            if not self.living:
+                self.outcome = 'victory'
+                events.append(('victory',))
+
+    def _check_defeat(self, events):
+        if self.player.health <= 0 and not self.outcome:
+            self.outcome = 'defeat'
+            events.append(('defeat',))
+
+    def player_turn(self, action, target, rng, spell=None):
+        """
+        Resolves the player's turn.
+        :param action: 'a', 'd', 'p', 'c', 'f' or None, as for combat.combat_round().
+        :param target: The index of the monster to attack or cast at.
+        :param rng: The random number generator.
+        :param spell: For 'c', the index of the ability in player.abilities.
+        :return: A list of events.
+        """
+        events = [('turn', combat.PLAYER)]
+        player = self.player
+        health, effects, stunned = combat.tick_effects(player.health, player.effects, combat.PLAYER, events)
+        self.player = player = player._replace(health=health, effects=effects)
+        self._check_defeat(events)
+        if self.outcome:
+            return events
+
+        action = None if stunned else action
+        self.player_action = action
+        if action in ('a', 'c') and (target is None or not 0 <= target < len(self.monsters) or self.monsters[target].health <= 0):
+            events.append(('hesitate',))
+            return events
+        if action == 'a':
+            events.append(('attack',))
+            monster = self.monsters[target]
+            damage = combat.player_strike(player.attack + modifier(player.effects, 'attack'),
+                                          monster.defense + modifier(monster.effects, 'defense'),
+                                          self.stances[target], target, events)
+            self._hurt_monster(target, damage, events)
+        elif action == 'd':
+            events.append(('defend',))
+        elif action == 'p':
+            events.append(('parry',))
+            events.append(('xp', 'Attack', 2))
+        elif action == 'c':
+            self._player_cast(target, spell, events)
+        elif action == 'f':
+            strongest = max(self.living_monsters(), key=lambda index: self.monsters[index].attack)
+            chance = combat.flee_chance(player, self.monsters[strongest])
+            events.append(('flee_chance', chance))
+            if rng.random() < chance:
+                events.append(('fled',))
+                self.outcome = 'fled'
+            else:
+                events.append(('flee_failed',))
+        elif action is not None:
+            events.append(('hesitate',))
+        return events
+
+    def _player_cast(self, target, spell, events):
+        player = self.player
+        if spell is None or not 0 <= spell < len(player.abilities):
+            events.append(('hesitate',))
+            return
+        ability = player.abilities[spell]
+        if player.mana < ability.mana_cost:
+            events.append(('no_mana',))
+            return
+        events.append(('cast', ability.name))
+        if ability.effect:
+            events.append(('xp', 'Magic', 5))
+        # Only area abilities need every living monster.
+        indexes = self.living_monsters() if ability.area else [target]
+        caster = Combatant(combat.PLAYER, player.health, player.max_health, player.defense, player.effects)
+        targets = [Combatant(index, self.monsters[index].health, self.monsters[index].max_health,
+                             self.monsters[index].defense, self.monsters[index].effects) for index in indexes]
+        ability.cast(caster, targets, events)
+        self.player = player._replace(health=caster.health, mana=player.mana - ability.mana_cost, effects=caster.effects)
+        for view in targets:
+            before = self.monsters[view.side].health
+            self.monsters[view.side] = self.monsters[view.side]._replace(health=view.health, effects=view.effects)
+            self._check_slain(view.side, before, events)
+
+    def monster_turn(self, index, rng, ai_rng=None):
+        """
+        Resolves a monster's turn.
+        :param index: The monster's index, as returned by next_actor().
+        :param rng: The random number generator.
+        :param ai_rng: The generator for the monster's decisions; defaults to rng.
+        :return: A list of events.
+        """
+        if ai_rng is None:
+            ai_rng = rng
+        events = [('turn', index)]
+        monster = self.monsters[index]
+        before = monster.health
+        health, effects, stunned = combat.tick_effects(monster.health, monster.effects, index, events)
+        self.monsters[index] = monster = monster._replace(health=health, effects=effects)
+        self._check_slain(index, before, events)
+        if self.outcome or monster.health <= 0:
+            return events
+
+        stance, weights = enemy_decision(monster.health, monster.max_health, self.player_action, ai_rng)
+        self.stances[index] = None if stunned else stance
+        if stunned:
+            return events
+        events.append(('enemy_considers', weights))
+        player = self.player
+        p_defense = player.defense + modifier(player.effects, 'defense')
+        affordable = [ability for ability in monster.abilities if monster.mana >= ability.mana_cost]
+        if affordable and ai_rng.random() < combat.ABILITY_CHANCE:
+            ability = ai_rng.choice(affordable)
+            events.append(('enemy_ability', ability.name))
+            caster = Combatant(index, monster.health, monster.max_health, monster.defense, monster.effects)
+            target = Combatant(combat.PLAYER, player.health, player.max_health, player.defense, player.effects)
+            ability.cast(caster, (target,), events)
+            self.monsters[index] = monster._replace(health=caster.health, mana=monster.mana - ability.mana_cost, effects=caster.effects)
+            self.player = player._replace(health=target.health, effects=target.effects)
+        elif stance == 'attack':
+            damage = combat.enemy_strike(monster.attack + modifier(monster.effects, 'attack'), p_defense,
+                                         self.player_action, player.agility, events)
+            self.player = player._replace(health=player.health - damage)
+            if self.player_action == 'p' and rng.random() < combat.COUNTER_CHANCE:
+                counter = combat.counter_strike(player.attack + modifier(player.effects, 'attack'),
+                                                monster.defense + modifier(monster.effects, 'defense'), index, events)
+                self._hurt_monster(index, counter, events)
+        else:
+            events.append(('enemy_stance', stance))
+        self._check_defeat(events)
+        return events
+
+    def describe(self, event, player_name, subject=None):
+        """
+        Returns the text for an event, like combat.describe().
+        :param subject: The index of the monster the event concerns when the event
+                        itself doesn't say (the acting monster or the player's target).
+        """
+        if event[0] == 'turn' and event[1] != combat.PLAYER:
+            return f"\n--- {self.monsters[event[1]].name}'s turn ---"
+        if event[0] in SIDE_EVENTS and event[1] != combat.PLAYER:
+            subject = event[1]
+            event = (event[0], combat.MONSTER) + event[2:]
+        monster_name = self.monsters[subject].name if subject is not None else "enemies"
+        if event[0] == 'slain':
+            return f"The {monster_name} falls!"
+        if event[0] == 'victory':
+            return "\nYou have defeated all of your foes!"
+        return combat.describe(event, player_name, monster_name)
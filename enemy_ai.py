@@ -1,13 +1,18 @@
 import random
+from bisect import bisect
 
-def enemy_decision(enemy_hp, enemy_max_hp, player_last_action):
+import numpy as np
+
+ACTIONS = ('attack', 'defend', 'parry')
+LAST_ACTIONS = (None, 'a', 'd', 'p') # Any other player action is treated like None
+
+def decision_weights(low_hp, player_last_action):
     """
-    Determines the enemy's action based on weighted probabilities.
+    Returns the enemy's unnormalized action weights for a situation.
 
-    :param enemy_hp: Current HP of the enemy.
-    :param enemy_max_hp: Maximum HP of the enemy.
+    :param low_hp: True if the enemy is below 30% of its maximum HP.
     :param player_last_action: The player's last action ('a', 'd', 'p').
-    :return: A tuple containing the chosen action ('attack', 'defend', 'parry') and the final weights.
+    :return: A dictionary of action -> weight.
     """
     # Base weights
     weights = {
@@ -18,7 +23,7 @@ def enemy_decision(enemy_hp, enemy_max_hp, player_last_action):
 
     # Modify weights based on context
     # 1. Enemy HP is low
-    if (enemy_hp / enemy_max_hp) < 0.3:
+    if low_hp:
         weights['defend'] += 20
 
     # 2. Player's last action
@@ -28,18 +33,83 @@ def enemy_decision(enemy_hp, enemy_max_hp, player_last_action):
         weights['parry'] += 15
     elif player_last_action == 'p':
         weights['attack'] += 15
+    return weights
+
+def _build_tables():
+    """
+    Precomputes, for every (low_hp, last action) situation, the cumulative
+    weights and total used to draw an action, and the weights as percentage
+    strings for display.
+    """
+    cumulative, percentages = {}, {}
+    for low_hp in (False, True):
+        for last_action in LAST_ACTIONS:
+            weights = decision_weights(low_hp, last_action)
+            running, cum = 0, []
+            for action in ACTIONS:
+                running += weights[action]
+                cum.append(running)
+            cumulative[(low_hp, last_action)] = (tuple(cum), running)
+            percentages[(low_hp, last_action)] = {action: f"{weights[action] / running:.1%}" for action in ACTIONS}
+    return cumulative, percentages
+
+# (low_hp, last action) -> (cumulative weights, total weight)
+DECISION_TABLE, DECISION_PERCENTAGES = _build_tables()
+
+# The same table for batches: [low_hp, LAST_ACTIONS index] -> cumulative attack and defend probabilities
+DECISION_THRESHOLDS = np.array([[[cum[0] / total, cum[1] / total]
+                                 for cum, total in (DECISION_TABLE[(low_hp, last)] for last in LAST_ACTIONS)]
+                                for low_hp in (False, True)])
+
+def _situation(enemy_hp, enemy_max_hp, player_last_action):
+    if player_last_action not in LAST_ACTIONS:
+        player_last_action = None
+    return ((enemy_hp / enemy_max_hp) < 0.3, player_last_action)
+
+def decide(enemy_hp, enemy_max_hp, player_last_action, rng=random):
+    """
+    Draws the enemy's action with a single random number.
 
-    # Normalize weights to ensure they sum to 100
-    total_weight = sum(weights.values())
-    normalized_weights = {action: (weight / total_weight) for action, weight in weights.items()}
+    :param enemy_hp: Current HP of the enemy.
+    :param enemy_max_hp: Maximum HP of the enemy.
+    :param player_last_action: The player's last action ('a', 'd', 'p').
+    :param rng: The random number generator to draw from (defaults to the random module).
+    :return: The chosen action ('attack', 'defend' or 'parry').
+    """
+    cum, total = DECISION_TABLE[_situation(enemy_hp, enemy_max_hp, player_last_action)]
+    return ACTIONS[bisect(cum, rng.random() * total, 0, 2)]
+
+def decide_many(enemy_hps, enemy_max_hps, player_last_actions, rng):
+    """
+    Draws actions for many enemies at once, as NumPy array operations.
 
-    # Randomly select an action based on the normalized weights
-    actions = list(normalized_weights.keys())
-    probabilities = list(normalized_weights.values())
-    
-    chosen_action = random.choices(actions, weights=probabilities, k=1)[0]
+    :param enemy_hps: An array of current enemy HPs.
+    :param enemy_max_hps: The enemies' maximum HPs: an array, or one value for all.
+    :param player_last_actions: The player's last action against each enemy: an array, or one action for all.
+    :param rng: A numpy.random.Generator.
+    :return: An array of indexes into ACTIONS, one per enemy.
+    """
+    enemy_hps = np.asarray(enemy_hps)
+    low_hp = (enemy_hps < 0.3 * np.asarray(enemy_max_hps)).astype(np.intp)
+    last = np.asarray(player_last_actions, dtype=object)
+    # Any action not in LAST_ACTIONS falls through to index 0, like None
+    situation = np.select([last == action for action in LAST_ACTIONS[1:]], range(1, len(LAST_ACTIONS)), 0)
+    thresholds = DECISION_THRESHOLDS[low_hp, situation]
+    roll = rng.random(enemy_hps.shape)
+    return (roll >= thresholds[..., 0]).astype(np.intp) + (roll >= thresholds[..., 1])
 
-    # For debugging, let's format the final weights as percentages
-    final_weights_percent = {action: f"{prob:.1%}" for action, prob in normalized_weights.items()}
+def enemy_decision(enemy_hp, enemy_max_hp, player_last_action, rng=random):
+    """
+    Determines the enemy's action based on weighted probabilities, drawn
+    from the precomputed cumulative table with a single random number.
 
-    return chosen_action, final_weights_percent
\ No newline at end of file
+    :param enemy_hp: Current HP of the enemy.
+    :param enemy_max_hp: Maximum HP of the enemy.
+    :param player_last_action: The player's last action ('a', 'd', 'p').
+    :param rng: The random number generator to draw from (defaults to the random module).
+    :return: A tuple containing the chosen action ('attack', 'defend', 'parry') and the final
+             weights as percentage strings. The weights dictionary is shared; don't modify it.
+    """
+    situation = _situation(enemy_hp, enemy_max_hp, player_last_action)
+    cum, total = DECISION_TABLE[situation]
+    return ACTIONS[bisect(cum, rng.random() * total, 0, 2)], DECISION_PERCENTAGES[situation]
@@ -0,0 +1,286 @@
+import heapq
+import math
+
+from rng import random_streams, WORLD
+
+world_random = random_streams.get(WORLD) # This module's random stream
+
+
+class FactionEventType:
+    """
+    Describes one kind of faction world event (a raid, a caravan, a ritual...).
+    Subclasses set the class attributes below and override start()/end() to
+    change the world while the event runs.
+    """
+    key = None
+    faction = None
+    tile_types = ()       # Grid tile types the event can take place on
+    spawn_chance = 0.0    # Chance per turn that a new event of this type begins
+    duration = (20, 40)   # Min and max length of the event in turns
+    tiles_per_event = 10  # At most one active event per this many candidate tiles
+    max_active = None     # Hard cap on concurrent events, regardless of map size
+
+    def is_candidate(self, location):
+        """Returns True if a location can ever host this event. Used to build the tile index."""
+        return location.get("type") in self.tile_types
+
+    def can_start(self, location):
+        """Returns True if the event can start at a location right now."""
+        return True
+
+    def active_limit(self, num_candidates):
+        """Returns how many events of this type may run at once on a map with this many candidates."""
+        limit = max(1, num_candidates // self.tiles_per_event)
+        if self.max_active is not None:
+            limit = min(limit, self.max_active)
+        return limit
+
+    def start(self, event, location):
+        """Applies the event to its location. Returns the announcement to print."""
+        raise NotImplementedError
+
+    def end(self, event, location):
+        """Undoes the event at its location. Returns the message to print."""
+        raise NotImplementedError
+
+
+class BanditRaid(FactionEventType):
+    """Bandits drive the locals out of a settlement until they are chased off."""
+    key = "bandit_raid"
+    faction = "bandits"
+    tile_types = ("village", "camp", "plains")
+    spawn_chance = 0.02
+    duration = (20, 40)
+    tiles_per_event = 3
+
+    def is_candidate(self, location):
+        return super().is_candidate(location) and bool(location.get("npcs"))
+
+    def can_start(self, location):
+        return bool(location.get("npcs"))
+
+    def start(self, event, location):
+        # Store the original NPCs and replace them with bandits
+        event["original_npcs"] = list(location.get("npcs", []))
+        location["npcs"] = []
+        event["monsters"] = ["bandit"] * world_random.randint(2, 4)
+        return f"Word on the road is that bandits are raiding {location['name']}!"
+
+    def end(self, event, location):
+        location.setdefault("npcs", []).extend(event.get("original_npcs", []))
+        return f"The bandits have been driven from {location['name']} and the villagers are returning."
+
+
+class MerchantCaravan(FactionEventType):
+    """A Merchant Guild caravan sets up shop in a settlement for a while."""
+    key = "merchant_caravan"
+    faction = "merchant_guild"
+    tile_types = ("town", "village", "fort", "camp")
+    spawn_chance = 0.015
+    duration = (15, 30)
+    tiles_per_event = 2
+    goods = ("iron_bar", "leather", "thread", "greater_healing_potion", "shadowsilk")
+
+    def start(self, event, location):
+        import world as world_module
+        from npc import Shopkeeper
+        merchant = Shopkeeper(
+            name="Caravan Trader",
+            description="A travelling trader of the Merchant Guild, minding a wagon piled with crates.",
+            dialogue="Fresh from the roads! Buy now, we move on soon.",
+            personality={'friendliness': 6, 'grumpiness': 3, 'talkativeness': 6},
+            faction=self.faction
+        )
+        merchant.current_location_key = event["location_key"]
+        merchant.restock_interval = 0 # Sells what it brought, then moves on
+        for item_name in world_random.sample(self.goods, 3):
+            merchant.add_item(getattr(world_module, item_name))
+        location.setdefault("npcs", []).append(merchant)
+        event["npc_names"] = [merchant.name]
+        return f"A Merchant Guild caravan has arrived at {location['name']}."
+
+    def end(self, event, location):
+        return f"The caravan at {location['name']} has packed up and moved on."
+
+
+class CultRitual(FactionEventType):
+    """Cultists of the Forgotten Pact gather at a desolate place to perform a rite."""
+    key = "cult_ritual"
+    faction = "cult_of_the_pact"
+    tile_types = ("ruins", "ash_plains", "swamp", "mountains")
+    spawn_chance = 0.01
+    duration = (10, 25)
+    tiles_per_event = 20
+
+    def start(self, event, location):
+        event["monsters"] = ["cult fanatic"] + ["ashbound_cultist"] * world_random.randint(1, 3)
+        return f"Strange chanting echoes from {location['name']}. The Cult of the Forgotten Pact is performing a ritual!"
+
+    def end(self, event, location):
+        return f"The chanting at {location['name']} has fallen silent."
+
+
+class FactionEventEngine:
+    """
+    Runs any number of concurrent faction events.
+
+    Candidate tiles for each event type are indexed once per world, and all
+    future work (the next spawn attempt of each type and the expiry of each
+    active event) sits in a single heap ordered by turn, so a turn on which
+    nothing is due costs one comparison.
+    """
+    START_ATTEMPTS = 8 # Random candidate tiles tried before giving up on a spawn
+
+    def __init__(self, event_types):
+        self.event_types = {event_type.key: event_type for event_type in event_types}
+        self.candidates = {}  # event type key -> list of grid location keys
+        self.active = {}      # event id -> event dictionary
+        self.occupied = {}    # location key -> event id
+        self.schedule = []    # heap of (turn, sequence, action, payload)
+        self.next_id = 1
+        self._sequence = 0
+        self._spawned = {}    # event id -> monster objects placed in the world
+
+    def build_index(self, world_state):
+        """Indexes the grid tiles each event type can take place on."""
+        self.candidates = {key: [] for key in self.event_types}
+        for r, row in enumerate(world_state["grid"]):
+            for c, location in enumerate(row):
+                for key, event_type in self.event_types.items():
+                    if event_type.is_candidate(location):
+                        self.candidates[key].append((r, c))
+
+    def attach(self, world_state, turn):
+        """Prepares the engine to run on a world, starting at the given turn."""
+        self.build_index(world_state)
+        scheduled = {payload for _, _, action, payload in self.schedule if action == "spawn"}
+        for key in self.event_types:
+            if key not in scheduled:
+                self._schedule_spawn(key, turn)
+
+    def _push(self, turn, action, payload):
+        self._sequence += 1
+        heapq.heappush(self.schedule, (turn, self._sequence, action, payload))
+
+    def _schedule_spawn(self, key, turn):
+        """Schedules the next turn on which an event of this type begins."""
+        chance = self.event_types[key].spawn_chance
+        if chance <= 0:
+            return
+        # Draw the wait directly from the geometric distribution instead of
+        # rolling the per-turn chance every turn.
+        wait = 1
+        if chance < 1:
+            wait += int(math.log(1.0 - world_random.random()) / math.log(1.0 - chance))
+        self._push(turn + wait, "spawn", key)
+
+    def process(self, world_state, turn):
+        """Starts and ends every event that has come due by the given turn."""
+        schedule = self.schedule
+        while schedule and schedule[0][0] <= turn:
+            due_turn, _, action, payload = heapq.heappop(schedule)
+            if action == "expire":
+                self._end_event(world_state, payload)
+            else:
+                self._try_start(world_state, payload, due_turn, turn)
+                self._schedule_spawn(payload, due_turn)
+
+    def _try_start(self, world_state, key, start_turn, turn):
+        event_type = self.event_types[key]
+        candidates = self.candidates.get(key)
+        if not candidates:
+            return
+        active_count = sum(1 for event in self.active.values() if event["type"] == key)
+        if active_count >= event_type.active_limit(len(candidates)):
+            return
+        end_turn = start_turn + world_random.randint(*event_type.duration)
+        if end_turn <= turn:
+            return # The whole event would have come and gone while time skipped ahead
+        for _ in range(self.START_ATTEMPTS):
+            location_key = world_random.choice(candidates)
+            location = world_state["grid"][location_key[0]][location_key[1]]
+            if location_key in self.occupied or not event_type.can_start(location):
+                continue
+            event = {
+                "id": self.next_id, "type": key, "location_key": location_key,
+                "start_turn": start_turn, "end_turn": end_turn, "monsters": [], "npc_names": []
+            }
+            self.next_id += 1
+            message = event_type.start(event, location)
+            self.active[event["id"]] = event
+            self.occupied[location_key] = event["id"]
+            self._place_monsters(event, location)
+            self._push(end_turn, "expire", event["id"])
+            print(f"\n[World Event] {message}")
+            return
+
+    def _end_event(self, world_state, event_id):
+        event = self.active.pop(event_id, None)
+        if event is None:
+            return
+        self.occupied.pop(event["location_key"], None)
+        r, c = event["location_key"]
+        location = world_state["grid"][r][c]
+        self._remove_monsters(event, location)
+        if event["npc_names"]:
+            location["npcs"] = [npc for npc in location.get("npcs", []) if npc.name not in event["npc_names"]]
+        message = self.event_types[event["type"]].end(event, location)
+        print(f"\n[World Event] {message}")
+
+    def _place_monsters(self, event, location):
+        from world import monster_mapping # Import here to avoid circular dependency issues
+        spawned = [monster_mapping[name]() for name in event["monsters"] if name in monster_mapping]
+        location.setdefault("monsters", []).extend(spawned)
+        self._spawned[event["id"]] = spawned
+
+    def _remove_monsters(self, event, location):
+        spawned = {id(monster) for monster in self._spawned.pop(event["id"], [])}
+        if spawned:
+            location["monsters"] = [m for m in location.get("monsters", []) if id(m) not in spawned]
+
+    def reapply(self, world_state):
+        """Puts event monsters back after the world's monsters have been respawned."""
+        for event in self.active.values():
+            r, c = event["location_key"]
+            location = world_state["grid"][r][c]
+            self._remove_monsters(event, location)
+            self._place_monsters(event, location)
+
+    def get_state(self):
+        """Returns the engine's state for saving."""
+        return {
+            "next_id": self.next_id,
+            "active": list(self.active.values()),
+            "schedule": [[turn, action, payload] for turn, _, action, payload in sorted(self.schedule)],
+        }
+
+    def load_state(self, state, world_state, turn):
+        """
+        Restores a saved engine state onto a loaded world.
+        :param state: A dictionary from get_state(), or an older save's faction event dictionary.
+        """
+        self.active, self.occupied, self.schedule, self._spawned = {}, {}, [], {}
+        self.next_id = state.get("next_id", 1)
+
+        # Older saves kept a single bandit raid; give any displaced villagers back.
+        old_raid = state.get("bandit_raid")
+        if old_raid and old_raid.get("is_active") and old_raid.get("location_key"):
+            r, c = old_raid["location_key"]
+            world_state["grid"][r][c].setdefault("npcs", []).extend(old_raid.get("original_npcs", []))
+
+        for event in state.get("active", []):
+            if event.get("type") not in self.event_types:
+                continue
+            event["location_key"] = tuple(event["location_key"])
+            self.active[event["id"]] = event
+            self.occupied[event["location_key"]] = event["id"]
+            self._push(event["end_turn"], "expire", event["id"])
+        for due_turn, action, payload in state.get("schedule", []):
+            if action == "spawn" and payload in self.event_types:
+                self._push(due_turn, action, payload)
+        self.attach(world_state, turn)
+        self.reapply(world_state)
+
+
+# A global instance to be used throughout the game
+faction_event_engine = FactionEventEngine([BanditRaid(), MerchantCaravan(), CultRitual()])
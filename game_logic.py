@@ -1,7 +1,8 @@
-import random
 from player import Player
 from world import world, default_recipes, dungeon_generator
-from enemy_ai import enemy_decision
+import combat
+import spawning
+from rng import random_streams, COMBAT, AI, WORLDGEN
 from item import Key
 import pickle
 import os
@@ -50,13 +51,8 @@ class Game:
 
     def _respawn_monsters(self):
         """Respawns monsters in the world."""
-        from world import monster_mapping
-        for row in self.world["grid"]:
-            for loc_data in row:
-                loc_data["monsters"] = []
-                for name in loc_data.get("enemies", []):
-                    if name in monster_mapping:
-                        loc_data["monsters"].append(monster_mapping[name]())
+        locations = [loc_data for row in self.world["grid"] for loc_data in row]
+        spawning.populate(locations, self.game_state['time_of_day'] == "Night", random_streams.get(WORLDGEN))
 
     def _update_npc_availability(self):
         """Updates NPC availability based on time."""
@@ -130,7 +126,7 @@ class Game:
 
             if isinstance(destination, dict) and destination.get('locked'):
                 key_id = destination.get('key_id')
-                key_in_inventory = next((item for item in self.player.inventory if isinstance(item, Key) and item.unlocks_what == key_id), None)
+                key_in_inventory = next((item for item in self.player.inventory.unique_items() if isinstance(item, Key) and item.unlocks_what == key_id), None)
                 if key_in_inventory:
                     self.player.inventory.remove(key_in_inventory)
                     unlocked_destination = destination['destination']
@@ -187,7 +183,7 @@ class Game:
 
     def handle_drop_item(self, item_name):
         """Handles the player dropping an item."""
-        item_to_drop = next((item for item in self.player.inventory if item.name == item_name), None)
+        item_to_drop = self.player.inventory.get(item_name)
         if not item_to_drop:
             return f"You don't have a '{item_name}' in your inventory."
 
@@ -201,7 +197,7 @@ class Game:
     def handle_use_item(self, item_name):
         """Handles the player using a consumable item."""
         from item import Consumable
-        item_to_use = next((item for item in self.player.inventory if item.name == item_name), None)
+        item_to_use = self.player.inventory.get(item_name)
 
         if not item_to_use:
             return f"You don't have a '{item_name}'."
@@ -220,7 +216,7 @@ class Game:
     def handle_equip_item(self, item_name):
         """Equips an item from the player's inventory."""
         from item import Weapon, Armor
-        item_to_equip = next((item for item in self.player.inventory if item.name == item_name), None)
+        item_to_equip = self.player.inventory.get(item_name)
         if not item_to_equip:
             return f"You don't have a {item_name}."
 
@@ -287,89 +283,22 @@ class Game:
         if not self.in_combat or not self.combat_target:
             return "You are not in combat."
 
-        log = []
-
-        # --- Player Action ---
-        player_damage_dealt = 0
-        if player_action == 'a':
-            # Player attacks do 10% more damage
-            player_damage_dealt = int(self.player.attack_power * 1.1)
-            log.append(f"You attack the {self.combat_target.name}!")
-        elif player_action == 'd':
-            log.append("You brace yourself for an attack.")
-        elif player_action == 'p':
-            log.append("You take a ready stance, preparing to parry.")
-            self.player.add_skill_xp("Attack", 2)
-
-        # --- Enemy AI Decision ---
-        monster_action, _ = enemy_decision(self.combat_target.health, self.combat_target.max_health, player_action)
-
-        # --- Resolve Player Damage ---
-        if player_damage_dealt > 0:
-            if monster_action == 'defend':
-                blocked = min(player_damage_dealt, self.combat_target.defense)
-                dealt = player_damage_dealt - blocked
-                log.append(f"{self.combat_target.name} defends, blocking {blocked} damage!")
-            elif monster_action == 'parry':
-                blocked = int(player_damage_dealt * 0.5)
-                dealt = player_damage_dealt - blocked
-                log.append(f"{self.combat_target.name} parries, blocking {blocked} damage!")
-            else: # Attack
-                dealt = max(1, player_damage_dealt - self.combat_target.defense)
-            
-            if dealt > 0:
-                self.combat_target.take_damage(dealt)
-                self.player.add_skill_xp("Attack", dealt)
-                log.append(f"Your attack deals {dealt} damage.")
+        state, events = combat.combat_round(combat.player_state(self.player), combat.monster_state(self.combat_target), player_action,
+                                            random_streams.get(COMBAT), ai_rng=random_streams.get(AI))
+        combat.apply_state(self.player, state.player)
+        combat.apply_state(self.combat_target, state.monster)
 
-        if not self.combat_target.is_alive():
-            self.in_combat = False
-            log.append(f"\nYou have defeated the {self.combat_target.name}!")
-            # Rebalanced XP distribution
-            xp_reward = self.combat_target.xp_yield
-            self.player.add_skill_xp("Attack", xp_reward // 2)
-            self.player.add_skill_xp("Defense", xp_reward // 2)
-            # Handle loot, victory, etc. here
-            return "\n".join(log)
-
-        # --- Resolve Enemy Action ---
-        if monster_action == 'attack':
-            # Enemies do 10% less damage
-            enemy_damage = int(self.combat_target.attack_power * 0.9)
-            log.append(f"The {self.combat_target.name} attacks for {enemy_damage} potential damage!")
-            if player_action == 'd':
-                blocked = min(enemy_damage, self.player.defense)
-                taken = enemy_damage - blocked
-                self.player.health -= taken
-                self.player.add_skill_xp("Defense", blocked)
-                log.append(f"You defend, blocking {blocked} and taking {taken} damage.")
-            elif player_action == 'p':
-                block_perc = 0.4 + (self.player.skills["Agility"].level * 0.01)
-                blocked = int(enemy_damage * block_perc)
-                taken = enemy_damage - blocked
-                self.player.health -= taken
-                self.player.add_skill_xp("Defense", blocked)
-                log.append(f"You parry, blocking {blocked} and taking {taken} damage.")
-                if random.random() < 0.25:
-                    counter_dmg = int(self.player.attack_power * 0.5)
-                    self.combat_target.take_damage(counter_dmg)
-                    self.player.add_skill_xp("Attack", counter_dmg)
-                    log.append(f"You counter-attack for {counter_dmg} damage!")
-            else:
-                mitigated = min(enemy_damage, self.player.defense)
-                taken = enemy_damage - mitigated
-                self.player.health -= taken
-                self.player.add_skill_xp("Defense", mitigated)
-                log.append(f"Your armor mitigates {mitigated}. You take {taken} damage.")
-        elif monster_action == 'defend':
-            log.append(f"{self.combat_target.name} takes a defensive stance.")
-        elif monster_action == 'parry':
-            log.append(f"{self.combat_target.name} readies itself to parry.")
-
-        if not self.player.is_alive():
+        log = []
+        for event in events:
+            if event[0] == 'xp':
+                self.player.add_skill_xp(event[1], event[2])
+            elif event[0] not in ('turn', 'enemy_considers'):
+                text = combat.describe(event, self.player.name, self.combat_target.name)
+                if text is not None:
+                    log.append(text)
+
+        if state.outcome is not None:
             self.in_combat = False
-            log.append("You have been defeated. Game Over.")
-
         return "\n".join(log)
 
     def save_game(self):
@@ -378,7 +307,8 @@ class Game:
             "player": self.player,
             "world": self.world,
             "game_state": self.game_state,
-            "current_dungeon": self.current_dungeon
+            "current_dungeon": self.current_dungeon,
+            "rng": random_streams.get_state()
         }
         try:
             with open(self.save_filename, "wb") as save_file:
@@ -216,7 +216,7 @@ class App(tk.Tk):
     def handle_item_action(self, action_type):
         try:
             selected_index = self.inv_list.curselection()[0]
-            item_name = self.inv_list.get(selected_index)
+            item_name = self.game.player.inventory.stacks()[selected_index][0].name
             
             feedback = None
             if action_type == "use":
@@ -289,8 +289,8 @@ class App(tk.Tk):
             self.skills_list.insert(tk.END, f"{name}: Lvl {skill.level} ({skill.xp}/{skill.xp_to_next_level})")
 
         self.inv_list.delete(0, tk.END)
-        for item in player.inventory:
-            self.inv_list.insert(tk.END, item.name)
+        for item, count in player.inventory.stacks():
+            self.inv_list.insert(tk.END, item.name if count == 1 else f"{item.name} x{count}")
 
         self.ground_list.delete(0, tk.END)
         for item in location.get("items", []):
@@ -0,0 +1,142 @@
+"""
+Stacked inventories.
+
+An Inventory holds one stack per item name: the item and how many of it
+there are. Counting, adding and removing any number of an item are dictionary
+operations, however much is carried, and stacks keep the order their items
+were first gained in. Iterating an Inventory yields every item once per copy,
+like the flat lists it replaces, so `for item in player.inventory` and
+`any(...)` checks keep working; use stacks() to show or walk it by stack.
+
+Items are shared definitions that only differ by name, so a stack keeps a
+single item object and a count.
+"""
+
+
+class Inventory:
+    """
+    A counted multiset of items, keyed by item name.
+    """
+    __slots__ = ('_stacks', '_size', 'version')
+
+    def __init__(self, items=()):
+        self._stacks = {} # item name -> [item, count], in the order first gained
+        self._size = 0
+        self.version = 0  # Bumped on every change, so views of the inventory can tell when to refresh
+        for item in items:
+            self.add(item)
+
+    def add(self, item, count=1):
+        """Adds `count` of an item."""
+        if count <= 0:
+            return
+        stack = self._stacks.get(item.name)
+        if stack is None:
+            self._stacks[item.name] = [item, count]
+        else:
+            stack[1] += count
+        self._size += count
+        self.version += 1
+
+    def remove(self, item, count=1):
+        """
+        Removes `count` of an item.
+        :param item: An item, or an item name.
+        :raises ValueError: If there aren't that many.
+        """
+        name = item if isinstance(item, str) else item.name
+        stack = self._stacks.get(name)
+        if stack is None or stack[1] < count:
+            raise ValueError(f"Not enough {name} in the inventory.")
+        stack[1] -= count
+        if stack[1] == 0:
+            del self._stacks[name]
+        self._size -= count
+        self.version += 1
+        return stack[0]
+
+    def take(self, name, count=1):
+        """Removes up to `count` of an item by name. Returns (item or None, number removed)."""
+        stack = self._stacks.get(name)
+        if stack is None:
+            return None, 0
+        count = min(count, stack[1])
+        return self.remove(name, count), count
+
+    def count(self, item):
+        """Returns how many of an item (or item name) there are."""
+        stack = self._stacks.get(item if isinstance(item, str) else item.name)
+        return stack[1] if stack else 0
+
+    def get(self, name):
+        """Returns the item with a given name, or None."""
+        stack = self._stacks.get(name)
+        return stack[0] if stack else None
+
+    def has_all(self, requirements):
+        """Returns True if there are at least `count` of every name -> count in requirements."""
+        return all(self.count(name) >= count for name, count in requirements.items())
+
+    def remove_all(self, requirements):
+        """Removes every name -> count in requirements. Check has_all() first."""
+        for name, count in requirements.items():
+            self.remove(name, count)
+
+    def stacks(self):
+        """Returns a list of (item, count) pairs in order."""
+        return [(item, count) for item, count in self._stacks.values()]
+
+    def unique_items(self):
+        """Returns one of each item, in order."""
+        return [stack[0] for stack in self._stacks.values()]
+
+    def clear(self):
+        self._stacks.clear()
+        self._size = 0
+        self.version += 1
+
+    # --- List compatibility ---
+
+    def append(self, item):
+        self.add(item)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def __iter__(self):
+        for item, count in list(self._stacks.values()):
+            for _ in range(count):
+                yield item
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, item):
+        return self.count(item) > 0
+
+    # --- Saving ---
+
+    def to_saved(self):
+        """Returns the inventory as a list of [item name, count] pairs."""
+        return [[item.name, count] for item, count in self._stacks.values()]
+
+    @classmethod
+    def from_saved(cls, saved, lookup):
+        """
+        Rebuilds an inventory from to_saved() data.
+        :param saved: A list of [name, count] pairs, a {name: count} mapping, or a list of names (from older saves).
+        :param lookup: A function that returns the item for a name, or None to drop it.
+        """
+        inventory = cls()
+        if isinstance(saved, dict):
+            saved = saved.items()
+        for entry in saved or ():
+            name, count = (entry, 1) if isinstance(entry, str) else entry
+            item = lookup(name)
+            if item is not None:
+                inventory.add(item, count)
+        return inventory
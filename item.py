@@ -1,7 +1,11 @@
-class Item:
+from record import Record
+
+class Item(Record):
     """
     Represents an item in the game.
     """
+    __slots__ = ('name', 'description', 'value', 'quest_item')
+
     def __init__(self, name, description, value=0, quest_item=False):
         """
         Initializes an Item object.
@@ -19,6 +23,8 @@ class Weapon(Item):
     """
     Represents a weapon item in the game.
     """
+    __slots__ = ('attack_bonus',)
+
     def __init__(self, name, description, value, attack_bonus):
         super().__init__(name, description, value)
         self.attack_bonus = attack_bonus
@@ -27,6 +33,8 @@ class Armor(Item):
     """
     Represents an armor item in the game.
     """
+    __slots__ = ('defense_bonus',)
+
     def __init__(self, name, description, value, defense_bonus):
         super().__init__(name, description, value)
         self.defense_bonus = defense_bonus
@@ -35,6 +43,8 @@ class Consumable(Item):
     """
     Represents a consumable item that can be used.
     """
+    __slots__ = ('effect', 'amount')
+
     def __init__(self, name, description, value, effect, amount):
         super().__init__(name, description, value)
         self.effect = effect  # e.g., "heal", "restore_mana"
@@ -44,6 +54,8 @@ class Spellbook(Item):
     """
     A special item that teaches the player a new ability when used.
     """
+    __slots__ = ('ability',)
+
     def __init__(self, name, description, value, ability):
         super().__init__(name, description, value)
         self.ability = ability
@@ -52,18 +64,22 @@ class Key(Item):
     """
     A simple key item that might unlock something.
     """
+    __slots__ = ('unlocks_what',)
+
     def __init__(self, name, description, value, unlocks_what=None):
         super().__init__(name, description, value)
         self.unlocks_what = unlocks_what # e.g., "door_to_dungeon_level_2"
 
 class Word(Item):
     """A special item representing a word of power for the Wordbinding skill."""
-    pass
+    __slots__ = ()
 
 class RecipeScroll(Item):
     """
     A special item that teaches the player a new recipe when used.
     """
+    __slots__ = ('recipe',)
+
     def __init__(self, name, description, value, recipe):
         super().__init__(name, description, value)
         self.recipe = recipe
@@ -9,6 +9,7 @@ from faction import Faction
 from ability import Ability
 from recipe import Recipe
 from resource_node import ResourceNode
+from inventory import Inventory
 
 
 class GameEncoder(json.JSONEncoder):
@@ -19,6 +20,8 @@ class GameEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, set):
             return list(obj) # Convert sets to lists
+        if isinstance(obj, Inventory):
+            return obj.to_saved() # Stacks of [item name, count]
         # ResourceNodes are static definitions and should not be saved.
         if isinstance(obj, ResourceNode):
             return None # This will result in 'null' in the JSON, which is fine.
@@ -30,20 +33,31 @@ class GameEncoder(json.JSONEncoder):
             if isinstance(obj, (Quest, Item, Recipe, Ability)):
                  d['name'] = obj.name
                  return d
-            # For other objects, we serialize their full state
-            obj_dict = obj.__dict__.copy()
-            # Exclude non-serializable utility objects
-            if isinstance(obj, ProceduralQuestGiver): # Exclude all blueprint/generator attributes
-                obj_dict.pop('quest_generator', None)
-                obj_dict.pop('templates', None)
-                obj_dict.pop('reputation_quests', None)
-            # For all NPCs, we don't need to save the schedule, as it's part of their definition
-            if isinstance(obj, NPC):
-                obj_dict.pop('schedule', None)
+            # Slotted objects describe their own saved state; the rest still
+            # serialize their instance dictionary.
+            if hasattr(obj, 'to_record'):
+                obj_dict = obj.to_record()
+            else:
+                obj_dict = obj.__dict__.copy()
             d.update(obj_dict)
             return d
         return super().default(obj)
 
+_npc_definition_cache = {}
+
+def _npc_definitions():
+    """Returns a name -> NPC lookup of the NPCs defined in the world template."""
+    if not _npc_definition_cache:
+        from world import world as world_definition
+        for row in world_definition['grid']:
+            for loc in row:
+                for npc_template in loc.get('npcs', []):
+                    _npc_definition_cache.setdefault(npc_template.name, npc_template)
+        for loc in world_definition['special'].values():
+            for npc_template in loc.get('npcs', []):
+                _npc_definition_cache.setdefault(npc_template.name, npc_template)
+    return _npc_definition_cache
+
 def decode_game_object(dct):
     """
     A custom JSON decoder hook. It checks for the '__class__' key to
@@ -60,31 +74,22 @@ def decode_game_object(dct):
         # For stateful objects, we reconstruct them.
         cls = globals().get(class_name)
         if cls:
-            # This is a simplified reconstruction. It assumes the constructor
-            # can be called with the dictionary keys as arguments.
-            # A more robust implementation might have `from_dict` classmethods.
-            obj = cls.__new__(cls) # Create a new instance without calling __init__
-            
+            # Slotted classes rebuild themselves from their record without
+            # calling __init__; anything else gets its dictionary restored.
+            if hasattr(cls, 'from_record'):
+                obj = cls.from_record(dct)
+            else:
+                obj = cls.__new__(cls) # Create a new instance without calling __init__
+                obj.__dict__.update(dct)
+
             # Re-link definitional attributes on load
-            if class_name == 'ProceduralQuestGiver':
-                # Find the original NPC object in the world definition to get its blueprints
-                from world import world as world_definition
-                original_npc = None
-                for row in world_definition['grid']:
-                    for loc in row:
-                        for npc_template in loc.get('npcs', []):
-                            if npc_template.name == dct.get('name'):
-                                original_npc = npc_template
-                                break
+            if isinstance(obj, NPC):
+                original_npc = _npc_definitions().get(dct.get('name'))
                 if original_npc:
-                    obj.quest_generator = original_npc.quest_generator
-                    obj.templates = original_npc.templates
-                    obj.reputation_quests = original_npc.reputation_quests
                     obj.schedule = original_npc.schedule
-
-            # Re-convert list back to set for specific attributes
-            if 'skills_affected_this_turn' in dct:
-                dct['skills_affected_this_turn'] = set(dct['skills_affected_this_turn'])
-            obj.__dict__.update(dct)
+                    if isinstance(obj, ProceduralQuestGiver):
+                        obj.quest_generator = original_npc.quest_generator
+                        obj.templates = original_npc.templates
+                        obj.reputation_quests = original_npc.reputation_quests
             return obj
     return dct
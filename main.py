@@ -1,16 +1,29 @@
 import sys
 import os
-import random
 import json
 from player import Player
 from item import Item, Weapon, Armor, Consumable, Spellbook, RecipeScroll, Key, pouch_of_gold
 from world import world, default_recipes, smelting_recipes, word_combinations, cooking_recipes, herblore_recipes, dungeon_generator
 from monster import Monster
-from enemy_ai import enemy_decision
+import combat
+from encounter import Encounter
+from autofight import auto_resolve, auto_resolve_encounter, POLICIES
 from npc import QuestGiver, Shopkeeper, Banker, Guard, ProceduralQuestGiver
 from ui import print_bordered
 from json_utils import GameEncoder, decode_game_object
 from event_manager import event_manager
+from faction_events import faction_event_engine
+from world_sim import world_simulator
+from roaming import roaming_monsters
+from economy import regional_economy
+from rng import random_streams, COMBAT, AI, WORLDGEN, LOOT
+from commands import command_registry, split_quantity
+from names import find_by_name, AMBIGUOUS
+from inventory import Inventory
+from bank import Bank
+from crafting import recipe_book
+import spawning
+from tick_loop import TickLoop
 import viewport_generator
 from quest_hooks import register_quest_listeners
 import command_handler as cmd
@@ -23,34 +36,13 @@ game_state = {
     "day_length": 20,
     "night_length": 15
 }
-faction_events = {
-    "bandit_raid": {
-        "is_active": False, "location_key": None, "duration": 0, "original_npcs": []
-    }
-}
 current_dungeon = None
 
 def respawn_monsters(world_state, current_game_state):
     """Clears and repopulates monsters in all locations based on the time of day."""
-    from world import monster_mapping # Import here to avoid circular dependency issues
-
-    # Respawn for grid locations
-    for row in world_state["grid"]:
-        for location_data in row:
-            # Clear existing monsters
-            location_data["monsters"] = []
-            
-            # Combine regular and rare enemies for spawning
-            monster_names_to_spawn = list(location_data.get("enemies", []))
-            monster_names_to_spawn.extend(location_data.get("rare_creatures", []))
-
-            # Add nocturnal enemies if it's night
-            if current_game_state['time_of_day'] == "Night":
-                monster_names_to_spawn.extend(location_data.get("night_enemies", []))
-
-            for name in monster_names_to_spawn:
-                if name in monster_mapping:
-                    location_data["monsters"].append(monster_mapping[name]())
+    # Every tile's listed enemies return, plus a weighted roll on its spawn table
+    locations = [location_data for row in world_state["grid"] for location_data in row]
+    spawning.populate(locations, current_game_state['time_of_day'] == "Night", random_streams.get(WORLDGEN))
     # Note: This could be expanded to handle monsters in special locations too
 
 def update_npc_availability(world_state, current_game_state):
@@ -65,24 +57,34 @@ def update_npc_availability(world_state, current_game_state):
 def advance_time(turns=1):
     """Advances the game time and handles the day/night cycle."""
     global game_state
+    old_turn = game_state["turn_count"]
     game_state["turn_count"] += turns
     
-    total_cycle_length = game_state["day_length"] + game_state["night_length"]
+    day_length = game_state["day_length"]
+    total_cycle_length = day_length + game_state["night_length"]
     current_cycle_turn = game_state["turn_count"] % total_cycle_length
     
-    new_time_of_day = "Day" if 0 <= current_cycle_turn < game_state["day_length"] else "Night"
+    new_time_of_day = "Day" if 0 <= current_cycle_turn < day_length else "Night"
     
-    if new_time_of_day != game_state["time_of_day"]:
+    # A batch of turns can pass a sunset and a sunrise and land back in the same time of day
+    new_turn = game_state["turn_count"]
+    crossed = (old_turn // total_cycle_length != new_turn // total_cycle_length or
+               (old_turn - day_length) // total_cycle_length != (new_turn - day_length) // total_cycle_length)
+    if new_time_of_day != game_state["time_of_day"] or crossed:
         game_state["time_of_day"] = new_time_of_day
         if new_time_of_day == "Night":
             print("\nThe sun sets, and darkness falls upon Thalren Vale.")
         else:
             print("\nThe sun rises, casting long shadows across the land.")
         respawn_monsters(world, game_state)
+        faction_event_engine.reapply(world) # Respawning wipes out event monsters
         update_npc_availability(world, game_state)
         process_npc_schedules(world, game_state)
     
-    process_faction_events(world, faction_events)
+    faction_event_engine.process(world, game_state["turn_count"])
+    world_simulator.advance(world, game_state)
+    roaming_monsters.step(world, game_state, turns)
+    regional_economy.process(world, game_state, faction_event_engine.active.values())
 
 def _get_location_data_by_key(world_state, location_key):
     """Helper to get location data from either the grid or special locations."""
@@ -124,51 +126,6 @@ def process_npc_schedules(world_state, current_game_state):
                 npc.current_location_key = target_location_key
                 # print(f"[DEBUG] Moved {npc.name} to {new_loc_data['name']}.") # Optional debug message
 
-def process_faction_events(world_state, faction_events_state):
-    """Manages the lifecycle of procedural world events."""
-    # --- Bandit Raid Event ---
-    event = faction_events_state["bandit_raid"]
-    if event["is_active"]:
-        event["duration"] -= 1
-        if event["duration"] <= 0:
-            # End the raid
-            raided_loc = _get_location_data_by_key(world_state, event["location_key"])
-            if raided_loc:
-                print(f"The bandits have been driven from {raided_loc['name']} and the villagers are returning.")
-                # Remove bandits and restore original NPCs
-                raided_loc["monsters"] = [m for m in raided_loc.get("monsters", []) if not isinstance(m, monster_mapping.get("bandit"))]
-                raided_loc["npcs"] = event["original_npcs"]
-            # Reset the event state
-            event["is_active"] = False
-            event["location_key"] = None
-            event["original_npcs"] = []
-    else:
-        # Chance to trigger a new raid
-        if random.random() < 0.02: # 2% chance per turn
-            # Select a valid, non-town location to be raided
-            possible_locations = []
-            for r, row in enumerate(world_state["grid"]):
-                for c, loc in enumerate(row):
-                    if loc.get("type") in ["village", "camp", "plains"] and loc.get("npcs"):
-                        possible_locations.append(((r, c), loc))
-            
-            if possible_locations:
-                loc_key, target_loc = random.choice(possible_locations)
-                print(f"\n[World Event] Word on the road is that bandits are raiding {target_loc['name']}!")
-                
-                # Activate the event
-                event["is_active"] = True
-                event["location_key"] = loc_key
-                event["duration"] = random.randint(20, 40) # Raid lasts for 20-40 turns
-                
-                # Store original NPCs and replace them with bandits
-                event["original_npcs"] = list(target_loc.get("npcs", []))
-                target_loc["npcs"] = []
-                from world import monster_mapping
-                if "monsters" not in target_loc: target_loc["monsters"] = []
-                target_loc["monsters"].extend([monster_mapping["bandit"]() for _ in range(random.randint(2, 4))])
-
-
 def get_current_location(player, world_state, dungeon_state):
     """Gets the location data for the player's current position."""
     loc = player.location
@@ -188,6 +145,7 @@ def set_current_dungeon(dungeon_data):
     current_dungeon = dungeon_data
 def print_location(player, world_state, dungeon_state, game_state_dict):
     """Prints a clear and concise summary of the player's location and available interactions."""
+    roaming_monsters.observe(world_state, player.location)
     location_data = get_current_location(player, world_state, dungeon_state)
     if not location_data:
         print("You are lost in an unfamiliar place.")
@@ -311,20 +269,24 @@ def print_location(player, world_state, dungeon_state, game_state_dict):
     
     print_bordered(title, content)
 
-def get_target(parts):
-    """Helper function to get the target of a command (e.g., 'look at sword')."""
-    if len(parts) > 1:
-        # Handle multi-word targets like "look at short sword"
-        if parts[1] == "at" and len(parts) > 2:
-            return " ".join(parts[2:])
-        return " ".join(parts[1:])
-    return None
+def find_monster(monsters, name):
+    """Finds the monster a player means, preferring one that is still standing."""
+    monster = find_by_name(monsters, name, where=lambda m: m.is_alive())
+    if monster is None:
+        monster = find_by_name(monsters, name) # Only defeated ones match
+    return monster
+
+MAX_BATCH = 1000 # The most a single gather or craft command can do
+
+COMBAT_ACTIONS = ('a', 'd', 'p', 'c', 'f', 's', 't') # The letters of the combat menus
 
 def handle_combat(player, monster_name_input):
     """Manages the turn-based combat loop."""
     current_location = get_current_location(player, world, current_dungeon)
     monsters_in_room = current_location.get("monsters", [])
-    target_monster = next((m for m in monsters_in_room if monster_name_input.lower() in m.name.lower()), None)
+    target_monster = find_monster(monsters_in_room, monster_name_input)
+    if target_monster is AMBIGUOUS:
+        return
 
     if not target_monster:
         print(f"There is no {monster_name_input} here to attack.")
@@ -333,35 +295,27 @@ def handle_combat(player, monster_name_input):
     if not target_monster.is_alive():
         print(f"The {target_monster.name} is already defeated.")
         return
+
+    # Everything else standing in the room joins the fight
+    foes = [m for m in monsters_in_room if m.is_alive()]
+    if len(foes) > 1:
+        handle_group_combat(player, target_monster, foes, current_location)
+        return
     print(f"\n--- You engage the {target_monster.name}! ---")
 
-    while player.is_alive() and target_monster.is_alive():
+    while True:
         player.clear_affected_skills()
-        # Player's Turn
-        print("\n" + "="*15 + " Your Turn " + "="*15)
-        player_is_stunned = player.process_turn_effects()
-        if not player.is_alive():
-            break
-
-        player_action = None
-
-        if player_is_stunned:
-            pass # Skip the player's action
-        else:
+        print(combat.describe(('turn', combat.PLAYER), player.name, target_monster.name))
+        action, spell = None, None
+        if not combat.is_stunned(combat.player_state(player)):
             print("Choose your action: (A)ttack, (D)efend, (P)arry, (C)ast, (F)lee, (S)tatus")
             action = input("> ").lower()
-            player_action = action
-
-            if action == 'a':
-                # The monster's action for the turn will be decided after this,
-                # so we calculate potential damage now and apply it later.
-                print(f"You attack the {target_monster.name}!")
-            elif action == 'd':
-                print("You brace yourself for an attack, focusing on defense.")
-            elif action == 'p':
-                print("You take a ready stance, preparing to parry the next blow.")
-                player.add_skill_xp("Attack", 2) # Minor XP for attempting a parry
-            elif action == 'c':
+            if action == 's':
+                player.print_combat_status(target_monster)
+                continue # This action does not use up a turn
+            if action not in COMBAT_ACTIONS and command_registry.dispatch(action, player, in_combat=True):
+                continue # Neither do commands like 'inventory'
+            if action == 'c':
                 # Show available spells
                 if not player.abilities:
                     print("You don't know any spells!")
@@ -371,186 +325,235 @@ def handle_combat(player, monster_name_input):
                     print(f"  {i+1}. {ability.name} (Cost: {ability.mana_cost} MP) - {ability.description}")
                 spell_choice = input("Cast which spell? (number) > ")
                 try:
-                    spell_index = int(spell_choice) - 1
-                    chosen_ability = player.abilities[spell_index]
-                    if player.mana >= chosen_ability.mana_cost:
-                        player.mana -= chosen_ability.mana_cost
-                        print(f"You cast {chosen_ability.name}!")
-                        if chosen_ability.effect:
-                            player.add_skill_xp("Magic", 5) # Grant magic XP for casting
-                            if chosen_ability.effect['type'] == 'damage':
-                                target_monster.take_damage(chosen_ability.effect['amount'])
-                            elif chosen_ability.effect['type'] == 'heal':
-                                player.heal(chosen_ability.effect['amount'])
-                        if chosen_ability.status_effect:
-                            target_monster.add_status_effect(chosen_ability.status_effect)
-                    else:
-                        print("Not enough mana!")
+                    spell = int(spell_choice) - 1
+                    player.abilities[spell]
                 except (ValueError, IndexError):
                     print("Invalid spell choice.")
-            elif action == 's':
-                player.print_combat_status(target_monster)
-                continue # This action does not use up a turn
-            elif action == 'f':
-                # Flee chance is based on player level vs monster attack power
-                level_difference = player.skills["Agility"].level - (target_monster.attack_power / 4) # A higher level or lower monster attack helps
-                flee_chance = 0.5 + (level_difference * 0.05) # Base 50%, with 5% change per point of difference
-                # Clamp the chance between 10% and 90% to keep it from being impossible or a sure thing
-                flee_chance = max(0.1, min(flee_chance, 0.9))
-                print(f"(Your chance to flee is {int(flee_chance * 100)}%)")
-                if random.random() < flee_chance:
-                    print("You successfully escape from the battle!")
-                    break # Exit the combat loop
-                else:
-                    print("You failed to escape!")
-            else:
-                print("Invalid action. You hesitate and do nothing.")
-
-        if not target_monster.is_alive():
-            event_manager.dispatch('on_kill', player=player, monster=target_monster)
-            print(f"\nYou have defeated the {target_monster.name}!")            
-            # --- Special Post-Combat Quest Logic for "Ashes on the Road" ---
-            quest = next((q for q in player.active_quests if q.name == "Ashes on the Road"), None)
-            if quest and quest.check_completion(player):
-                print(f"\nThe {target_monster.name} slumps to the ground, defeated but still breathing. You have a moment to act.")
-                for i, choice in enumerate(quest.reward_choice):
-                    print(f"  {i+1}. {choice['description']}")
-                
-                while True:
-                    try:
-                        choice_input = input("Choose your action (number): > ")
-                        if not choice_input: continue
-                        choice_index = int(choice_input) - 1
-                        if 0 <= choice_index < len(quest.reward_choice):
-                            chosen_option = quest.reward_choice[choice_index]
-                            quest.complete(player, chosen_reward_option=chosen_option)
-                            # Remove the defeated monster from the room
-                            current_location.get("monsters", []).remove(target_monster)
-                            return # Exit combat function entirely
-                        else:
-                            print("Invalid choice.")
-                    except (ValueError, IndexError):
-                        print("Please enter a number.")
-                return # Should be unreachable, but good practice
-
-            xp_reward = target_monster.xp_yield
-            player.add_skill_xp("Attack", xp_reward // 2)
-            player.add_skill_xp("Defense", xp_reward // 2)
-            
-            # --- Handle Loot Drop ---
-            dropped_loot = target_monster.drop_loot()
-            if dropped_loot:
-                current_location.get("items", []).extend(dropped_loot)
-                print(f"The {target_monster.name} dropped:")
-                for item in dropped_loot:
-                    print(f"- A {item.name}")
-            # ----------------------
-
-            # --- Victory Condition ---
-            if target_monster.name == "Thalraxos":
-                print("\n" + "="*20)
-                print("With a final, earth-shattering groan, Thalraxos crumbles to dust.")
-                print("The shadow over the mountain has been lifted. You are victorious!")
-                print(f"Congratulations, {player.name}! You have saved Thalren Vale.")
-                sys.exit()
-            # -------------------------
+                    spell = None
+
+        state, events = combat.combat_round(combat.player_state(player), combat.monster_state(target_monster), action,
+                                            random_streams.get(COMBAT), spell, random_streams.get(AI))
+        combat.apply_state(player, state.player)
+        combat.apply_state(target_monster, state.monster)
+        for event in events:
+            if event[0] == 'xp':
+                player.add_skill_xp(event[1], event[2])
+                continue
+            if event == ('turn', combat.PLAYER):
+                continue # Already shown before the action prompt
+            text = combat.describe(event, player.name, target_monster.name)
+            if text is not None:
+                print(text)
+
+        if state.outcome == 'fled':
             break
 
-        # Monster's Turn
-        print("\n" + "="*14 + " Enemy Turn " + "="*14)
-        monster_is_stunned = target_monster.process_turn_effects()
-        if not target_monster.is_alive():
+        if state.outcome == 'defeat':
+            sys.exit()
+
+        if state.outcome == 'victory':
+            handle_monster_defeated(player, target_monster, current_location)
             break
 
-        # --- Enemy AI Decision ---
-        monster_action, final_weights = enemy_decision(target_monster.health, target_monster.max_health, player_action)
-        print(f"({target_monster.name} considers its options: {final_weights})")
-
-        # --- Player Damage Phase (if player attacked) ---
-        if player_action == 'a':
-            # Player attacks do 10% more damage
-            player_damage = int(player.attack_power * 1.1)
-            if monster_action == 'defend':
-                damage_blocked = min(player_damage, target_monster.defense)
-                damage_dealt = player_damage - damage_blocked
-                print(f"{target_monster.name} defends, blocking {damage_blocked} damage!")
-            elif monster_action == 'parry':
-                # For simplicity, enemy parry blocks 50%
-                damage_blocked = int(player_damage * 0.5)
-                damage_dealt = player_damage - damage_blocked
-                print(f"{target_monster.name} parries, blocking {damage_blocked} damage!")
-            else: # Monster chose 'attack'
-                damage_dealt = max(1, player_damage - target_monster.defense)
-                print(f"Your attack hits!")
-            
-            if damage_dealt > 0:
-                target_monster.take_damage(damage_dealt)
-                player.add_skill_xp("Attack", damage_dealt)
-
-        if not target_monster.is_alive():
-            continue # Skip monster's turn if it was defeated by player's attack
-
-        if not monster_is_stunned:
-            # --- Monster AI ---
-            can_use_ability = any(target_monster.mana >= ab.mana_cost for ab in target_monster.abilities)
-            # 50% chance to use an ability if possible
-            if can_use_ability and random.random() < 0.5:
-                affordable_abilities = [ab for ab in target_monster.abilities if target_monster.mana >= ab.mana_cost]
-                chosen_ability = random.choice(affordable_abilities)
-                target_monster.mana -= chosen_ability.mana_cost
-                print(f"The {target_monster.name} uses {chosen_ability.name}!")
-                if chosen_ability.effect:
-                    if chosen_ability.effect['type'] == 'damage':
-                        # Special attacks are more direct, less mitigated by standard defense
-                        player.take_damage(chosen_ability.effect['amount'])
-                    elif chosen_ability.effect['type'] == 'heal':
-                        target_monster.heal(chosen_ability.effect['amount'])
-                if chosen_ability.status_effect:
-                    player.add_status_effect(chosen_ability.status_effect)
-            elif monster_action == 'attack': # Basic Attack
-                # Enemies do 10% less damage
-                enemy_damage = int(target_monster.attack_power * 0.9)
-                print(f"The {target_monster.name} attacks you for {enemy_damage} potential damage!")
-
-                if player_action == 'd': # Defend
-                    damage_blocked = min(enemy_damage, player.defense)
-                    damage_taken = enemy_damage - damage_blocked
-                    player.health -= damage_taken
-                    player.add_skill_xp("Defense", damage_blocked)
-                    print(f"You defend, blocking {damage_blocked} damage and taking {damage_taken} damage.")
-                elif player_action == 'p': # Parry
-                    block_percentage = 0.4 + (player.skills["Agility"].level * 0.01)
-                    block_percentage = min(block_percentage, 0.8) # Cap parry at 80%
-                    damage_blocked = int(enemy_damage * block_percentage)
-                    damage_taken = enemy_damage - damage_blocked
-                    player.health -= damage_taken
-                    player.add_skill_xp("Defense", damage_blocked)
-                    print(f"You parry, blocking {damage_blocked} damage and taking {damage_taken} damage.")
-                    # Counter-attack chance
-                    if random.random() < 0.25: # 25% chance to counter
-                        counter_damage = int(player.attack_power * 0.5)
-                        print(f"You seize an opening and counter-attack for {counter_damage} damage!")
-                        target_monster.take_damage(counter_damage)
-                        player.add_skill_xp("Attack", counter_damage)
-                else: # Default (Attack, Cast, Flee fail, etc.)
-                    damage_mitigated = min(enemy_damage, player.defense)
-                    damage_taken = enemy_damage - damage_mitigated
-                    player.health -= damage_taken
-                    player.add_skill_xp("Defense", damage_mitigated)
-                    print(f"Your armor mitigates {damage_mitigated} damage. You take {damage_taken} damage.")
-            elif monster_action == 'defend':
-                print(f"{target_monster.name} takes a defensive stance, preparing for your next move.")
-            elif monster_action == 'parry':
-                print(f"{target_monster.name} readies itself to parry an attack.")
-
-        if not player.is_alive():
-            print("\nYou have been defeated. Game Over.")
-            sys.exit()
         # Print status at the end of the round
         player.print_status(affected_skills=player.skills_affected_this_turn)
         print(f"Enemy HP: {target_monster.health}/{target_monster.max_health}")
         print("-" * 25)
 
+def handle_autofight(player, args):
+    """Resolves a whole fight with a policy and prints a single summary."""
+    policy_name = "balanced"
+    if " using " in f" {args} ":
+        args, _, policy_name = args.rpartition(" using ")
+    if policy_name not in POLICIES:
+        print(f"Unknown policy '{policy_name}'. Choose from: {', '.join(POLICIES)}.")
+        return
+    current_location = get_current_location(player, world, current_dungeon)
+    target_monster = find_monster(current_location.get("monsters", []), args)
+    if target_monster is AMBIGUOUS:
+        return
+    if not target_monster:
+        print(f"There is no {args} here to attack.")
+        return
+    if not target_monster.is_alive():
+        print(f"The {target_monster.name} is already defeated.")
+        return
+
+    # Everything else standing in the room joins the fight, as with 'attack'
+    foes = [m for m in current_location.get("monsters", []) if m.is_alive()]
+    if len(foes) > 1:
+        encounter = Encounter(combat.player_state(player), [combat.monster_state(m) for m in foes], random_streams.get(COMBAT))
+        summary = auto_resolve_encounter(encounter, foes.index(target_monster), POLICIES[policy_name],
+                                         random_streams.get(COMBAT), ai_rng=random_streams.get(AI))
+        result = encounter.outcome
+        combat.apply_state(player, encounter.player)
+        for foe, fighter in zip(foes, encounter.monsters):
+            combat.apply_state(foe, fighter)
+        defeated = [foes[i] for i in summary['slain']]
+        title = f"Autofight: {len(foes)} foes"
+    else:
+        state, summary = auto_resolve(combat.player_state(player), combat.monster_state(target_monster), POLICIES[policy_name],
+                                      random_streams.get(COMBAT), ai_rng=random_streams.get(AI))
+        result = state.outcome
+        combat.apply_state(player, state.player)
+        combat.apply_state(target_monster, state.monster)
+        defeated = [target_monster] if result == 'victory' else []
+        title = f"Autofight: {target_monster.name}"
+
+    outcome = {"victory": "Victory", "defeat": "Defeat", "fled": "Fled", None: "Disengaged"}[result]
+    content = [
+        f"Outcome: {outcome} after {summary['rounds']} rounds ({policy_name} policy)",
+        f"Damage dealt: {summary['damage_dealt']} | Damage taken: {summary['damage_taken']}",
+        f"HP: {player.health}/{player.max_health} | MP: {player.mana}/{player.max_mana}",
+        "XP: " + (", ".join(f"{amount} {skill}" for skill, amount in summary['xp'].items() if amount > 0) or "none"),
+    ]
+    if len(foes) > 1:
+        content.append("Slain: " + (", ".join(monster.name for monster in defeated) or "none"))
+    print_bordered(title, content)
+    for skill, amount in summary['xp'].items():
+        player.add_skill_xp(skill, amount, announce=False)
+
+    if result == 'defeat':
+        print("\nYou have been defeated. Game Over.")
+        sys.exit()
+    for monster in defeated:
+        handle_monster_defeated(player, monster, current_location)
+
+def handle_monster_defeated(player, monster, current_location):
+    """Grants kill credit, quest outcomes and loot for a defeated monster."""
+    event_manager.dispatch('on_kill', player=player, monster=monster)
+    # --- Special Post-Combat Quest Logic for "Ashes on the Road" ---
+    quest = next((q for q in player.active_quests if q.name == "Ashes on the Road"), None)
+    if quest and quest.check_completion(player):
+        print(f"\nThe {monster.name} slumps to the ground, defeated but still breathing. You have a moment to act.")
+        for i, choice in enumerate(quest.reward_choice):
+            print(f"  {i+1}. {choice['description']}")
+
+        while True:
+            try:
+                choice_input = input("Choose your action (number): > ")
+                if not choice_input: continue
+                choice_index = int(choice_input) - 1
+                if 0 <= choice_index < len(quest.reward_choice):
+                    chosen_option = quest.reward_choice[choice_index]
+                    quest.complete(player, chosen_reward_option=chosen_option)
+                    # Remove the defeated monster from the room
+                    current_location.get("monsters", []).remove(monster)
+                    return
+                else:
+                    print("Invalid choice.")
+            except (ValueError, IndexError):
+                print("Please enter a number.")
+
+    # --- Handle Loot Drop ---
+    dropped_loot = monster.drop_loot(random_streams.get(LOOT))
+    if dropped_loot:
+        current_location.get("items", []).extend(dropped_loot)
+        print(f"The {monster.name} dropped:")
+        for item in dropped_loot:
+            print(f"- A {item.name}")
+    # ----------------------
+
+    # --- Victory Condition ---
+    if monster.name == "Thalraxos":
+        print("\n" + "="*20)
+        print("With a final, earth-shattering groan, Thalraxos crumbles to dust.")
+        print("The shadow over the mountain has been lifted. You are victorious!")
+        print(f"Congratulations, {player.name}! You have saved Thalren Vale.")
+        sys.exit()
+    # -------------------------
+
+def _choose_group_action(player, encounter, foes, target):
+    """Asks for the player's action in a group fight. Returns (action, spell, target)."""
+    while True:
+        for i in encounter.living_monsters():
+            marker = "*" if i == target else " "
+            print(f" {marker}{i+1}. {foes[i].name} (HP: {encounter.monsters[i].health}/{encounter.monsters[i].max_health})")
+        print("Choose your action: (A)ttack, (D)efend, (P)arry, (C)ast, (F)lee, (S)tatus, (T)arget")
+        action = input("> ").lower()
+        if action == 's':
+            player.print_combat_status(foes[target])
+            continue # This action does not use up a turn
+        if action not in COMBAT_ACTIONS and command_registry.dispatch(action, player, in_combat=True):
+            continue # Neither do commands like 'inventory'
+        if action == 't':
+            living = encounter.living_monsters()
+            choice = input("Target which enemy? (number or name) > ").strip()
+            if choice.isdigit():
+                choice = int(choice) - 1
+            else:
+                foe = find_by_name(foes, choice, where=lambda m: foes.index(m) in living)
+                if foe is AMBIGUOUS:
+                    continue
+                choice = foes.index(foe) if foe else None
+            if choice in living:
+                target = choice
+            else:
+                print("Invalid target.")
+            continue
+        if action == 'c':
+            if not player.abilities:
+                print("You don't know any spells!")
+                continue
+            print("Spells:")
+            for i, ability in enumerate(player.abilities):
+                print(f"  {i+1}. {ability.name} (Cost: {ability.mana_cost} MP) - {ability.description}")
+            try:
+                spell = int(input("Cast which spell? (number) > ")) - 1
+                player.abilities[spell]
+                return action, spell, target
+            except (ValueError, IndexError):
+                print("Invalid spell choice.")
+                return action, None, target
+        return action, None, target
+
+def handle_group_combat(player, target_monster, foes, current_location):
+    """Manages a fight against several monsters, taking turns in initiative order."""
+    print(f"\n--- You are set upon by {len(foes)} foes: {', '.join(m.name for m in foes)}! ---")
+    encounter = Encounter(combat.player_state(player), [combat.monster_state(m) for m in foes], random_streams.get(COMBAT))
+    target = foes.index(target_monster)
+
+    while encounter.outcome is None:
+        actor = encounter.next_actor()
+        if actor == combat.PLAYER:
+            player.clear_affected_skills()
+            print(encounter.describe(('turn', combat.PLAYER), player.name))
+            action, spell = None, None
+            if not combat.is_stunned(encounter.player):
+                action, spell, target = _choose_group_action(player, encounter, foes, target)
+            events = encounter.player_turn(action, target, random_streams.get(COMBAT), spell)
+            subject = target
+        else:
+            events = encounter.monster_turn(actor, random_streams.get(COMBAT), random_streams.get(AI))
+            subject = actor
+
+        # Write back the combatants this turn touched
+        combat.apply_state(player, encounter.player)
+        touched = {subject} | {event[1] for event in events if event[0] in ('damage', 'effect_applied', 'effect_refreshed', 'effect_stacked', 'heal', 'slain') and event[1] != combat.PLAYER}
+        for i in touched:
+            combat.apply_state(foes[i], encounter.monsters[i])
+
+        for event in events:
+            if event[0] == 'xp':
+                player.add_skill_xp(event[1], event[2])
+                continue
+            if event == ('turn', combat.PLAYER):
+                continue # Already shown before the action prompt
+            text = encounter.describe(event, player.name, subject)
+            if text is not None:
+                print(text)
+            if event[0] == 'slain':
+                handle_monster_defeated(player, foes[event[1]], current_location)
+
+        if encounter.outcome == 'defeat':
+            sys.exit()
+        if encounter.outcome is None and encounter.monsters[target].health <= 0:
+            target = encounter.living_monsters()[0] # Move on to the next foe
+
+        if actor == combat.PLAYER and encounter.outcome is None:
+            player.print_status(affected_skills=player.skills_affected_this_turn)
+            print("-" * 25)
+
 def save_game(player, world_state):
     """Saves the current game state to a JSON file."""
     save_data = {
@@ -558,7 +561,10 @@ def save_game(player, world_state):
         "world": world_state,
         "game_state": game_state,
         "current_dungeon": current_dungeon,
-        "faction_events": faction_events
+        "faction_events": faction_event_engine.get_state(),
+        "roaming_monsters": roaming_monsters.get_state(),
+        "economy": regional_economy.get_state(),
+        "rng": random_streams.get_state()
     }
     try:
         with open(SAVE_FILENAME, "w") as save_file:
@@ -580,11 +586,7 @@ def load_game():
         loaded_world = save_data["world"]
         loaded_game_state = save_data["game_state"]
         loaded_dungeon = save_data.get("current_dungeon", None)
-        loaded_faction_events = save_data.get("faction_events", {
-            "bandit_raid": {
-                "is_active": False, "location_key": None, "duration": 0, "original_npcs": []
-            }
-        })
+        loaded_faction_events = save_data.get("faction_events", {})
 
         # --- Post-load reconstruction ---
         # The JSON load gives us names/placeholders. We need to replace them
@@ -601,31 +603,52 @@ def load_game():
         all_items = {**world_items, **item_items}
         all_quests = {q.name: q for q in world_module.__dict__.values() if isinstance(q, Quest) and not isinstance(q, type)}
 
-        # Re-link player's inventory and quests
-        player.inventory = [all_items.get(item_name, Item(item_name, "Lost Item")) for item_name in player.inventory]
+        # Re-link player's inventory, bank and quests
+        player.inventory = Inventory.from_saved(player.inventory, lambda name: all_items.get(name, Item(name, "Lost Item")))
+        player.bank_items = Bank.from_saved(player.bank_items, lambda name: all_items.get(name, Item(name, "Lost Item")))
         player.active_quests = [all_quests.get(quest_name) for quest_name in player.active_quests if quest_name in all_quests]
         player.completed_quests = [all_quests.get(quest_name) for quest_name in player.completed_quests if quest_name in all_quests]
+        player.known_recipes = [recipe_book.get(name) for name in player.known_recipes if recipe_book.get(name)]
         
+        # Abilities are saved by name; re-link them to their compiled definitions
+        import ability as ability_module
+        all_abilities = {a.name: a for a in ability_module.__dict__.values() if isinstance(a, ability_module.Ability)}
+        all_abilities.update((a.name, a) for a in word_combinations.values())
+        all_abilities.update((a.name, a) for a in Player("").abilities) # Starting spells
+        player.abilities = [all_abilities[name] for name in player.abilities if name in all_abilities]
+
         if player.weapon:
             player.weapon = all_items.get(player.weapon)
         if player.armor:
             player.armor = all_items.get(player.armor)
 
         # Re-link world state (NPCs, items on ground, etc.)
+        # Shopkeepers may be away from the grid (e.g. at the inn in the evening)
+        for loc_data in loaded_world["special"].values():
+            for npc in loc_data.get("npcs", []):
+                if isinstance(npc, Shopkeeper):
+                    npc.inventory = Inventory.from_saved(npc.inventory, all_items.get)
+                    npc.stock_levels = Inventory.from_saved(npc.stock_levels, all_items.get)
         for row in loaded_world["grid"]:
             for loc_data in row:
                 if "items" in loc_data:
                     loc_data["items"] = [all_items.get(item_name) for item_name in loc_data["items"] if item_name in all_items]
                 if "npcs" in loc_data:
                     for npc in loc_data["npcs"]:
+                        if isinstance(npc, Shopkeeper):
+                            npc.inventory = Inventory.from_saved(npc.inventory, all_items.get)
+                            npc.stock_levels = Inventory.from_saved(npc.stock_levels, all_items.get)
                         if hasattr(npc, 'quests'):
                             # This assumes quests are single objects, not lists for now.
                             # A more complex system would handle lists of quests.
                             if isinstance(npc.quests, list) and npc.quests:
                                 npc.quests = [all_quests.get(q_name) for q_name in npc.quests if q_name in all_quests]
         
+        random_streams.load_state(save_data.get("rng"))
         respawn_monsters(loaded_world, loaded_game_state)
         update_npc_availability(loaded_world, loaded_game_state)
+        roaming_monsters.load_state(save_data.get("roaming_monsters"), loaded_world)
+        regional_economy.load_state(save_data.get("economy"), loaded_world, loaded_game_state["turn_count"])
 
         print("\nGame loaded successfully!")
         return player, loaded_world, loaded_game_state, loaded_dungeon, loaded_faction_events
@@ -651,224 +674,329 @@ game_context = {
 game_context['context'] = game_context
 
 
-def parse_command(command, player):
-    """Parses the player's command."""
-    parts = command.lower().split()
-    if not parts:
-        print("Say something!")
-        return
+def _words(args):
+    return " ".join(args)
+
+def _quantity(args):
+    """Splits '20 iron bar' into ('iron bar', game_context, 20) for the batch handlers."""
+    name, count = split_quantity(args)
+    return name, game_context, min(count or 1, MAX_BATCH)
+
+# --- Commands ---
+# Each command is registered with its verbs and where it may be used; see commands.py.
+
+@command_registry.command("quit", in_jail=True)
+def do_quit(player, args):
+    print(f"Goodbye, {player.name}!")
+    sys.exit()
+
+@command_registry.command("help", in_jail=True, in_combat=True)
+def do_help(player, args):
+    cmd.handle_help()
+
+@command_registry.command("look", in_jail=True)
+def do_look(player, args):
+    if args and args[0] == "at":
+        args = args[1:]
+    if args:
+        cmd.handle_look_at(player, _words(args), game_context)
+    else:
+        print_location(player, world, current_dungeon, game_state)
+
+@command_registry.command("take", aliases=("get",), min_args=1, missing="Take what?")
+def do_take(player, args):
+    cmd.handle_take_item(player, _words(args), game_context)
+
+@command_registry.command("drop", min_args=1, missing="Drop what?")
+def do_drop(player, args):
+    cmd.handle_drop_item(player, _words(args), game_context)
+
+@command_registry.command("go", aliases=("move",), min_args=1, missing="Go where?")
+def do_go(player, args):
+    cmd.handle_movement(player, args[0], game_context)
+
+for direction in ("north", "south", "east", "west"):
+    command_registry.register(direction, lambda player, args, direction=direction: cmd.handle_movement(player, direction, game_context))
+
+@command_registry.command("inventory", aliases=("i",), in_jail=True, in_combat=True)
+def do_inventory(player, args):
+    cmd.handle_inventory(player)
+
+@command_registry.command("status", aliases=("stats",), in_jail=True, in_combat=True)
+def do_status(player, args):
+    player.print_status()
+
+@command_registry.command("attack", min_args=1, missing="Attack what?")
+def do_attack(player, args):
+    handle_combat(player, _words(args))
+
+@command_registry.command("autofight", min_args=1,
+                          missing="Autofight what? (e.g., 'autofight goblin' or 'autofight goblin using cautious')")
+def do_autofight(player, args):
+    handle_autofight(player, _words(args))
+
+@command_registry.command("equip", min_args=1, missing="Equip what?")
+def do_equip(player, args):
+    cmd.handle_equip_item(player, _words(args))
 
-    # Check if player is in jail
+@command_registry.command("unequip", min_args=1, missing="Unequip what? ('weapon' or 'armor')")
+def do_unequip(player, args):
+    cmd.handle_unequip_item(player, args[0])
+
+@command_registry.command("save")
+def do_save(player, args):
+    save_game(player, world)
+
+@command_registry.command("load")
+def do_load(player, args):
+    print("Loading the game will overwrite your current progress.")
+    print("This feature is best used from the main menu.")
+
+@command_registry.command("talk", in_jail=True)
+def do_talk(player, args):
+    if args and args[0] == "to":
+        cmd.handle_talk_to(player, _words(args[1:]), game_context)
+    else:
+        print("Talk to whom?")
+
+@command_registry.command("insult", min_args=1, missing="Insult whom?")
+def do_insult(player, args):
+    cmd.handle_insult(player, _words(args), game_context)
+
+@command_registry.command("accept")
+def do_accept(player, args):
+    cmd.handle_accept_quest(player)
+
+@command_registry.command("decline")
+def do_decline(player, args):
+    print("You decide not to take on the task for now.")
+
+@command_registry.command("quests", aliases=("journal",), in_combat=True)
+def do_quests(player, args):
+    cmd.handle_quests_log(player)
+
+def _trade_quantity(args):
+    """Splits 'all logs', '20 logs' or 'logs' into (name, count); a count of None means all."""
+    if len(args) > 1 and args[0].lower() == "all":
+        return _words(args[1:]), None
+    name, count = split_quantity(args)
+    return name, count or 1
+
+def _shopkeeper_here(player):
     current_location = get_current_location(player, world, current_dungeon)
-    if player.jail_time_remaining > 0 and current_location and current_location.get("name") == "Rivenshade Jail":
-        allowed_verbs = ["wait", "look", "status", "stats", "inventory", "i", "help", "quit", "bribe", "lockpick", "talk"]
-        verb = parts[0].lower()
-        if verb not in allowed_verbs:
-            print("You can't do that in jail. You must serve your time. (Type 'wait', 'bribe', or 'lockpick').")
-            return
+    return next((npc for npc in current_location.get("npcs", []) if isinstance(npc, Shopkeeper)), None)
+
+@command_registry.command("buy", min_args=1, missing="Buy what? (e.g., 'buy healing potion' or 'buy 5 healing potion')")
+def do_buy(player, args):
+    shopkeeper = _shopkeeper_here(player)
+    if shopkeeper:
+        item_name, count = _trade_quantity(args)
+        shopkeeper.buy_item(player, item_name, game_state, count)
+    else:
+        print("There is no one here to buy from.")
+
+@command_registry.command("sell", min_args=1, missing="Sell what?")
+def do_sell(player, args):
+    shopkeeper = _shopkeeper_here(player)
+    if shopkeeper:
+        item_name, count = _trade_quantity(args)
+        shopkeeper.sell_item(player, item_name, game_state, count)
+    else:
+        print("There is no one here to sell to.")
 
-    verb = parts[0]
+@command_registry.command("factions", in_combat=True)
+def do_factions(player, args):
+    cmd.handle_factions(player)
 
-    if verb == "quit":
-        print(f"Goodbye, {player.name}!")
-        sys.exit()
-    elif verb == "help":
-        cmd.handle_help()
-    elif verb == "look":
-        target = get_target(parts)
-        if target and target != "at":
-            cmd.handle_look_at(player, target, game_context)
-        else:
-            print_location(player, world, current_dungeon, game_state)
-    elif verb in ["get", "take"]:
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Take what?")
-        else:
-            cmd.handle_take_item(player, item_name, game_context)
-    elif verb == "drop":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Drop what?")
-        else:
-            cmd.handle_drop_item(player, item_name, game_context)
-    elif verb in ["go", "move"]:
-        if len(parts) > 1:
-            direction = parts[1]
-            cmd.handle_movement(player, direction, game_context)
-        else:
-            print("Go where?")
-    elif verb in ["north", "south", "east", "west"]:
-        cmd.handle_movement(player, verb, game_context)
-    elif verb in ["inventory", "i"]:
-        cmd.handle_inventory(player)
-    elif verb in ["status", "stats"]:
-        player.print_status()
-    elif verb == "attack":
-        target_name = " ".join(parts[1:])
-        if not target_name:
-            print("Attack what?")
-        else:
-            handle_combat(player, target_name)
-    elif verb == "equip":
-        item_name = " ".join(parts[1:])
-        if not item_name: print("Equip what?")
-        else: cmd.handle_equip_item(player, item_name)
-    elif verb == "unequip":
-        slot = parts[1] if len(parts) > 1 else ""
-        if not slot: print("Unequip what? ('weapon' or 'armor')")
-        else: cmd.handle_unequip_item(player, slot)
-    elif verb == "save":
-        save_game(player, world)
-    elif verb == "load":
-        print("Loading the game will overwrite your current progress.")
-        print("This feature is best used from the main menu.")
-    elif verb == "talk":
-        if len(parts) > 1 and parts[1] == "to":
-            npc_name = " ".join(parts[2:])
-            cmd.handle_talk_to(player, npc_name, game_context)
-        else:
-            print("Talk to whom?")
-    elif verb == "insult":
-        npc_name = " ".join(parts[1:])
-        if not npc_name:
-            print("Insult whom?")
-        else:
-            cmd.handle_insult(player, npc_name, game_context)
-    elif verb == "accept":
-        cmd.handle_accept_quest(player)
-    elif verb == "decline":
-        print("You decide not to take on the task for now.")
-    elif verb in ["quests", "journal"]:
-        cmd.handle_quests_log(player)
-    elif verb == "sell":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Sell what?")
-        else:
-            current_location = get_current_location(player, world, current_dungeon)
-            shopkeeper = next((npc for npc in current_location.get("npcs", []) if isinstance(npc, Shopkeeper)), None)
-            if shopkeeper:
-                shopkeeper.sell_item(player, item_name, game_state)
-            else:
-                print("There is no one here to sell to.")
-    elif verb == "factions":
-        cmd.handle_factions(player)
-    elif verb == "use":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Use what?")
-        else:
-            cmd.handle_use_item(player, item_name)
-    elif verb == "bank":
-        cmd.handle_bank_view(player, game_context)
-    elif verb == "deposit":
-        args = parts[1:]
-        cmd.handle_deposit(player, args, game_context)
-    elif verb == "withdraw":
-        args = parts[1:]
-        cmd.handle_withdraw(player, args, game_context)
-    elif verb == "wait":
-        cmd.handle_wait(player, game_context)
-    elif verb == "craft":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Craft what? (e.g., 'craft goblin leather gloves')")
-        else:
-            cmd.handle_craft_item(player, item_name, game_context)
-    elif verb == "pickpocket":
-        npc_name = " ".join(parts[1:])
-        if not npc_name:
-            print("Pickpocket whom?")
-        else:
-            cmd.handle_pickpocket(player, npc_name, game_context)
-    elif verb == "lockpick":
-        cmd.handle_lockpick(player, game_context)
-    elif verb == "bribe":
-        cmd.handle_bribe(player, game_context)
-    elif verb == "smelt":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Smelt what? (e.g., 'smelt copper bar')")
-        else:
-            cmd.handle_smelt_item(player, item_name, game_context)
-    elif verb == "mine":
-        node_name = " ".join(parts[1:])
-        if not node_name:
-            print("Mine what?")
-        else:
-            cmd.handle_gather_node(player, "mine", node_name, game_context)
-    elif verb == "cook":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Cook what? (e.g., 'cook trout')")
-        else:
-            cmd.handle_cook_item(player, item_name, game_context)
-    elif verb == "open":
-        if " ".join(parts[1:]) == "chest":
-            cmd.handle_open_chest(player, game_context)
-        else:
-            print("Open what?")
-    elif verb == "disarm":
-        if " ".join(parts[1:]) == "chest":
-            cmd.handle_disarm_chest(player, game_context)
-    elif verb == "brew":
-        item_name = " ".join(parts[1:])
-        if not item_name:
-            print("Brew what? (e.g., 'brew greater healing potion')")
-        else:
-            cmd.handle_brew_potion(player, item_name, game_context)
-    elif verb == "chop":
-        node_name = " ".join(parts[1:])
-        if not node_name:
-            print("Chop what?")
-        else:
-            cmd.handle_gather_node(player, "chop", node_name, game_context)
-    elif verb == "fish":
-        node_name = " ".join(parts[1:])
-        if not node_name:
-            print("Fish what? (e.g., 'fish spot')")
-        else:
-            cmd.handle_gather_node(player, "fish", node_name, game_context)
-    elif verb == "bind":
-        if " ".join(parts[1:]) == "altar": # Special command for the quest
-            cmd.handle_cleanse_shrine(player, game_context)
-            return
-        # Split by comma to handle multi-word item names
-        words_to_bind_str = " ".join(parts[1:])
-        words = [word.strip().title() for word in words_to_bind_str.split(',')]
-        cmd.handle_bind_words(player, words, game_context)
-    elif verb == "recipes":
-        cmd.handle_recipes(player)
-    elif verb == "rest":
-        cmd.handle_rest(player, game_context)
-    elif verb in ["map", "m"]:
-        cmd.handle_map(player, game_context)
-    elif verb == "enter":
-        target = " ".join(parts[1:])
-        if not target:
-            print("Enter what?")
-        else:
-            cmd.handle_enter(player, target, game_context)
-    elif verb == "cleanse":
+@command_registry.command("use", min_args=1, missing="Use what?")
+def do_use(player, args):
+    cmd.handle_use_item(player, _words(args))
+
+@command_registry.command("bank")
+def do_bank(player, args):
+    cmd.handle_bank_view(player, game_context, args)
+
+@command_registry.command("deposit")
+def do_deposit(player, args):
+    cmd.handle_deposit(player, args, game_context)
+
+@command_registry.command("withdraw")
+def do_withdraw(player, args):
+    cmd.handle_withdraw(player, args, game_context)
+
+@command_registry.command("wait", in_jail=True)
+def do_wait(player, args):
+    cmd.handle_wait(player, game_context)
+
+@command_registry.command("craft", min_args=1, missing="Craft what? (e.g., 'craft goblin leather gloves')")
+def do_craft(player, args):
+    cmd.handle_craft_item(player, *_quantity(args))
+
+@command_registry.command("pickpocket", min_args=1, missing="Pickpocket whom?")
+def do_pickpocket(player, args):
+    cmd.handle_pickpocket(player, _words(args), game_context)
+
+@command_registry.command("lockpick", in_jail=True)
+def do_lockpick(player, args):
+    cmd.handle_lockpick(player, game_context)
+
+@command_registry.command("bribe", in_jail=True)
+def do_bribe(player, args):
+    cmd.handle_bribe(player, game_context)
+
+@command_registry.command("smelt", min_args=1, missing="Smelt what? (e.g., 'smelt copper bar')")
+def do_smelt(player, args):
+    cmd.handle_smelt_item(player, *_quantity(args))
+
+@command_registry.command("cook", min_args=1, missing="Cook what? (e.g., 'cook trout')")
+def do_cook(player, args):
+    cmd.handle_cook_item(player, *_quantity(args))
+
+@command_registry.command("brew", min_args=1, missing="Brew what? (e.g., 'brew greater healing potion')")
+def do_brew(player, args):
+    cmd.handle_brew_potion(player, *_quantity(args))
+
+for verb, missing in (("mine", "Mine what?"), ("chop", "Chop what?"), ("fish", "Fish what? (e.g., 'fish spot')")):
+    command_registry.register(verb, lambda player, args, verb=verb: cmd.handle_gather_node(player, verb, *_quantity(args)),
+                              min_args=1, missing=missing)
+
+@command_registry.command("open")
+def do_open(player, args):
+    if _words(args) == "chest":
+        cmd.handle_open_chest(player, game_context)
+    else:
+        print("Open what?")
+
+@command_registry.command("disarm")
+def do_disarm(player, args):
+    if _words(args) == "chest":
+        cmd.handle_disarm_chest(player, game_context)
+
+@command_registry.command("bind")
+def do_bind(player, args):
+    if _words(args) == "altar": # Special command for the quest
         cmd.handle_cleanse_shrine(player, game_context)
+        return
+    # Split by comma to handle multi-word item names
+    words = [word.strip().title() for word in _words(args).split(',')]
+    cmd.handle_bind_words(player, words, game_context)
+
+@command_registry.command("recipes", in_combat=True)
+def do_recipes(player, args):
+    if args and args[0] == "here":
+        cmd.handle_makeable(player, game_context)
     else:
+        cmd.handle_recipes(player)
+
+@command_registry.command("plan", min_args=1, missing="Plan what? (e.g., 'plan iron sword x2')", in_combat=True)
+def do_plan(player, args):
+    cmd.handle_plan(player, args, game_context)
+
+@command_registry.command("make")
+def do_make(player, args):
+    cmd.handle_make(player, args, game_context)
+
+@command_registry.command("rest")
+def do_rest(player, args):
+    cmd.handle_rest(player, game_context)
+
+@command_registry.command("map", aliases=("m",), in_combat=True)
+def do_map(player, args):
+    cmd.handle_map(player, game_context)
+
+@command_registry.command("enter", min_args=1, missing="Enter what?")
+def do_enter(player, args):
+    cmd.handle_enter(player, _words(args), game_context)
+
+@command_registry.command("cleanse")
+def do_cleanse(player, args):
+    cmd.handle_cleanse_shrine(player, game_context)
+
+def parse_command(command, player):
+    """Parses the player's command."""
+    if not command.split():
+        print("Say something!")
+        return
+
+    # Only jail commands are allowed while serving time
+    in_jail = False
+    if player.jail_time_remaining > 0:
+        current_location = get_current_location(player, world, current_dungeon)
+        in_jail = bool(current_location) and current_location.get("name") == "Rivenshade Jail"
+
+    if not command_registry.dispatch(command, player, in_jail=in_jail):
         print("I don't understand that command.")
 
-def game_loop(player):
-    """The main game loop."""
+def run_command(command, player):
+    """Runs one player command against the world."""
+    world_simulator.set_focus(player.location)
+    parse_command(command, player)
+
+def enable_tab_completion():
+    """Completes command verbs with the Tab key, where readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return
+
+    def complete(text, state):
+        if readline.get_begidx() > 0:
+            return None # Only the verb is completed
+        matches = command_registry.complete(text.lower())
+        return matches[state] + " " if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.parse_and_bind("tab: complete")
+
+def game_loop(player, tick_rate=None):
+    """
+    The main game loop.
+    :param tick_rate: If given, the world advances in real time at this many turns per second,
+                      on its own thread, in addition to the turns taken by commands.
+    """
     print_location(player, world, current_dungeon, game_state)
+    enable_tab_completion()
+    if tick_rate:
+        realtime_game_loop(player, tick_rate)
+        return
     while True:
         try:
             command = input("> ")
-            parse_command(command, player)
+            run_command(command, player)
         except (EOFError, KeyboardInterrupt):
             print(f"\nGoodbye, {player.name}!")
             sys.exit()
 
-def start_game():
-    """Initializes and starts the game."""
-    global world, game_state, current_dungeon, faction_events # Declare that we might modify global variables
+def realtime_game_loop(player, tick_rate):
+    """
+    Reads commands on the main thread while a TickLoop advances the world.
+    Commands run on the tick thread between ticks, so the world is only ever
+    touched by one thread; the prompt returns once a command has finished.
+    """
+    def tick():
+        world_simulator.set_focus(player.location)
+        advance_time()
+
+    tick_loop = TickLoop(tick, tick_rate)
+    tick_loop.start()
+    try:
+        while True:
+            try:
+                command = input("> ")
+            except (EOFError, KeyboardInterrupt):
+                print(f"\nGoodbye, {player.name}!")
+                sys.exit()
+            tick_loop.submit(run_command, command, player)
+    finally:
+        tick_loop.stop()
+
+def start_game(tick_rate=None, seed=None):
+    """
+    Initializes and starts the game.
+    :param tick_rate: Turns per second for real-time mode, or None to advance only on commands.
+    :param seed: The random seed for a new game, or None for a fresh one.
+    """
+    global world, game_state, current_dungeon # Declare that we might modify global variables
 
     print("Welcome to Ashania!")
     if os.path.exists(SAVE_FILENAME):
@@ -879,14 +1007,14 @@ def start_game():
         
         if choice == 'l':
             player, loaded_world, loaded_game_state, loaded_dungeon, loaded_faction_events = load_game()
-            if player and loaded_world and loaded_game_state and loaded_faction_events:
+            if player and loaded_world and loaded_game_state and loaded_faction_events is not None:
                 world = loaded_world # Overwrite the template world with the loaded one
                 game_context['world'] = world # IMPORTANT: Update the context as well
                 game_context['current_dungeon'] = loaded_dungeon
                 game_state = loaded_game_state
                 current_dungeon = loaded_dungeon
-                faction_events = loaded_faction_events
-                game_loop(player)
+                faction_event_engine.load_state(loaded_faction_events, world, game_state["turn_count"])
+                game_loop(player, tick_rate)
                 return # Exit after the game loop finishes
 
     # If no save file or user chose New Game
@@ -906,9 +1034,14 @@ def start_game():
     from world import factions # Import here to use for new player
     from faction import Faction # Import here to create new faction instances
 
+    # Every subsystem's random stream starts from the session seed
+    random_streams.reseed(seed)
+
     # Initialize monsters for the first time
     respawn_monsters(world, game_state)
     update_npc_availability(world, game_state)
+    faction_event_engine.attach(world, game_state["turn_count"])
+    regional_economy.attach(world, game_state["turn_count"])
 
     player = Player(name=player_name, location=(12, 11)) # Start in Rivenshade
     # Initialize player's factions from the world template
@@ -916,9 +1049,9 @@ def start_game():
         player.factions[key] = Faction(faction_template.name, faction_template.description)
     # Give the player their default known recipes
     player.known_recipes.extend(default_recipes)
-    print(f"\nWelcome, {player.name}! Your journey begins now.")
+    print(f"\nWelcome, {player.name}! Your journey begins now. (World seed: {random_streams.seed})")
     print("Commands: look, go, take, drop, craft, recipes, bind, brew, mine, chop, fish, cook, smelt, pickpocket, bribe, lockpick, map, enter, open, disarm, use, attack, inventory, status, quests, talk to, insult, bank, deposit, withdraw, wait, rest, equip, unequip, save, quit, help.")
-    game_loop(player)
+    game_loop(player, tick_rate)
 
 def register_core_event_listeners():
     """Registers all game event listeners."""
@@ -955,5 +1088,11 @@ def register_core_event_listeners():
     event_manager.register_listener('on_item_pickup', on_item_pickup_listener)
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Thalren Vale, a text adventure.")
+    parser.add_argument("--realtime", type=float, nargs="?", const=0.2, metavar="TURNS_PER_SECOND",
+                        help="Let the world advance in real time (default rate: 0.2 turns per second).")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a new game, to replay the same world.")
+    args = parser.parse_args()
     register_core_event_listeners()
-    start_game()
\ No newline at end of file
+    start_game(args.realtime, args.seed)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Measures the memory saved by the slotted game object classes.
+
+A synthetic world is populated twice with the same monsters and NPCs: once
+with the real slotted classes, and once with plain objects that keep the same
+attributes in an instance __dict__ (which is how these classes stored their
+state before they were slotted). Run it directly:
+
+    python memory_benchmark.py --monsters 100000 --npcs 10000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from world import monster_mapping
+from npc import NPC, Shopkeeper, QuestGiver, Banker, Guard
+
+GRID_SIZE = 100 # The synthetic world is a GRID_SIZE x GRID_SIZE grid
+
+
+class _DictBacked:
+    """A stand-in with the pre-slots layout: every attribute lives in __dict__."""
+    pass
+
+
+def _unslotted_copy(obj):
+    """Copies a slotted object's state into a dict-backed object."""
+    copy = _DictBacked()
+    for name, value in obj.to_record().items():
+        # Lists are per-instance in the real classes, so give the copy its own.
+        setattr(copy, name, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _make_npc(i):
+    """Creates the i-th NPC of the population, cycling through the NPC types."""
+    kind = i % 5
+    name = f"Villager {i}"
+    if kind == 0:
+        return Shopkeeper(name, "A trader.")
+    if kind == 1:
+        return QuestGiver(name, "Someone in need.", [], "Could you help me?")
+    if kind == 2:
+        return Banker(name, "A banker.")
+    if kind == 3:
+        return Guard(name, "A guard.", "Move along.")
+    return NPC(name, "A local.")
+
+
+def build_world(num_monsters, num_npcs, slotted=True):
+    """Builds a grid world holding the given number of monsters and NPCs."""
+    grid = [[{"name": f"Tile {r},{c}", "monsters": [], "npcs": []} for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+    tiles = [tile for row in grid for tile in row]
+    monster_classes = list(monster_mapping.values())
+
+    for i in range(num_monsters):
+        monster = monster_classes[i % len(monster_classes)]()
+        tiles[i % len(tiles)]["monsters"].append(monster if slotted else _unslotted_copy(monster))
+    for i in range(num_npcs):
+        npc = _make_npc(i)
+        tiles[(i * 7) % len(tiles)]["npcs"].append(npc if slotted else _unslotted_copy(npc))
+    return {"grid": grid}
+
+
+def measure(num_monsters, num_npcs, slotted):
+    """Returns the number of bytes allocated while building and holding the world."""
+    gc.collect()
+    tracemalloc.start()
+    world = build_world(num_monsters, num_npcs, slotted)
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del world
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory use of slotted and dict-backed game objects.")
+    parser.add_argument("--monsters", type=int, default=100_000, help="Number of monsters to create.")
+    parser.add_argument("--npcs", type=int, default=10_000, help="Number of NPCs to create.")
+    args = parser.parse_args()
+
+    dict_bytes = measure(args.monsters, args.npcs, slotted=False)
+    slot_bytes = measure(args.monsters, args.npcs, slotted=True)
+    objects = args.monsters + args.npcs
+    saved = dict_bytes - slot_bytes
+
+    print(f"World: {args.monsters:,} monsters, {args.npcs:,} NPCs on a {GRID_SIZE}x{GRID_SIZE} grid")
+    print(f"  __dict__ objects: {dict_bytes / 2**20:8.1f} MiB ({dict_bytes / objects:6.0f} bytes/object)")
+    print(f"  __slots__ objects:{slot_bytes / 2**20:8.1f} MiB ({slot_bytes / objects:6.0f} bytes/object)")
+    print(f"  Saved:            {saved / 2**20:8.1f} MiB ({saved / dict_bytes:.0%})")
+
+
+if __name__ == "__main__":
+    main()
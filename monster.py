@@ -1,6 +1,7 @@
 from character import Character
 from ability import Ability
-from item import Item, Weapon, Armor, pouch_of_gold
+from item import Item, Weapon, Armor, pouch_of_gold, healing_potion, mana_potion
+from weighted import LootTable
 
 # --- Monster-specific Abilities ---
 goblin_shank = Ability("Shank", "A quick, nasty stab.", mana_cost=4, effect={'type': 'damage', 'amount': 12})
@@ -23,12 +24,17 @@ class Monster(Character):
     """
     Base class for all monsters in the game.
     """
+    __slots__ = ('xp_yield',)
+
     def __init__(self, name, health, attack_power, defense, xp_yield=0, description="A fearsome monster."):
         super().__init__(name, health, attack_power, defense, description)
         self.xp_yield = xp_yield
 
 class Goblin(Monster):
     """A small, weak, but mischievous monster."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (healing_potion, 'uncommon'), (pouch_of_gold, 'rare')])
+
     def __init__(self, name="Goblin"):
         super().__init__(
             name=name,
@@ -43,6 +49,9 @@ class Goblin(Monster):
 
 class Orc(Monster):
     """A large, brutish monster with high attack power."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (healing_potion, 'uncommon'), (pouch_of_gold, 'uncommon')])
+
     def __init__(self, name="Orc"):
         super().__init__(
             name=name,
@@ -57,6 +66,8 @@ class Orc(Monster):
 
 class Slime(Monster):
     """A gooey creature that is difficult to damage effectively."""
+    __slots__ = ()
+
     def __init__(self, name="Slime"):
         super().__init__(
             name=name,            # Slimes have a chance to apply poison
@@ -70,6 +81,8 @@ class Slime(Monster):
 
 class Skeleton(Monster):
     """A reanimated skeleton, brittle but persistent."""
+    __slots__ = ()
+
     def __init__(self, name="Skeleton"):
         super().__init__(
             name=name,
@@ -82,6 +95,8 @@ class Skeleton(Monster):
 
 class Zombie(Monster):
     """A slow, decaying undead creature."""
+    __slots__ = ()
+
     def __init__(self, name="Zombie"):
         super().__init__(
             name=name,
@@ -94,6 +109,8 @@ class Zombie(Monster):
 
 class DireWolf(Monster):
     """A large and aggressive wolf with a powerful bite."""
+    __slots__ = ()
+
     def __init__(self, name="Dire Wolf"):
         super().__init__(
             name=name,
@@ -106,6 +123,9 @@ class DireWolf(Monster):
 
 class Troll(Monster):
     """A hulking troll with immense strength and resilience."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (healing_potion, 'uncommon'), (pouch_of_gold, 'rare')])
+
     def __init__(self, name="Troll"):
         super().__init__(
             name=name,
@@ -120,6 +140,9 @@ class Troll(Monster):
 
 class Specter(Monster):
     """An ethereal ghost that drains life force and is hard to defend against."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (mana_potion, 'uncommon')])
+
     def __init__(self, name="Specter"):
         super().__init__(
             name=name,
@@ -134,6 +157,8 @@ class Specter(Monster):
         
 class GiantSpider(Monster):
     """A large, venomous spider."""
+    __slots__ = ()
+
     def __init__(self, name="Giant Spider"):
         super().__init__(
             name=name,
@@ -148,6 +173,9 @@ class GiantSpider(Monster):
 
 class Bandit(Monster):
     """A human brigand, quick and cunning."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (pouch_of_gold, 'uncommon'), (healing_potion, 'rare')])
+
     def __init__(self, name="Bandit"):
         super().__init__(
             name=name,
@@ -161,6 +189,8 @@ class Bandit(Monster):
 
 class RiverSerpent(Monster):
     """A large, aquatic reptile."""
+    __slots__ = ()
+
     def __init__(self, name="River Serpent"):
         super().__init__(
             name=name,
@@ -174,6 +204,8 @@ class RiverSerpent(Monster):
 
 class WildBoar(Monster):
     """A ferocious wild boar."""
+    __slots__ = ()
+
     def __init__(self, name="Wild Boar"):
         super().__init__(
             name=name,
@@ -187,6 +219,9 @@ class WildBoar(Monster):
 
 class AshboundCultist(Monster):
     """A fanatical cultist, empowered by dark magic."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (mana_potion, 'uncommon'), (healing_potion, 'rare')])
+
     def __init__(self, name="Ashbound Cultist"):
         super().__init__(
             name=name,
@@ -201,6 +236,9 @@ class AshboundCultist(Monster):
 
 class FireSpirit(Monster):
     """An elemental spirit of fire."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (mana_potion, 'rare')])
+
     def __init__(self, name="Fire Spirit"):
         super().__init__(
             name=name,
@@ -215,6 +253,8 @@ class FireSpirit(Monster):
 
 class GiantEagle(Monster):
     """A majestic but territorial giant eagle."""
+    __slots__ = ()
+
     def __init__(self, name="Giant Eagle"):
         super().__init__(
             name=name,
@@ -229,6 +269,8 @@ class GiantEagle(Monster):
 
 class SpectralWolf(Monster):
     """A ghostly wolf that phases in and out of existence."""
+    __slots__ = ()
+
     def __init__(self, name="Spectral Wolf"):
         super().__init__(
             name=name,
@@ -242,6 +284,9 @@ class SpectralWolf(Monster):
 
 class Thalraxos(Monster):
     """The final boss of the deep mountain dungeon."""
+    __slots__ = ()
+    bonus_loot = LootTable([(healing_potion, 'common'), (mana_potion, 'common')], rolls=(1, 3))
+
     def __init__(self, name="Thalraxos"):
         super().__init__(
             name=name,
@@ -259,6 +304,8 @@ class Thalraxos(Monster):
 
 class Mimic(Monster):
     """A devious creature that disguises itself as a treasure chest."""
+    __slots__ = ()
+
     def __init__(self, name="Mimic"):
         super().__init__(
             name=name,
@@ -272,6 +319,8 @@ class Mimic(Monster):
 
 class ShadowWolf(Monster):
     """A spectral wolf infused with deeper shadow magic, making it faster and more dangerous."""
+    __slots__ = ()
+
     def __init__(self, name="Shadow-Marked Wolf"):
         super().__init__(
             name=name,
@@ -285,6 +334,8 @@ class ShadowWolf(Monster):
 
 class ShadowCultist(Monster):
     """A cultist who has delved deeper into shadow magic."""
+    __slots__ = ()
+
     def __init__(self, name="Shadow-Marked Cultist"):
         super().__init__(
             name=name,
@@ -298,6 +349,8 @@ class ShadowCultist(Monster):
 
 class CultFanatic(Monster):
     """A powerful cultist who wields dangerous wordbinding magic."""
+    __slots__ = ()
+
     def __init__(self, name="Cult Fanatic"):
         super().__init__(
             name=name,
@@ -312,6 +365,9 @@ class CultFanatic(Monster):
 
 class CultistBandit(Monster):
     """A bandit who has been swayed by the promises of the cult."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (pouch_of_gold, 'uncommon'), (healing_potion, 'rare')])
+
     def __init__(self, name="Cultist-Aligned Bandit"):
         super().__init__(
             name=name,
@@ -325,6 +381,9 @@ class CultistBandit(Monster):
 
 class BanditLeader(Monster):
     """A charismatic and dangerous bandit leader."""
+    __slots__ = ()
+    bonus_loot = LootTable([(None, 'common'), (pouch_of_gold, 'uncommon'), (healing_potion, 'uncommon'), (mana_potion, 'rare')], rolls=2)
+
     def __init__(self, name="Bandit Leader"):
         super().__init__(
             name=name,
@@ -0,0 +1,149 @@
+"""
+Resolving typed names to the things in a room or an inventory.
+
+Every collection that players refer to by name (a room's items, NPCs,
+monsters and nodes, an inventory, the bank) gets a NameIndex of normalized
+names and word prefixes. Indexes are cached per collection and only rebuilt
+when its contents change (an Inventory's version, or one pass over a list's
+object ids), so a
+lookup costs a few dictionary hits instead of lower-casing and scanning every
+name on every command.
+
+Matches are ranked: the exact name, then names that start with what was
+typed, then names whose words start with each typed word in any order
+("leather gloves" for "Goblin Leather Gloves"), then any name containing it.
+If the best rank holds several different names the match is ambiguous, and
+find_by_name() asks which one was meant instead of guessing.
+"""
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+EXACT, PREFIX, TOKENS, SUBSTRING = range(4) # Match ranks, best first
+
+AMBIGUOUS = object() # Returned by find_by_name() when the player has to be more specific
+
+_non_word = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=4096)
+def normalize(name):
+    """Returns a name lower-cased, with punctuation and extra spaces removed."""
+    return _non_word.sub(" ", name.lower()).strip()
+
+
+class NameIndex:
+    """
+    An index of the names of a collection's objects.
+    """
+    __slots__ = ('objects', 'names', '_exact', '_prefixes')
+
+    def __init__(self, objects):
+        self.objects = list(objects)
+        self.names = [normalize(obj.name) for obj in self.objects]
+        self._exact = {}    # normalized name -> indexes
+        self._prefixes = {} # prefix of a word in a name -> indexes
+        for i, name in enumerate(self.names):
+            self._exact.setdefault(name, []).append(i)
+            for token in set(name.split()):
+                for end in range(1, len(token) + 1):
+                    indexes = self._prefixes.setdefault(token[:end], [])
+                    if not indexes or indexes[-1] != i:
+                        indexes.append(i)
+
+    def matches(self, query, where=None):
+        """
+        Finds the objects best matching a typed name.
+        :param where: An optional test the objects must pass.
+        :return: A tuple of (rank, objects), or (None, []) if nothing matches.
+        """
+        query = normalize(query)
+        if not query:
+            return None, []
+        for rank, indexes in self._ranked(query):
+            found = [self.objects[i] for i in indexes]
+            if where is not None:
+                found = [obj for obj in found if where(obj)]
+            if found:
+                return rank, found
+        return None, []
+
+    def _ranked(self, query):
+        """Yields (rank, indexes) for each rank with any matches, best first."""
+        exact = self._exact.get(query)
+        if exact:
+            yield EXACT, exact
+        candidates = None
+        for token in query.split():
+            indexes = self._prefixes.get(token)
+            if not indexes:
+                candidates = None
+                break
+            candidates = set(indexes) if candidates is None else candidates.intersection(indexes)
+        seen = set(exact or ())
+        if candidates:
+            ordered = sorted(candidates - seen)
+            prefixed = [i for i in ordered if self.names[i].startswith(query)]
+            yield PREFIX, prefixed
+            yield TOKENS, [i for i in ordered if not self.names[i].startswith(query)]
+            seen.update(ordered)
+        yield SUBSTRING, [i for i, name in enumerate(self.names) if query in name and i not in seen]
+
+
+class NameIndexCache:
+    """
+    Keeps the NameIndex of recently used collections.
+    """
+    def __init__(self, size=256):
+        self.size = size
+        self._indexes = OrderedDict() # id(collection) -> (collection, contents, NameIndex)
+
+    def get(self, collection):
+        """Returns the index of a collection, rebuilding it if the collection has changed."""
+        key = id(collection)
+        version = getattr(collection, 'version', None)
+        # Inventories count their changes; plain lists are compared by their objects' ids
+        contents = version if version is not None else tuple(map(id, collection))
+        cached = self._indexes.get(key)
+        # The cache holds the collection and its objects, so their ids can't be reused while cached
+        if cached is not None and cached[0] is collection and cached[1] == contents:
+            self._indexes.move_to_end(key)
+            return cached[2]
+        index = NameIndex(collection.unique_items() if version is not None else collection)
+        self._indexes[key] = (collection, contents, index)
+        self._indexes.move_to_end(key)
+        if len(self._indexes) > self.size:
+            self._indexes.popitem(last=False)
+        return index
+
+    def resolve(self, collection, query, where=None):
+        """
+        Finds what a typed name refers to.
+        :param collection: The objects to search, each with a 'name'.
+        :param where: An optional test the object must pass (e.g. a node's verb).
+        :return: A tuple of (object or None, names). The object is None if nothing
+                 matches or if several different names match equally well; the
+                 names are then the choices.
+        """
+        rank, found = self.get(collection).matches(query, where)
+        if not found:
+            return None, []
+        names = list(dict.fromkeys(obj.name for obj in found))
+        if len(names) > 1:
+            return None, names
+        return found[0], names
+
+# A global instance to be used throughout the game
+name_indexes = NameIndexCache()
+
+
+def find_by_name(collection, query, where=None):
+    """
+    Finds the object a player means by a name, or None.
+    If the name is ambiguous the choices are shown and AMBIGUOUS is returned.
+    """
+    match, names = name_indexes.resolve(collection, query, where)
+    if match is None and names:
+        print(f"Which do you mean: {', '.join(names)}?")
+        return AMBIGUOUS
+    return match
@@ -1,10 +1,23 @@
-import random
+from rng import random_streams, QUESTS
 from dialogue import DIALOGUE_TEMPLATES
+from record import Record
+from names import find_by_name, AMBIGUOUS
+from inventory import Inventory
+from shop import shop_engine, RESTOCK_INTERVAL
+from economy import regional_economy
 
-class NPC:
+quest_random = random_streams.get(QUESTS) # This module's random stream
+
+class NPC(Record):
     """
     Base class for Non-Player Characters in the game.
     """
+    __slots__ = ('name', 'description', 'dialogue', 'is_available', 'level', 'pickpocket_loot',
+                 'has_been_pickpocketed', 'personality', 'memory', 'schedule', 'faction',
+                 'dialogue_night', 'current_location_key')
+    # Schedules are part of the NPC's definition in world.py, not its saved state.
+    _record_exclude = ('schedule',)
+
     def __init__(self, name, description, dialogue="...", personality=None, faction=None):
         self.name = name
         self.description = description
@@ -20,6 +33,16 @@ class NPC:
         self.dialogue_night = None # Default to no special night dialogue
         self.current_location_key = None
 
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds an NPC from a saved record."""
+        npc = super().from_record(record)
+        npc.schedule = None
+        location_key = getattr(npc, 'current_location_key', None)
+        if isinstance(location_key, list): # JSON turns grid tuples into lists
+            npc.current_location_key = tuple(location_key)
+        return npc
+
     def record_interaction(self, interaction_type, turn_count, details=None):
         """Records an interaction in the NPC's memory."""
         self.memory.append({'type': interaction_type, 'turn': turn_count, 'details': details})
@@ -56,20 +79,36 @@ class NPC:
         else:
             mood = 'greeting_neutral'
         
-        template = random.choice(DIALOGUE_TEMPLATES[mood])
+        template = quest_random.choice(DIALOGUE_TEMPLATES[mood])
         return template.format(player_name=player.name)
 
 class Shopkeeper(NPC):
     """
     A shopkeeper NPC who can sell items.
     """
+    __slots__ = ('inventory', 'stock_levels', 'restock_interval', 'last_restock')
+
     def __init__(self, name, description, dialogue="Welcome to my shop!", personality=None, faction=None):
         super().__init__(name, description, dialogue, personality, faction)
-        self.inventory = [] # Items the shopkeeper has for sale
-
-    def add_item(self, item):
-        """Adds an item to the shopkeeper's inventory."""
-        self.inventory.append(item)
+        self.inventory = Inventory() # Items the shopkeeper has for sale
+        self.stock_levels = Inventory() # The stock the shopkeeper usually carries
+        self.restock_interval = RESTOCK_INTERVAL # Turns between restocks; 0 never restocks
+        self.last_restock = 0
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds a shopkeeper from a saved record."""
+        shop = super().from_record(record)
+        if 'stock_levels' not in record: # Older saves: the stock on hand becomes the usual stock
+            shop.stock_levels = record.get('inventory', [])
+            shop.restock_interval = RESTOCK_INTERVAL
+            shop.last_restock = 0
+        return shop
+
+    def add_item(self, item, count=1):
+        """Adds an item to the shopkeeper's inventory and usual stock."""
+        self.inventory.add(item, count)
+        self.stock_levels.add(item, count)
 
     def talk(self, player, game_state):
         """Handles dialogue with a shopkeeper."""
@@ -77,57 +116,84 @@ class Shopkeeper(NPC):
             print(f'"{self.name} has closed up for the night."')
             return
         print(f'"{self.generate_greeting(player)}"')
-        self.list_items()
+        self.list_items(player, game_state)
 
-    def list_items(self):
-        """Lists items available for sale."""
+    def list_items(self, player, game_state):
+        """Lists items available for sale, at the player's prices."""
+        shop_engine.restock(self, game_state['turn_count'])
         if not self.inventory:
             print(f"{self.name}: I have nothing for sale at the moment.")
             return
         print(f"{self.name}: I have these items for sale:")
-        for i, item in enumerate(self.inventory):
-            print(f"  {i+1}. {item.name} - {item.value} gold")
-        print("Type 'buy <item>' or 'sell <item>' to trade.")
-
-    def buy_item(self, player, item_identifier, game_state):
-        """Handles the player buying an item from the shopkeeper."""
+        for i, (item, count) in enumerate(self.inventory.stacks()):
+            stock = f" ({count} in stock)" if count > 1 else ""
+            print(f"  {i+1}. {item.name} - {shop_engine.price(self, player, item)} gold{stock}")
+        print("Type 'buy <item>' or 'sell <item>' to trade (e.g., 'buy 5 healing potion', 'sell all logs').")
+
+    def buy_item(self, player, item_identifier, game_state, count=1):
+        """
+        Handles the player buying an item from the shopkeeper.
+        :param count: How many to buy, or None for as many as there are.
+        """
         if not self.is_available:
             print(f'"{self.name} has closed up for the night."')
             return
 
-        item_to_buy = None
-        try:
-            # Try to get item by number
+        shop_engine.restock(self, game_state['turn_count'])
+        stacks = self.inventory.stacks()
+        if item_identifier.isdigit():
+            # Items can be bought by their number in the list
             item_index = int(item_identifier) - 1
-            if 0 <= item_index < len(self.inventory):
-                item_to_buy = self.inventory[item_index]
-        except ValueError:
-            # If not a number, try to get by name
-            for item in self.inventory:
-                if item.name.lower() == item_identifier.lower():
-                    item_to_buy = item
-                    break
+            item_to_buy = stacks[item_index][0] if 0 <= item_index < len(stacks) else None
+        else:
+            item_to_buy = find_by_name(self.inventory, item_identifier)
+            if item_to_buy is AMBIGUOUS:
+                return
 
         if not item_to_buy:
             print(f"{self.name}: I don't have '{item_identifier}' for sale.")
             return
 
-        if player.money >= item_to_buy.value:
-            player.money -= item_to_buy.value
-            player.inventory.append(item_to_buy)
-            self.inventory.remove(item_to_buy) # Remove from shop's inventory
-            self.record_interaction('trade', game_state['turn_count'], {'item': item_to_buy.name})
-            print(f"You bought the {item_to_buy.name} for {item_to_buy.value} gold.")
+        in_stock = self.inventory.count(item_to_buy)
+        if count is None:
+            count = in_stock
+        elif count > in_stock:
+            print(f"{self.name}: I only have {in_stock} {item_to_buy.name}.")
+            count = in_stock
+
+        total = shop_engine.total_price(self, player, item_to_buy, count)
+        if player.money < total:
+            # Each one costs a little more as the shelf empties
+            count = shop_engine.affordable(self, player, item_to_buy, player.money, count)
+            if not count:
+                price = shop_engine.price(self, player, item_to_buy)
+                print(f"{self.name}: You don't have enough gold for that. You need {price} gold.")
+                return
+            total = shop_engine.total_price(self, player, item_to_buy, count)
+            print(f"{self.name}: You can only afford {count}.")
+
+        player.money -= total
+        player.inventory.add(item_to_buy, count)
+        self.inventory.remove(item_to_buy, count) # Remove from shop's inventory
+        regional_economy.record_demand(self.current_location_key, item_to_buy.name, count)
+        self.record_interaction('trade', game_state['turn_count'], {'item': item_to_buy.name, 'count': count})
+        if count == 1:
+            print(f"You bought the {item_to_buy.name} for {total} gold.")
         else:
-            print(f"{self.name}: You don't have enough gold for that. You need {item_to_buy.value} gold.")
+            print(f"You bought {count}x {item_to_buy.name} for {total} gold.")
 
-    def sell_item(self, player, item_identifier, game_state):
-        """Handles the player selling an item to the shopkeeper."""
+    def sell_item(self, player, item_identifier, game_state, count=1):
+        """
+        Handles the player selling an item to the shopkeeper.
+        :param count: How many to sell, or None for all of them.
+        """
         if not self.is_available:
             print(f'"{self.name} has closed up for the night."')
             return
 
-        item_to_sell = next((item for item in player.inventory if item_identifier.lower() in item.name.lower()), None)
+        item_to_sell = find_by_name(player.inventory, item_identifier)
+        if item_to_sell is AMBIGUOUS:
+            return
 
         if not item_to_sell:
             print(f"You don't have a '{item_identifier}' to sell.")
@@ -137,15 +203,30 @@ class Shopkeeper(NPC):
             print(f"You cannot sell the {item_to_sell.name}; it seems important.")
             return
 
-        sell_price = item_to_sell.value // 2  # Shopkeepers buy for half price
+        shop_engine.restock(self, game_state['turn_count'])
+        carried = player.inventory.count(item_to_sell)
+        if count is None:
+            count = carried
+        elif count > carried:
+            print(f"You only have {carried} {item_to_sell.name}.")
+            count = carried
+
+        sell_price = shop_engine.total_price(self, player, item_to_sell, count, selling=True)
         player.money += sell_price
-        player.inventory.remove(item_to_sell)
-        self.add_item(item_to_sell) # Add to shop's inventory
-        print(f"You sell the {item_to_sell.name} for {sell_price} gold.")
+        player.inventory.remove(item_to_sell, count)
+        self.inventory.add(item_to_sell, count) # Add to shop's inventory, to be sold on
+        regional_economy.record_supply(self.current_location_key, item_to_sell.name, count)
+        if count == 1:
+            print(f"You sell the {item_to_sell.name} for {sell_price} gold.")
+        else:
+            print(f"You sell {count}x {item_to_sell.name} for {sell_price} gold.")
+
 class Banker(NPC):
     """
     A banker NPC who can store items and gold for the player.
     """
+    __slots__ = ()
+
     def __init__(self, name, description, dialogue="...", personality=None, faction=None):
         super().__init__(name, description, dialogue, personality, faction)
 
@@ -160,6 +241,8 @@ class Innkeeper(NPC):
     """
     An innkeeper NPC who offers a place to rest.
     """
+    __slots__ = ('rest_cost',)
+
     def __init__(self, name, description, dialogue, personality=None, faction=None):
         super().__init__(name, description, dialogue, personality, faction)
         self.rest_cost = 10
@@ -174,6 +257,8 @@ class Guard(NPC):
     """
     A guard NPC, typically found in jails or important locations.
     """
+    __slots__ = ()
+
     def __init__(self, name, description, dialogue, personality=None, faction=None):
         super().__init__(name, description, dialogue, personality, faction)
         self.is_available = True # Guards are always "available"
@@ -189,6 +274,8 @@ class QuestGiver(NPC):
     """
     An NPC who can give quests to the player.
     """
+    __slots__ = ('quests',)
+
     def __init__(self, name, description, quests, dialogue, personality=None, faction=None, dialogue_night=None):
         super().__init__(name, description, dialogue, personality, faction)
         self.quests = quests if isinstance(quests, list) else [quests]
@@ -261,6 +348,10 @@ class ProceduralQuestGiver(QuestGiver):
     """
     An NPC who can generate quests for the player from a set of templates.
     """
+    __slots__ = ('quest_generator', 'templates', 'offered_quest', 'reputation_quests')
+    # Blueprints are re-linked from the world definition when a save is loaded.
+    _record_exclude = QuestGiver._record_exclude + ('quest_generator', 'templates', 'reputation_quests')
+
     def __init__(self, name, description, dialogue, quest_generator, templates, quests=None, personality=None, faction=None, reputation_quests=None, dialogue_night=None):
         super().__init__(name, description, quests or [], dialogue, personality, faction, dialogue_night)
         self.quest_generator = quest_generator
@@ -303,7 +394,7 @@ class ProceduralQuestGiver(QuestGiver):
 
         # Generate a new procedural quest if one isn't currently offered
         is_hated = self.faction and self.faction in player.factions and player.factions[self.faction].get_standing() == "Hated"
-        template = self.reputation_quests.get(self.faction) if is_hated else random.choice(self.templates)
+        template = self.reputation_quests.get(self.faction) if is_hated else quest_random.choice(self.templates)
         
         if template:
             self.offered_quest = self.quest_generator.generate_quest(template, player.location)
@@ -0,0 +1,136 @@
+"""
+Multi-step crafting plans.
+
+Recipes chain together: Iron Ore is mined, smelted into Iron Bars at a
+forge, and the bars are smithed into an Iron Sword at an anvil. The planner
+walks that dependency graph from the recipe book and works out every step
+needed to make something, netted against what the player already carries,
+along with anything that can't be made or gathered and anything stopping
+the player (skills, tools, unknown recipes).
+
+The dependency order below each item never changes while the book doesn't,
+so it is memoized per item and shared between the plans that use it. Whole
+plans are cached too, keyed by the player's inventory version and skills, so
+asking again costs nothing until something changes.
+"""
+from collections import namedtuple, OrderedDict
+
+from crafting import recipe_book, CRAFTING_KINDS
+from names import find_by_name, AMBIGUOUS
+
+# One step of a plan: e.g. ('smelt', 'Iron Bar', 5, <Recipe>) or ('mine', 'Iron Vein', 5, <ResourceNode>)
+PlanStep = namedtuple('PlanStep', ['verb', 'name', 'count', 'source'])
+# A whole plan. `missing` maps item names that can't be made or gathered to how many are short;
+# `problems` lists what stops the player from following it.
+Plan = namedtuple('Plan', ['item', 'count', 'steps', 'missing', 'problems'])
+
+
+class CraftingPlanner:
+    """
+    Plans how to make items from the recipe book.
+    """
+    def __init__(self, book, cache_size=64):
+        self.book = book
+        self.cache_size = cache_size
+        self._orders = {}           # item name -> items it depends on, each after its ingredients
+        self._plans = OrderedDict()  # cache key -> Plan
+        self._revision = book.revision
+        self.last_request = None    # (item name, count) of the last plan shown, for 'make'
+
+    def _check_revision(self):
+        """Forgets everything memoized if the recipe book has changed."""
+        if self.book.revision != self._revision:
+            self._orders.clear()
+            self._plans.clear()
+            self._revision = self.book.revision
+
+    def recipe_for(self, item_name):
+        """Returns the recipe that makes an item, or None."""
+        recipes = self.book.by_output.get(item_name)
+        return recipes[0] if recipes else None
+
+    def order(self, item_name, visiting=None):
+        """
+        Returns every item a plan for item_name involves, each after its ingredients.
+        Memoized per item; an item's order is built from its ingredients' orders.
+        """
+        order = self._orders.get(item_name)
+        if order is not None:
+            return order
+        visiting = visiting or set()
+        if item_name in visiting:
+            raise ValueError(f"The recipes for {item_name} go round in a circle.")
+        visiting.add(item_name)
+        items = []
+        seen = set()
+        recipe = self.recipe_for(item_name)
+        for ingredient in (recipe.ingredients if recipe else ()):
+            for name in self.order(ingredient, visiting):
+                if name not in seen:
+                    seen.add(name)
+                    items.append(name)
+        items.append(item_name)
+        visiting.discard(item_name)
+        order = self._orders[item_name] = tuple(items)
+        return order
+
+    def find(self, query):
+        """Returns the name of the craftable item a player means, None, or names.AMBIGUOUS."""
+        recipe = find_by_name(self.book.recipes, query)
+        if recipe is None or recipe is AMBIGUOUS:
+            return recipe
+        return recipe.result.name
+
+    def plan(self, player, item_name, count=1):
+        """
+        Plans how to make `count` of an item.
+        :param item_name: The exact name of the item.
+        :return: A Plan.
+        """
+        self._check_revision()
+        key = (item_name, count, id(player.inventory), player.inventory.version, len(player.known_recipes),
+               tuple(skill.level for skill in player.skills.values()))
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+
+        demand = {item_name: count}
+        steps, missing, problems = [], {}, []
+        # Walk from the item down to raw materials, so every demand on an item is known before it is planned
+        for name in reversed(self.order(item_name)):
+            need = demand.get(name, 0)
+            if name != item_name:
+                need -= min(need, player.inventory.count(name)) # What's carried is used first
+            if not need:
+                continue
+            recipe = self.recipe_for(name)
+            if recipe:
+                kind = self.book.kind_of[recipe.name]
+                steps.append(PlanStep(CRAFTING_KINDS[kind].verb, recipe.name, need, recipe))
+                for ingredient, per_item in recipe.ingredients.items():
+                    demand[ingredient] = demand.get(ingredient, 0) + need * per_item
+                if CRAFTING_KINDS[kind].known_only and recipe not in player.known_recipes:
+                    problems.append(f"You don't know the recipe for {recipe.name}.")
+                if recipe.skill_req and player.skills[recipe.skill_req[0]].level < recipe.skill_req[1]:
+                    problems.append(f"{recipe.name} needs {recipe.skill_req[0]} level {recipe.skill_req[1]}.")
+                continue
+            nodes = self.book.sources.get(name)
+            if nodes:
+                node = nodes[0]
+                steps.append(PlanStep(node.verb, node.name, need, node))
+                if node.required_tool not in player.inventory:
+                    problems.append(f"You need a {node.required_tool} to {node.verb} {node.name}.")
+                if player.skills[node.skill].level < node.required_level:
+                    problems.append(f"{node.name} needs {node.skill} level {node.required_level}.")
+                continue
+            missing[name] = need
+
+        steps.reverse() # Raw materials first
+        plan = self._plans[key] = Plan(item_name, count, steps, missing, problems)
+        if len(self._plans) > self.cache_size:
+            self._plans.popitem(last=False)
+        return plan
+
+# A global instance to be used throughout the game
+crafting_planner = CraftingPlanner(recipe_book)
@@ -4,20 +4,26 @@ from ability import Ability
 from skill import Skill
 from faction import Faction
 from ui import print_bordered
+from inventory import Inventory
+from bank import Bank
 
 class Player(Character):
     """Represents the player character in the game."""
+    __slots__ = ('location', 'inventory', 'weapon', 'armor', 'active_quests', 'completed_quests',
+                 'known_recipes', 'last_npc_talked_to', 'bank_items', 'factions', 'bank_gold',
+                 'skills_affected_this_turn', 'skills', 'jail_time_remaining', 'max_words_to_bind')
+
     def __init__(self, name, location=(1, 1), health=100, attack_power=10, defense=5):
         super().__init__(name, health, attack_power, defense)
         self.location = location
-        self.inventory = []
+        self.inventory = Inventory()
         self.weapon = None
         self.armor = None
         self.active_quests = []
         self.completed_quests = []
         self.known_recipes = []
         self.last_npc_talked_to = None
-        self.bank_items = []
+        self.bank_items = Bank()
         self.factions = {} # To store player's standing with different factions
         self.bank_gold = 0
         self.money = 25
@@ -47,10 +53,25 @@ class Player(Character):
         firebolt = Ability("Firebolt", "Hurls a small bolt of fire at the enemy.", mana_cost=5, effect={'type': 'damage', 'amount': 20})
         self.abilities.append(firebolt)
 
-    def add_skill_xp(self, skill_name, amount):
+    def to_record(self):
+        """Returns the player's saved state."""
+        record = super().to_record()
+        record['skills_affected_this_turn'] = list(self.skills_affected_this_turn)
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds the player from a saved record."""
+        player = super().from_record(record)
+        player.skills_affected_this_turn = set(record.get('skills_affected_this_turn', ()))
+        if isinstance(player.location, list): # JSON turns grid tuples into lists
+            player.location = tuple(player.location)
+        return player
+
+    def add_skill_xp(self, skill_name, amount, announce=True):
         """Adds XP to a specific skill and handles leveling up."""
         if skill_name in self.skills:
-            self.skills[skill_name].add_xp(amount, self)
+            self.skills[skill_name].add_xp(amount, self, announce)
             self.skills_affected_this_turn.add(skill_name)
         else:
             print(f"Warning: Attempted to add XP to an unknown skill '{skill_name}'.")
@@ -88,9 +109,9 @@ class Player(Character):
 
     @property
     def attack_power(self):
-        """Calculates total attack power including weapon bonus."""
+        """Calculates total attack power including weapon bonus and status effects."""
         bonus = self.weapon.attack_bonus if self.weapon else 0
-        return self.base_attack + bonus
+        return super().attack_power + bonus
 
     @property
     def defense(self):
@@ -39,8 +39,7 @@ class Quest:
         elif obj_type == 'fetch':
             item_name = self.objective.get('target')
             required_count = self.objective.get('count', 1)
-            current_count = sum(1 for item in player.inventory if item.name.lower() == item_name.lower())
-            if current_count >= required_count:
+            if player.inventory.count(item_name) >= required_count:
                 return True
         elif obj_type == 'activity':
             required_activities = self.objective.get('activities', {})
@@ -150,10 +149,7 @@ class Quest:
             if should_remove:
                 item_name = self.objective.get('target')
                 required_count = self.objective.get('count', 1)
-                for _ in range(required_count):
-                    item_to_remove = next((item for item in player.inventory if item.name.lower() == item_name.lower()), None)
-                    if item_to_remove:
-                        player.inventory.remove(item_to_remove)
+                player.inventory.take(item_name, required_count)
 
         self.is_completed = True
         if self in player.active_quests:
@@ -1,6 +1,8 @@
-import random
+from rng import random_streams, QUESTS
 from quest import Quest
 
+quest_random = random_streams.get(QUESTS) # This module's random stream
+
 class QuestTemplate:
     """A blueprint for generating procedural quests."""
     def __init__(self, name_format, description_format, objective_type, target_category, count=1, reward_gold=50, reward_xp=100, xp_skill="Combat", faction_reward=None):
@@ -39,7 +41,7 @@ class QuestGenerator:
             if not possible_targets:
                 return None # Cannot generate a quest for this category
 
-            target_monster_class = random.choice(possible_targets)
+            target_monster_class = quest_random.choice(possible_targets)
             target_monster_instance = target_monster_class()
             target_name = target_monster_instance.name
 
@@ -50,7 +52,7 @@ class QuestGenerator:
                     if target_monster_instance.name.lower() in [m.lower() for m in loc.get("enemies", [])]:
                         possible_locations.append(loc["name"])
             
-            location_name = random.choice(possible_locations) if possible_locations else "the nearby area"
+            location_name = quest_random.choice(possible_locations) if possible_locations else "the nearby area"
 
             # Format the quest details
             quest_name = template.name_format.format(monster_name=target_name)
@@ -76,7 +78,7 @@ class QuestGenerator:
             if not possible_locations:
                 return None # No suitable location found
 
-            target_location = random.choice(possible_locations)
+            target_location = quest_random.choice(possible_locations)
             quest_name = template.name_format.format(target=template.target_category, location_name=target_location['name'])
             quest_description = template.description_format.format(target=template.target_category, location_name=target_location['name'])
             objective = {'type': 'sabotage', 'target': template.target_category, 'location': target_location['name']}
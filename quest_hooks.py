@@ -47,7 +47,7 @@ def handle_securing_the_road_talk(player, npc, context):
 def handle_whispers_ledger_talk(player, npc, context):
     """Handles turning in the ledger for the 'Whispers Beneath the Ledger' quest."""
     quest = next((q for q in player.active_quests if q.name == "Whispers Beneath the Ledger"), None)
-    if not quest or not any(item.name == "Suspicious Ledger" for item in player.inventory):
+    if not quest or "Suspicious Ledger" not in player.inventory:
         return None
 
     turn_in_options = []
@@ -77,7 +77,7 @@ def handle_whispers_ledger_talk(player, npc, context):
                 chosen_option = turn_in_options[choice_index]
                 print("\nYou've made your choice. The ledger is no longer in your hands, but the consequences of your decision are just beginning.")
                 quest.complete(player, chosen_reward_option=chosen_option)
-                ledger_item = next((item for item in player.inventory if item.name == "Suspicious Ledger"), None)
+                ledger_item = player.inventory.get("Suspicious Ledger")
                 if ledger_item:
                     player.inventory.remove(ledger_item)
                 return True # Event handled
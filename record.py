@@ -0,0 +1,54 @@
+class Record:
+    """
+    A mixin for compact, slotted game objects.
+
+    Classes using it declare their attributes in `__slots__` instead of carrying
+    a per-instance `__dict__`, and are serialized through explicit
+    `to_record()` / `from_record()` calls rather than by copying `__dict__`.
+    """
+    __slots__ = ()
+
+    # Attribute names that are part of an object's definition rather than its
+    # state, and so are left out of saved records. Subclasses extend this.
+    _record_exclude = ()
+
+    @classmethod
+    def record_fields(cls):
+        """Returns the ordered tuple of attribute names saved for this class."""
+        fields = cls.__dict__.get('_record_fields')
+        if fields is None:
+            names = []
+            for klass in reversed(cls.__mro__):
+                slots = klass.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                for name in slots:
+                    if name not in ('__dict__', '__weakref__') and name not in names:
+                        names.append(name)
+            fields = tuple(name for name in names if name not in cls._record_exclude)
+            cls._record_fields = fields
+        return fields
+
+    def to_record(self):
+        """Returns a plain dictionary holding this object's saved state."""
+        record = {}
+        for name in self.record_fields():
+            try:
+                record[name] = getattr(self, name)
+            except AttributeError:
+                continue  # Slot was never assigned
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Rebuilds an object from a record without calling __init__.
+        Keys that are no longer attributes of the class (e.g. from an older
+        save file) are ignored.
+        """
+        obj = cls.__new__(cls)
+        fields = cls.record_fields()
+        for name, value in record.items():
+            if name in fields:
+                setattr(obj, name, value)
+        return obj
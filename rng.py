@@ -0,0 +1,94 @@
+"""
+Named, independently seeded random number streams.
+
+Each subsystem draws from its own random.Random, seeded from the session
+seed and the stream's name, so one subsystem drawing more numbers never
+changes what another one sees, and a whole session can be replayed from its
+seed. The streams' states are saved with the game.
+
+Stream objects live as long as the service: reseeding or loading a save
+updates them in place, so modules may keep a reference to one.
+Simulation workers take substreams, which are seeded from the session seed,
+the stream name and the worker's index, and are independent of each other
+and of the parent stream.
+"""
+import base64
+import hashlib
+import random
+
+COMBAT = "combat"       # Hits, blocks, flee rolls
+AI = "ai"               # Enemy decisions
+WORLDGEN = "worldgen"   # Dungeons and respawns
+LOOT = "loot"           # Drops and chest contents
+RENDER = "render"       # Viewport art placement
+QUESTS = "quests"       # Generated quests and dialogue
+WORLD = "world"         # Off-screen simulation, roaming monsters, faction events
+THIEVING = "thieving"   # Pickpocketing, lockpicking and bribes
+
+STREAMS = (COMBAT, AI, WORLDGEN, LOOT, RENDER, QUESTS, WORLD, THIEVING)
+
+
+def derive_seed(seed, *path):
+    """Returns a 64-bit seed derived from a base seed and a path of names or numbers."""
+    key = "/".join(str(part) for part in (seed,) + path).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "little")
+
+
+def _pack(state):
+    version, internal, gauss_next = state
+    data = b"".join(value.to_bytes(4, "little") for value in internal)
+    return {"version": version, "state": base64.b64encode(data).decode("ascii"), "gauss_next": gauss_next}
+
+
+def _unpack(packed):
+    data = base64.b64decode(packed["state"])
+    internal = tuple(int.from_bytes(data[i:i + 4], "little") for i in range(0, len(data), 4))
+    return (packed["version"], internal, packed["gauss_next"])
+
+
+class RandomStreams:
+    """
+    The per-session random number service.
+    """
+    def __init__(self, seed=None):
+        self._streams = {name: random.Random() for name in STREAMS}
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """
+        Starts every stream over from a session seed.
+        :param seed: An integer, or None for a fresh random seed.
+        """
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**63)
+        for name, stream in self._streams.items():
+            stream.seed(derive_seed(self.seed, name))
+
+    def get(self, name):
+        """Returns the stream with a given name, creating it if needed."""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = random.Random(derive_seed(self.seed, name))
+        return stream
+
+    def substream(self, name, index):
+        """Returns a new, independent generator for worker `index` of a stream."""
+        return random.Random(derive_seed(self.seed, name, index))
+
+    def get_state(self):
+        """Returns the session seed and every stream's position, for saving."""
+        return {"seed": self.seed, "streams": {name: _pack(stream.getstate()) for name, stream in self._streams.items()}}
+
+    def load_state(self, state):
+        """
+        Restores saved streams. Saves from before streams existed get a fresh seed.
+        :param state: A dictionary from get_state(), or None.
+        """
+        if not state:
+            self.reseed()
+            return
+        self.reseed(state["seed"])
+        for name, packed in state.get("streams", {}).items():
+            self.get(name).setstate(_unpack(packed))
+
+# A global instance to be used throughout the game
+random_streams = RandomStreams()
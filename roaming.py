@@ -0,0 +1,242 @@
+from array import array
+
+import numpy as np
+
+from rng import random_streams, WORLD
+
+world_random = random_streams.get(WORLD) # This module's random stream
+
+# Roaming species, keyed by their monster_mapping name.
+# biomes: how strongly a group is drawn to each world_data tile type (0 or
+#         missing means the group never enters that kind of tile).
+# night_biomes: optional preferences that replace biomes at night.
+# activity: chance per turn that a group moves, by time of day.
+# group: the smallest and largest group size.
+ROAMING_SPECIES = {
+    "wild_boar": {
+        "biomes": {"forest": 3, "forest_edge": 4, "plains": 2, "hills": 1},
+        "activity": {"Day": 0.5, "Night": 0.2}, "group": (2, 4),
+    },
+    "shadow-marked wolf": {
+        "biomes": {"forest": 4, "forest_edge": 2, "hills": 2, "mountains": 1},
+        "night_biomes": {"forest": 2, "forest_edge": 3, "hills": 2, "plains": 3},
+        "activity": {"Day": 0.1, "Night": 0.7}, "group": (2, 5),
+    },
+    "giant_spider": {
+        "biomes": {"forest": 4, "swamp": 3, "ruins": 2},
+        "activity": {"Day": 0.1, "Night": 0.5}, "group": (1, 3),
+    },
+    "bandit": {
+        "biomes": {"plains": 3, "forest_edge": 2, "hills": 2, "camp": 4},
+        "activity": {"Day": 0.6, "Night": 0.3}, "group": (2, 4),
+    },
+    "giant_eagle": {
+        "biomes": {"mountains": 4, "hills": 3},
+        "activity": {"Day": 0.7, "Night": 0.05}, "group": (1, 2),
+    },
+    "troll": {
+        "biomes": {"hills": 2, "mountains": 3, "swamp": 1},
+        "activity": {"Day": 0.05, "Night": 0.4}, "group": (1, 1),
+    },
+}
+
+
+class RoamingMonsters:
+    """
+    Monster groups that wander the world grid.
+
+    Groups are stored as parallel arrays (species, tile, size) rather than as
+    Monster objects. Move tables of every tile's neighbours and cumulative
+    weights are precomputed for each species and time of day as NumPy arrays,
+    so each turn all groups are stepped at once: one gather of their tables,
+    one batch of activity rolls and one batch of weighted draws. Monster
+    objects are only created for the tiles the player can see; they stay put
+    while their group does, and kills made there are written back to the
+    group sizes.
+    """
+    TILES_PER_GROUP = 40  # One group of a species per this many tiles it can live on
+    REGROUP_CHANCE = 0.02 # Chance per turn that a species below strength gains a new group
+    MAX_STEPS = 50        # Most turns simulated in one step() call; longer waits are capped
+
+    def __init__(self, species):
+        self.species = species
+        self.names = list(species)
+        self.group_species = array('H')
+        self.group_tile = array('I')
+        self.group_size = array('H')
+        self._grid = None
+        self._cols = 0
+        self._neighbours = None # tile -> its up to 4 neighbours, padded with the tile itself
+        self._tables = {}       # time of day -> (cumulative weights by species, tile and neighbour, activity by species)
+        self._habitat = []      # species index -> list of tiles it can live on
+        self._observed = {}     # tile -> list of (monster, group index) currently in that tile's monster list
+
+    def attach(self, world_state, state=None):
+        """Builds the move tables for a world grid and restores or populates the groups."""
+        grid = world_state["grid"]
+        self._grid = grid
+        self._cols = len(grid[0])
+        self._observed = {}
+        tile_types = [location.get("type") for row in grid for location in row]
+        rows, cols = len(grid), self._cols
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        neighbours, valid = [], []
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            inside = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+            neighbours.append(np.where(inside, nr * cols + nc, r * cols + c))
+            valid.append(inside)
+        self._neighbours = np.stack(neighbours, axis=1)
+        valid = np.stack(valid, axis=1)
+
+        # A neighbour a species can't enter has weight 0, so it is never drawn.
+        cumulative, activity = {}, {}
+        self._habitat = []
+        for name in self.names:
+            spec = self.species[name]
+            habitat = np.zeros(rows * cols, dtype=bool)
+            for time_of_day in ("Day", "Night"):
+                biomes = spec.get("night_biomes", spec["biomes"]) if time_of_day == "Night" else spec["biomes"]
+                weights = np.array([biomes.get(tile_type, 0) for tile_type in tile_types], dtype=float)
+                habitat |= weights > 0
+                cumulative.setdefault(time_of_day, []).append(np.cumsum(np.where(valid, weights[self._neighbours], 0.0), axis=1))
+                activity.setdefault(time_of_day, []).append(spec["activity"].get(time_of_day, 0.0))
+            self._habitat.append(np.flatnonzero(habitat).tolist())
+        self._tables = {time_of_day: (np.array(cumulative[time_of_day]), np.array(activity[time_of_day]))
+                        for time_of_day in cumulative}
+
+        if state:
+            # Groups are saved by species name; any species no longer defined are dropped.
+            index_of = {name: index for index, name in enumerate(self.names)}
+            groups = [g for g in zip(state["species"], state["tiles"], state["sizes"]) if g[0] in index_of]
+            self.group_species = array('H', (index_of[name] for name, _, _ in groups))
+            self.group_tile = array('I', (tile for _, tile, _ in groups))
+            self.group_size = array('H', (size for _, _, size in groups))
+        else:
+            self.group_species, self.group_tile, self.group_size = array('H'), array('I'), array('H')
+            for index in range(len(self.names)):
+                for _ in range(len(self._habitat[index]) // self.TILES_PER_GROUP):
+                    self._add_group(index)
+
+    def _add_group(self, index):
+        habitat = self._habitat[index]
+        if habitat:
+            self.group_species.append(index)
+            self.group_tile.append(world_random.choice(habitat))
+            self.group_size.append(world_random.randint(*self.species[self.names[index]]["group"]))
+
+    def step(self, world_state, game_state, turns=1):
+        """Moves every group for a number of turns and refreshes the observed tiles."""
+        if self._grid is not world_state["grid"]:
+            self.attach(world_state)
+        self._collect_kills()
+        cumulative, activity = self._tables[game_state["time_of_day"]]
+        # The batch draws come from a generator seeded off the world stream, so saved games replay the same moves.
+        rng = np.random.default_rng(world_random.getrandbits(64))
+        species = np.asarray(self.group_species, dtype=np.intp)
+        tiles = np.asarray(self.group_tile, dtype=np.intp)
+        chance = activity[species]
+        last = self._neighbours.shape[1] - 1
+
+        for _ in range(min(turns, self.MAX_STEPS)):
+            cum = cumulative[species, tiles]
+            total = cum[:, last]
+            # The neighbour drawn is the first whose cumulative weight is above the draw
+            choice = np.minimum((cum <= (rng.random(len(tiles)) * total)[:, None]).sum(axis=1), last)
+            moves = (rng.random(len(tiles)) < chance) & (total > 0)
+            tiles = np.where(moves, self._neighbours[tiles, choice], tiles)
+        self.group_tile = array('I', tiles.tolist())
+        rand = world_random.random
+
+        # Bring species that have lost groups back up to strength over time.
+        counts = [0] * len(self.names)
+        for species in self.group_species:
+            counts[species] += 1
+        for index, count in enumerate(counts):
+            if count < len(self._habitat[index]) // self.TILES_PER_GROUP and rand() < self.REGROUP_CHANCE * turns:
+                self._add_group(index)
+
+        for tile in list(self._observed):
+            self._materialize(tile)
+
+    def observe(self, world_state, location_key):
+        """
+        Makes the roaming monsters on a tile present in its monster list.
+        Other tiles observed before are cleared, so only the player's tile holds roaming monsters.
+        """
+        if self._grid is not world_state["grid"]:
+            self.attach(world_state)
+        self._collect_kills()
+        tile = None
+        if isinstance(location_key, tuple):
+            r, c = location_key
+            tile = r * self._cols + c
+        for other in list(self._observed):
+            if other != tile:
+                self._clear(other)
+        if tile is not None:
+            self._materialize(tile)
+
+    def _collect_kills(self):
+        """Shrinks groups whose materialized monsters were killed, dropping empty groups."""
+        killed = False
+        for placed in self._observed.values():
+            for monster, group in placed:
+                if not monster.is_alive() and self.group_size[group] > 0:
+                    self.group_size[group] -= 1
+                    killed = True
+        if not killed:
+            return
+        alive = [g for g, size in enumerate(self.group_size) if size > 0]
+        self.group_species = array('H', (self.group_species[g] for g in alive))
+        self.group_tile = array('I', (self.group_tile[g] for g in alive))
+        self.group_size = array('H', (self.group_size[g] for g in alive))
+        # Survivors stay on their tiles, renumbered to their group's new index.
+        new_index = {g: i for i, g in enumerate(alive)}
+        for tile, placed in list(self._observed.items()):
+            survivors = [(monster, new_index[group]) for monster, group in placed if monster.is_alive() and group in new_index]
+            self._clear(tile)
+            location = self._grid[tile // self._cols][tile % self._cols]
+            location.setdefault("monsters", []).extend(monster for monster, _ in survivors)
+            self._observed[tile] = survivors
+
+    def _clear(self, tile):
+        placed = self._observed.pop(tile, [])
+        if placed:
+            location = self._grid[tile // self._cols][tile % self._cols]
+            ids = {id(monster) for monster, _ in placed}
+            location["monsters"] = [m for m in location.get("monsters", []) if id(m) not in ids]
+
+    def _materialize(self, tile):
+        """
+        Rebuilds the roaming part of one tile's monster list from the group arrays.
+        Groups that were already here keep their monsters, wounds and all.
+        """
+        from world import monster_mapping # Import here to avoid circular dependency issues
+        kept = {}
+        for monster, group in self._observed.get(tile, []):
+            kept.setdefault(group, []).append(monster)
+        self._clear(tile)
+        location = self._grid[tile // self._cols][tile % self._cols]
+        placed = []
+        for group, group_tile in enumerate(self.group_tile):
+            if group_tile == tile:
+                size = self.group_size[group]
+                monsters = kept.get(group, [])[:size]
+                monster_class = monster_mapping[self.names[self.group_species[group]]]
+                monsters += [monster_class() for _ in range(size - len(monsters))]
+                placed.extend((monster, group) for monster in monsters)
+        location.setdefault("monsters", []).extend(monster for monster, _ in placed)
+        self._observed[tile] = placed
+
+    def get_state(self):
+        """Returns the groups for saving."""
+        self._collect_kills()
+        return {"species": [self.names[index] for index in self.group_species], "tiles": list(self.group_tile), "sizes": list(self.group_size)}
+
+    def load_state(self, state, world_state):
+        """Restores saved groups onto a loaded world, or populates it afresh if there are none."""
+        self.attach(world_state, state if state and state.get("species") else None)
+
+
+# A global instance to be used throughout the game
+roaming_monsters = RoamingMonsters(ROAMING_SPECIES)
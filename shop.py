@@ -0,0 +1,134 @@
+"""
+Shop stock and prices.
+
+Every Shopkeeper keeps a stock ledger: the usual stock it carries
+(`stock_levels`) next to what it has right now (`inventory`). Shops restock
+on a schedule, bringing each item back towards its usual level and selling
+on surplus bought from players. Restocking is caught up lazily whenever a
+shop is visited, so shops nobody visits cost nothing.
+
+An item's price depends on its value, the player's standing with the shop's
+faction, how well stocked the shop is, and the regional market price
+published by the economy (economy.py). Each unit of a bulk trade is
+priced at the stock level it leaves or arrives at, so buying twenty at once
+costs the same as buying them one by one.
+
+For each combination of those inputs, the price at every stock level is
+worked out in one NumPy pass and kept as running totals, so a trade of any
+size costs two lookups. Tables are only rebuilt when an input changes, or
+when a trade reaches a stock level beyond the table.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from economy import regional_economy
+
+# Faction standing -> (multiplier of an item's value when buying, when selling)
+STANDING_PRICES = {
+    "Honored": (0.8, 0.6),
+    "Friendly": (0.9, 0.55),
+    "Neutral": (1.0, 0.5),
+    "Unfriendly": (1.2, 0.4),
+    "Hated": (1.5, 0.3),
+}
+
+SUPPLY_EFFECT = 0.3 # How far prices rise when sold out, or fall when overstocked
+RESTOCK_INTERVAL = 12 # Turns between restocks of a shop, unless it has its own schedule
+RESTOCK_AMOUNT = 1 # How many of each item a restock brings back (or sells on)
+
+
+class ShopEngine:
+    """
+    Restocks shops and prices their goods.
+    """
+    def __init__(self, cache_size=1024):
+        self.cache_size = cache_size
+        self._totals = OrderedDict() # (value, rate, usual stock, market factor, selling) -> running price totals
+
+    def restock(self, shop, turn):
+        """
+        Catches a shop's stock up to the current turn.
+        Each restock moves every item one step towards its usual level.
+        """
+        if not shop.restock_interval:
+            return
+        periods = (turn - shop.last_restock) // shop.restock_interval
+        if periods <= 0:
+            return
+        shop.last_restock += periods * shop.restock_interval
+        amount = periods * RESTOCK_AMOUNT
+        for item, usual in shop.stock_levels.stacks():
+            have = shop.inventory.count(item)
+            if have < usual:
+                shop.inventory.add(item, min(usual - have, amount))
+        for item, have in shop.inventory.stacks():
+            usual = shop.stock_levels.count(item)
+            if have > usual:
+                shop.inventory.remove(item, min(have - usual, amount))
+
+    def standing(self, player, shop):
+        """Returns the player's standing with a shop's faction."""
+        faction = player.factions.get(shop.faction) if shop.faction else None
+        return faction.get_standing() if faction else "Neutral"
+
+    def _price_totals(self, shop, player, item, selling, levels):
+        """
+        Returns an array whose entry `s` is the sum of the prices of one unit at
+        each stock level below `s`, covering at least `levels` stock levels.
+        """
+        buy_rate, sell_rate = STANDING_PRICES[self.standing(player, shop)]
+        rate = sell_rate if selling else buy_rate
+        usual = shop.stock_levels.count(item)
+        market = float(regional_economy.price_factor(shop.current_location_key, item.name))
+        key = (item.value, rate, usual, market, selling)
+        totals = self._totals.get(key)
+        if totals is not None and len(totals) > levels:
+            self._totals.move_to_end(key)
+            return totals
+
+        stock = np.arange(max(levels, 2 * (usual + 1), 2 * (len(totals) if totals is not None else 0)))
+        # Scarce goods cost more and plentiful ones less, between 1 - SUPPLY_EFFECT and 1 + SUPPLY_EFFECT
+        supply = 1 + SUPPLY_EFFECT * (usual - stock) / np.maximum(np.maximum(usual, stock), 1)
+        if item.value:
+            prices = item.value * rate * supply * market
+            # Anything of value is bought and sold for at least 1 gold
+            prices = np.maximum(1, np.floor(prices) if selling else np.round(prices)).astype(np.int64)
+        else:
+            prices = np.zeros(len(stock), dtype=np.int64)
+        totals = self._totals[key] = np.concatenate(([0], np.cumsum(prices)))
+        self._totals.move_to_end(key)
+        if len(self._totals) > self.cache_size:
+            self._totals.popitem(last=False)
+        return totals
+
+    def total_price(self, shop, player, item, count, selling=False):
+        """
+        Returns what a number of an item cost at a shop, or what the shop pays
+        for them if `selling`. Every unit is priced at the stock the shop has
+        when it changes hands, so a bulk trade costs the same as the single
+        trades it replaces.
+        """
+        have = shop.inventory.count(item)
+        if selling:
+            totals = self._price_totals(shop, player, item, True, have + count)
+            return int(totals[have + count] - totals[have])
+        count = min(count, have)
+        totals = self._price_totals(shop, player, item, False, have + 1)
+        return int(totals[have + 1] - totals[have + 1 - count])
+
+    def affordable(self, shop, player, item, money, count):
+        """Returns how many of an item, up to `count`, can be bought at a shop with some money."""
+        have = shop.inventory.count(item)
+        count = min(count, have)
+        totals = self._price_totals(shop, player, item, False, have + 1)
+        # Buying c units costs totals[have + 1] - totals[have + 1 - c]
+        first = int(np.searchsorted(totals, totals[have + 1] - money))
+        return have + 1 - max(first, have + 1 - count)
+
+    def price(self, shop, player, item, selling=False):
+        """Returns what one of an item costs at a shop, or what the shop pays for it if `selling`."""
+        return self.total_price(shop, player, item, 1, selling)
+
+# A global instance to be used throughout the game
+shop_engine = ShopEngine()
@@ -1,83 +1,103 @@
-import math
+from bisect import bisect_right
+from collections import namedtuple
+from record import Record
 
-def _calculate_total_xp_for_level(level):
+MAX_LEVEL = 99 # Skills stop levelling here
+
+def _build_xp_table(max_level):
     """
-    Calculates the total XP needed to reach a specific level,
+    Builds the total XP needed to reach each level from 1 to max_level + 1,
     based on a formula inspired by OSRS.
     """
-    total_xp = 0
-    for l in range(1, level):
-        total_xp += math.floor(l + 300 * (2 ** (l / 7.0)))
-    return math.floor(total_xp / 4)
+    table = [0]
+    points = 0
+    for l in range(1, max_level + 1):
+        points += int(l + 300 * (2 ** (l / 7.0)))
+        table.append(points // 4)
+    return tuple(table)
+
+# XP_TABLE[level - 1] is the total XP needed to reach a level
+XP_TABLE = _build_xp_table(MAX_LEVEL)
+
+def _calculate_total_xp_for_level(level):
+    """Returns the total XP needed to reach a specific level."""
+    return XP_TABLE[min(max(level, 1), MAX_LEVEL + 1) - 1]
+
+def level_for_xp(xp):
+    """Returns the level a total amount of XP reaches."""
+    return min(bisect_right(XP_TABLE, xp), MAX_LEVEL)
 
-class Skill:
+# What levelling a skill does for the player
+LevelUpEffect = namedtuple('LevelUpEffect', [
+    'bonuses',  # Player attribute -> amount added per level
+    'refill',   # Attributes refilled afterwards, e.g. ('health', 'max_health')
+    'every',    # Only levels divisible by this count
+    'message',  # Shown after levelling; formatted with {player}, or None
+], defaults=({}, (), 1, None))
+
+LEVEL_UP_EFFECTS = {
+    "Combat": LevelUpEffect({'max_health': 10, 'base_attack': 2, 'base_defense': 1}, (('health', 'max_health'),),
+                            message="Max HP, Base Attack, and Base Defense increased."), # Full heal on level up
+    "Attack": LevelUpEffect({'base_attack': 1}, message="Your Base Attack has increased to {player.base_attack}."),
+    "Defense": LevelUpEffect({'base_defense': 1, 'max_health': 10}, (('health', 'max_health'),),
+                             message="Your Base Defense has increased to {player.base_defense} and your Max HP is now {player.max_health}!"),
+    "Agility": LevelUpEffect(message="You feel more nimble and quick on your feet."),
+    "Magic": LevelUpEffect({'max_mana': 10}, (('mana', 'max_mana'),), message="Max Mana increased."),
+    # Increase word slots every 5 levels
+    "Wordbinding": LevelUpEffect({'max_words_to_bind': 1}, every=5,
+                                 message="You can now bind {player.max_words_to_bind} words at once!"),
+    "Mining": LevelUpEffect(message="You feel more confident with a pickaxe in your hands."),
+    "Smelting": LevelUpEffect(message="You feel more adept at working the forge."),
+    "Smithing": LevelUpEffect(message="Your hands feel more steady at the anvil."),
+    "Thieving": LevelUpEffect(message="Your fingers feel more nimble."),
+    "Woodcutting": LevelUpEffect(message="Your grip on the axe feels stronger."),
+    "Fishing": LevelUpEffect(message="You feel a deeper connection to the waters."),
+    "Cooking": LevelUpEffect(message="You feel more comfortable around a cooking fire."),
+    "Herblore": LevelUpEffect(message="You feel more attuned to the properties of plants."),
+    "Hunting": LevelUpEffect(message="You feel more adept at tracking and dispatching your prey."),
+}
+
+class Skill(Record):
     """Manages the state of a single skill for a character."""
+    __slots__ = ('name', 'level', 'xp', 'xp_to_next_level')
+
     def __init__(self, name, level=1, xp=0):
         self.name = name
         self.level = level
         self.xp = xp
         self.xp_to_next_level = _calculate_total_xp_for_level(self.level + 1)
 
-    def add_xp(self, amount, player):
-        """Adds XP to the skill and checks for level up."""
+    def add_xp(self, amount, player, announce=True):
+        """
+        Adds XP to the skill and checks for level up. Level-ups are always announced.
+        Any number of levels can be gained at once; the bonuses of every level are applied.
+        """
         if amount <= 0:
             return
-        
+
         self.xp += amount
-        print(f"You gain {amount} {self.name} XP.")
-        
-        while self.xp >= self.xp_to_next_level:
-            self._level_up(player)
+        if announce:
+            print(f"You gain {amount} {self.name} XP.")
+
+        if self.xp >= self.xp_to_next_level and self.level < MAX_LEVEL:
+            self._level_up(player, level_for_xp(self.xp))
 
-    def _level_up(self, player):
-        """Handles leveling up the skill and applying bonuses to the player."""
-        self.level += 1
+    def _level_up(self, player, new_level):
+        """Raises the skill to a new level and applies the bonuses of each level gained."""
+        old_level, self.level = self.level, new_level
         self.xp_to_next_level = _calculate_total_xp_for_level(self.level + 1)
         print("\n" + "*" * 35)
         print(f"** Your {self.name} level has increased to {self.level}! **")
 
-        # Apply stat bonuses based on the skill
-        if self.name == "Combat":
-            player.max_health += 10
-            player.base_attack += 2
-            player.base_defense += 1
-            player.health = player.max_health  # Full heal on level up
-            print(f"Max HP, Base Attack, and Base Defense increased.")
-        elif self.name == "Attack":
-            player.base_attack += 1
-            print(f"Your Base Attack has increased to {player.base_attack}.")
-        elif self.name == "Defense":
-            player.base_defense += 1
-            player.max_health += 10
-            player.health = player.max_health # Heal on level up
-            print(f"Your Base Defense has increased to {player.base_defense} and your Max HP is now {player.max_health}!")
-        elif self.name == "Agility":
-            print("You feel more nimble and quick on your feet.")
-        elif self.name == "Magic":
-            player.max_mana += 10
-            player.mana = player.max_mana
-            print(f"Max Mana increased.")
-        elif self.name == "Wordbinding":
-            # Increase word slots every 5 levels
-            if self.level % 5 == 0:
-                player.max_words_to_bind += 1
-                print(f"You can now bind {player.max_words_to_bind} words at once!")
-        elif self.name == "Mining":
-            print("You feel more confident with a pickaxe in your hands.")
-        elif self.name == "Smelting":
-            print("You feel more adept at working the forge.")
-        elif self.name == "Smithing":
-            print("Your hands feel more steady at the anvil.")
-        elif self.name == "Thieving":
-            print("Your fingers feel more nimble.")
-        elif self.name == "Woodcutting":
-            print("Your grip on the axe feels stronger.")
-        elif self.name == "Fishing":
-            print("You feel a deeper connection to the waters.")
-        elif self.name == "Cooking":
-            print("You feel more comfortable around a cooking fire.")
-        elif self.name == "Herblore":
-            print("You feel more attuned to the properties of plants.")
-        elif self.name == "Hunting":
-            print("You feel more adept at tracking and dispatching your prey.")
-        print("*" * 35 + "\n")
\ No newline at end of file
+        effect = LEVEL_UP_EFFECTS.get(self.name)
+        if effect:
+            # How many of the levels gained earn the bonus
+            times = new_level // effect.every - old_level // effect.every
+            if times:
+                for attribute, amount in effect.bonuses.items():
+                    setattr(player, attribute, getattr(player, attribute) + amount * times)
+                for attribute, maximum in effect.refill:
+                    setattr(player, attribute, getattr(player, maximum))
+                if effect.message:
+                    print(effect.message.format(player=player))
+        print("*" * 35 + "\n")
@@ -0,0 +1,83 @@
+"""
+Weighted monster spawning for the world grid.
+
+Every tile spawns its listed 'enemies' (and 'night_enemies' at night), as
+placed in world_data.py. On top of that each tile rolls once on a spawn
+table built from its biome's wandering creatures and its own
+'rare_creatures', weighted by rarity tier, with a 'common' chance of nothing
+extra. Rare creatures that quests send the player to kill are not left to
+that roll; they spawn every time, like the listed enemies. Tables are compiled to alias tables once per kind of tile and cached,
+and roll_extra_spawns() samples a whole batch of tiles at once.
+"""
+import random
+
+from weighted import AliasTable
+
+# Biome ("type" in world_data.py) -> wandering creatures and their rarity
+BIOME_SPAWNS = {
+    "plains": [("wild_boar", "rare")],
+    "forest": [("giant_spider", "uncommon"), ("wild_boar", "rare")],
+    "forest_edge": [("wild_boar", "rare")],
+    "hills": [("bandit", "rare")],
+    "mountains": [("giant_eagle", "rare"), ("troll", "epic")],
+    "river": [("river_serpent", "rare")],
+    "swamp": [("giant_spider", "rare")],
+    "ash_plains": [("fire_spirit", "rare"), ("ashbound_cultist", "rare")],
+    "ruins": [("spectral_wolf", "epic")],
+}
+NOTHING_RARITY = "common"          # Weight of rolling no extra monster
+RARE_CREATURE_RARITY = "rare"      # Rarity of a tile's rare creatures
+QUEST_CREATURES = {                # Rare creatures that are quest kill targets, and so always spawn
+    "bandit_leader",               # Bandits on the Road
+}
+
+_table_cache = {}
+
+
+def spawn_table(location):
+    """Returns the compiled extra-spawn table for a location."""
+    from world import monster_mapping # Import here to avoid circular dependency issues
+    key = (location.get("type"), tuple(location.get("rare_creatures", ())))
+    table = _table_cache.get(key)
+    if table is None:
+        entries = [(None, NOTHING_RARITY)]
+        entries.extend(BIOME_SPAWNS.get(key[0], ()))
+        entries.extend((name, RARE_CREATURE_RARITY) for name in key[1] if name not in QUEST_CREATURES)
+        table = _table_cache[key] = AliasTable([(name, rarity) for name, rarity in entries
+                                                if name is None or name in monster_mapping])
+    return table
+
+
+def fixed_spawns(location, is_night):
+    """Returns the names of the monsters a location always spawns."""
+    names = list(location.get("enemies", []))
+    names.extend(name for name in location.get("rare_creatures", []) if name in QUEST_CREATURES)
+    if is_night:
+        names.extend(location.get("night_enemies", []))
+    return names
+
+
+def roll_extra_spawns(locations, rng=random):
+    """
+    Rolls the extra spawn of many locations, batching the draws per table.
+    :return: A list with a monster name or None for each location.
+    """
+    groups = {}
+    for i, location in enumerate(locations):
+        table = spawn_table(location)
+        groups.setdefault(id(table), (table, []))[1].append(i)
+    extras = [None] * len(locations)
+    for table, indexes in groups.values():
+        for i, name in zip(indexes, table.sample_many(len(indexes), rng)):
+            extras[i] = name
+    return extras
+
+
+def populate(locations, is_night, rng=random):
+    """Replaces the monsters of many locations with a fresh weighted spawn."""
+    from world import monster_mapping # Import here to avoid circular dependency issues
+    for location, extra in zip(locations, roll_extra_spawns(locations, rng)):
+        names = fixed_spawns(location, is_night)
+        if extra is not None:
+            names.append(extra)
+        location["monsters"] = [monster_mapping[name]() for name in names if name in monster_mapping]
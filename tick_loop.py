@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+import traceback
+
+
+class TickLoop:
+    """
+    Runs a tick function at a fixed rate on a background thread.
+
+    The simulation thread owns the game state: player commands are handed to
+    it through a queue and run between ticks, so no locking is needed and a
+    command never waits for more than the tick that is already running. When
+    the loop falls behind, it catches up with back-to-back ticks, handing
+    control back to waiting commands whenever a burst uses up its time
+    budget, and drops ticks it can no longer realistically make up.
+    """
+    def __init__(self, tick, tick_rate=1.0, tick_budget=None, max_catch_up=5):
+        """
+        :param tick: The function to call on every tick.
+        :param tick_rate: Ticks per second.
+        :param tick_budget: Seconds a burst of catch-up ticks may run before pending commands are served. Defaults to half a tick interval.
+        :param max_catch_up: The most overdue ticks to make up; anything further behind is skipped.
+        """
+        self.tick = tick
+        self.interval = 1.0 / tick_rate
+        self.tick_budget = tick_budget if tick_budget is not None else self.interval / 2
+        self.max_catch_up = max_catch_up
+        self.commands = queue.Queue()
+        self.ticks_run = 0
+        self.ticks_skipped = 0
+        self.tick_errors = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the simulation thread."""
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="tick-loop", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the simulation thread after the current tick or command."""
+        self._stopping.set()
+        self.commands.put(None) # Wakes the thread if it is waiting for work
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def submit(self, func, *args):
+        """
+        Runs a function on the simulation thread and waits for it to finish.
+        Returns the function's result, or re-raises its exception (including
+        SystemExit) in the calling thread.
+        :raises RuntimeError: If the simulation thread isn't running.
+        """
+        if not self._thread or not self._thread.is_alive():
+            raise RuntimeError("The tick loop is not running.")
+        done = threading.Event()
+        outcome = {}
+        self.commands.put((func, args, done, outcome))
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                raise RuntimeError("The tick loop stopped before running the command.")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def _run_command(self, command):
+        func, args, done, outcome = command
+        try:
+            outcome["result"] = func(*args)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    def _serve_commands(self, deadline):
+        """Runs queued commands until the deadline passes with the queue empty."""
+        while not self._stopping.is_set():
+            timeout = deadline - time.monotonic()
+            try:
+                command = self.commands.get(timeout=timeout) if timeout > 0 else self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command is not None:
+                self._run_command(command)
+
+    def _run_tick(self):
+        """Runs one tick. A failing tick is reported and the loop carries on."""
+        try:
+            self.tick()
+        except Exception:
+            self.tick_errors += 1
+            print("\n[Tick loop] A world tick failed:")
+            traceback.print_exc()
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            # Anything still queued will never run; don't leave its caller waiting
+            while True:
+                try:
+                    command = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command is not None:
+                    command[3]["error"] = RuntimeError("The tick loop stopped before running the command.")
+                    command[2].set()
+
+    def _loop(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stopping.is_set():
+            self._serve_commands(next_tick)
+            if self._stopping.is_set():
+                break
+
+            started = time.monotonic()
+            overdue = int((started - next_tick) / self.interval)
+            if overdue > self.max_catch_up:
+                skipped = overdue - self.max_catch_up
+                next_tick += skipped * self.interval
+                self.ticks_skipped += skipped
+
+            while next_tick <= time.monotonic():
+                self._run_tick()
+                self.ticks_run += 1
+                next_tick += self.interval
+                # Let waiting commands in; any remaining catch-up happens on the next pass.
+                if time.monotonic() - started >= self.tick_budget or not self.commands.empty():
+                    break
@@ -1,5 +1,8 @@
 import os
-import random
+
+from rng import random_streams, RENDER
+
+render_random = random_streams.get(RENDER) # This module's random stream
 
 # --- Constants ---
 VIEWPORT_WIDTH = 40
@@ -65,7 +68,7 @@ def generate_viewport(sprite_files):
             sprites_to_place.append({'filename': filename, 'lines': sprite_lines})
 
     # Randomize order to avoid placement bias
-    random.shuffle(sprites_to_place)
+    render_random.shuffle(sprites_to_place)
 
     for sprite_data in sprites_to_place:
         sprite_name = os.path.splitext(sprite_data['filename'])[0]
@@ -78,8 +81,8 @@ def generate_viewport(sprite_files):
         # Try to place the sprite without overlapping
         for _ in range(MAX_PLACEMENT_TRIES):
             # Determine random coordinates
-            rand_x = random.randint(0, VIEWPORT_WIDTH - sprite_width)
-            rand_y = random.randint(0, VIEWPORT_HEIGHT - sprite_height)
+            rand_x = render_random.randint(0, VIEWPORT_WIDTH - sprite_width)
+            rand_y = render_random.randint(0, VIEWPORT_HEIGHT - sprite_height)
 
             if not check_overlap(viewport, sprite_lines, rand_x, rand_y):
                 place_sprite(viewport, sprite_lines, rand_x, rand_y, color)
@@ -0,0 +1,114 @@
+"""
+Weighted random tables.
+
+An AliasTable is built once from (value, weight) entries with Walker's alias
+method, after which every draw costs one random number and O(1) work,
+however many entries the table has. Weights are numbers or the name of a
+rarity tier from RARITY_WEIGHTS. A value of None stands for "nothing", so a
+table can carry its own chance of coming up empty.
+
+LootTable rolls an AliasTable a number of times and drops the empty results.
+Both offer batch draws (sample_many() / roll_many()) for respawns and the
+simulation tools.
+"""
+import random
+
+# Relative weight of each rarity tier
+RARITY_WEIGHTS = {
+    'common': 100,
+    'uncommon': 40,
+    'rare': 10,
+    'epic': 3,
+    'legendary': 1,
+}
+
+
+def _weight(weight):
+    if isinstance(weight, str):
+        return RARITY_WEIGHTS[weight]
+    return weight
+
+
+class AliasTable:
+    """
+    A weighted table with O(1) sampling.
+    """
+    __slots__ = ('values', 'weights', '_prob', '_alias')
+
+    def __init__(self, entries):
+        """
+        Builds the table.
+        :param entries: A sequence of (value, weight) pairs. Weights are non-negative
+                        numbers or rarity tier names, and at least one must be positive.
+        """
+        self.values = [value for value, _ in entries]
+        self.weights = [_weight(weight) for _, weight in entries]
+        total = sum(self.weights)
+        if not self.values or total <= 0 or min(self.weights) < 0:
+            raise ValueError("A weighted table needs non-negative weights with a positive total.")
+
+        # Vose's variant of the alias method: split the entries into those below
+        # and above the average weight, then pair each small one with a large one.
+        n = len(self.values)
+        scaled = [weight * n / total for weight in self.weights]
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def __len__(self):
+        return len(self.values)
+
+    def probability(self, value):
+        """Returns the chance of drawing a value."""
+        return sum(w for v, w in zip(self.values, self.weights) if v == value) / sum(self.weights)
+
+    def sample(self, rng=random):
+        """Draws one value."""
+        u = rng.random() * len(self._prob)
+        i = int(u)
+        return self.values[i] if u - i < self._prob[i] else self.values[self._alias[i]]
+
+    def sample_many(self, count, rng=random):
+        """Draws `count` independent values as a list."""
+        n, prob, alias, values, draw = len(self._prob), self._prob, self._alias, self.values, rng.random
+        result = []
+        for _ in range(count):
+            u = draw() * n
+            i = int(u)
+            result.append(values[i] if u - i < prob[i] else values[alias[i]])
+        return result
+
+
+class LootTable:
+    """
+    Weighted drops: a number of rolls on an AliasTable, with None meaning no drop.
+    """
+    __slots__ = ('table', 'rolls')
+
+    def __init__(self, entries, rolls=1):
+        """
+        :param entries: (item, weight) pairs, as for AliasTable. Use (None, weight) for "nothing".
+        :param rolls: How many times to roll, or a (min, max) range rolled each time.
+        """
+        self.table = AliasTable(entries)
+        self.rolls = rolls
+
+    def _roll_count(self, rng):
+        if isinstance(self.rolls, tuple):
+            return rng.randint(*self.rolls)
+        return self.rolls
+
+    def roll(self, rng=random):
+        """Returns a list of dropped items."""
+        return [item for item in self.table.sample_many(self._roll_count(rng), rng) if item is not None]
+
+    def roll_many(self, count, rng=random):
+        """Rolls the table `count` times, returning a list of drop lists."""
+        return [self.roll(rng) for _ in range(count)]
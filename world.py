@@ -4,6 +4,7 @@ from npc import NPC, Shopkeeper, QuestGiver, Banker, Guard, ProceduralQuestGiver
 from quest import Quest
 from ability import heal_light, Ability
 from recipe import Recipe
+from crafting import recipe_book
 from faction import Faction
 from resource_node import ResourceNode
 from world_data import thalren_vale_map_25x25
@@ -68,6 +69,15 @@ herblore_recipes = [
     Recipe("Greater Healing Potion", {"Mystical Herb": 1}, greater_healing_potion, skill_req=("Herblore", 1))
 ]
 
+# Every recipe goes in the recipe book, including those only learned from scrolls,
+# along with the resource nodes that yield raw materials
+recipe_book.add_all(default_recipes + [recipe_sturdy_gloves, recipe_fine_boots], 'craft')
+recipe_book.add_all(smelting_recipes, 'smelt')
+recipe_book.add_all(cooking_recipes, 'cook')
+recipe_book.add_all(herblore_recipes, 'brew')
+for node in (tree, iron_vein, river_fishing_spot):
+    recipe_book.add_source(node)
+
 # --- Wordbinding Abilities & Combinations ---
 # Define the abilities that can be created
 fire_bolt_spell = Ability("Fire Bolt", "A focused bolt of pure fire.", mana_cost=5, effect={'type': 'damage', 'amount': 20})
@@ -525,11 +535,11 @@ merchant_boris = Shopkeeper(
 )
 merchant_boris.schedule = [(0, (13, 11)), (18, "drunken_griffin_inn")] # Starts at market, goes to inn at turn 18
 merchant_boris.current_location_key = (13, 11)
-merchant_boris.add_item(healing_potion)
-merchant_boris.add_item(pickaxe)
-merchant_boris.add_item(axe)
-merchant_boris.add_item(fishing_rod)
-merchant_boris.add_item(thread)
+merchant_boris.add_item(healing_potion, 10)
+merchant_boris.add_item(pickaxe, 2)
+merchant_boris.add_item(axe, 2)
+merchant_boris.add_item(fishing_rod, 2)
+merchant_boris.add_item(thread, 20)
 
 priestess_lyra = NPC(
     name="Priestess Lyra",
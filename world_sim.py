@@ -0,0 +1,141 @@
+import heapq
+from collections import Counter
+
+import spawning
+from rng import random_streams, WORLD
+
+world_random = random_streams.get(WORLD) # This module's random stream
+
+
+class SimulationSystem:
+    """
+    One kind of world activity that goes on whether or not the player is there.
+    A system must give the same expected outcome for one update of `turns`
+    turns as for `turns` updates of one turn each, so distant tiles can be
+    caught up in coarse batches.
+    """
+    def update_tile(self, location, turns, game_state):
+        """
+        Advances one grid location by a number of turns.
+        :param location: The location dictionary from the world grid.
+        :param turns: How many turns have passed since the location was last updated.
+        :param game_state: The global game state (time of day, turn count...).
+        """
+        raise NotImplementedError
+
+
+class MonsterRecovery(SimulationSystem):
+    """Wounded monsters heal and slain monsters are gradually replaced."""
+    regen_per_turn = 1         # Health a wounded monster regains each turn
+    repopulate_chance = 0.02   # Chance per turn that a missing monster returns
+
+    def update_tile(self, location, turns, game_state):
+        monsters = location.get("monsters")
+        if monsters is None:
+            return
+        for monster in monsters:
+            # The slain stay dead; they are replaced below instead.
+            if 0 < monster.health < monster.max_health:
+                monster.health = min(monster.max_health, monster.health + self.regen_per_turn * turns)
+
+        from world import monster_mapping # Import here to avoid circular dependency issues
+        spawn_names = spawning.fixed_spawns(location, game_state["time_of_day"] == "Night")
+        # A monster missing for `turns` turns has returned with probability
+        # 1 - (1 - p)^turns, the same as rolling p once per turn.
+        chance = 1.0 - (1.0 - self.repopulate_chance) ** turns
+        if world_random.random() < chance:
+            extra = spawning.spawn_table(location).sample(world_random) # A wandering or rare arrival
+            if extra is not None:
+                spawn_names.append(extra)
+        if not spawn_names:
+            return
+
+        present = Counter(type(monster) for monster in monsters if monster.is_alive())
+        for name in spawn_names:
+            monster_class = monster_mapping.get(name)
+            if monster_class is None:
+                continue
+            if present[monster_class] > 0:
+                present[monster_class] -= 1
+            elif world_random.random() < chance:
+                monsters.append(monster_class())
+
+
+class WorldSimulator:
+    """
+    Level-of-detail simulation of the world grid.
+
+    Tiles within NEAR_RADIUS of the focus (the player's location) are updated
+    on every call. The rest of the grid is split into square regions that are
+    caught up in batches once they are REGION_INTERVAL turns stale, most stale
+    first, until the call's tile budget is spent. Each tile remembers when it
+    was last updated, so a deferred region simply catches up more turns later.
+    """
+    NEAR_RADIUS = 2        # Tiles this far from the focus are simulated every turn
+    REGION_SIZE = 5        # Distant tiles are batched in REGION_SIZE x REGION_SIZE regions
+    REGION_INTERVAL = 10   # Turns between coarse updates of a distant region
+    TILE_BUDGET = 150      # Most tile updates performed by a single advance() call
+
+    def __init__(self, systems):
+        self.systems = list(systems)
+        self.focus = None
+        self._grid = None
+        self._last_turn = []       # [row][col] -> turn the tile was last updated
+        self._region_tiles = []    # region index -> list of (row, col)
+        self._region_queue = []    # heap of (last update turn, region index)
+
+    def register_system(self, system):
+        """Adds a simulation system to be run on every tile update."""
+        self.systems.append(system)
+
+    def set_focus(self, location_key):
+        """Sets the location around which the world is simulated in full detail."""
+        self.focus = location_key if isinstance(location_key, tuple) else None
+
+    def attach(self, world_state, turn):
+        """Builds the region layout for a world grid, treating every tile as up to date."""
+        grid = world_state["grid"]
+        self._grid = grid
+        self._last_turn = [[turn] * len(row) for row in grid]
+        regions = {}
+        for r, row in enumerate(grid):
+            for c in range(len(row)):
+                regions.setdefault((r // self.REGION_SIZE, c // self.REGION_SIZE), []).append((r, c))
+        self._region_tiles = list(regions.values())
+        self._region_queue = [(turn, index) for index in range(len(self._region_tiles))]
+        heapq.heapify(self._region_queue)
+
+    def _update(self, r, c, turn, game_state):
+        turns = turn - self._last_turn[r][c]
+        if turns <= 0:
+            return 0
+        self._last_turn[r][c] = turn
+        location = self._grid[r][c]
+        for system in self.systems:
+            system.update_tile(location, turns, game_state)
+        return 1
+
+    def advance(self, world_state, game_state):
+        """Brings the near tiles, and as many stale regions as the budget allows, up to the current turn."""
+        if self._grid is not world_state["grid"]:
+            self.attach(world_state, game_state["turn_count"])
+        turn = game_state["turn_count"]
+        grid = self._grid
+        budget = self.TILE_BUDGET
+
+        if self.focus is not None:
+            fr, fc = self.focus
+            for r in range(max(0, fr - self.NEAR_RADIUS), min(len(grid), fr + self.NEAR_RADIUS + 1)):
+                for c in range(max(0, fc - self.NEAR_RADIUS), min(len(grid[r]), fc + self.NEAR_RADIUS + 1)):
+                    budget -= self._update(r, c, turn, game_state)
+
+        queue = self._region_queue
+        while queue and budget > 0 and queue[0][0] <= turn - self.REGION_INTERVAL:
+            _, index = heapq.heappop(queue)
+            for r, c in self._region_tiles[index]:
+                budget -= self._update(r, c, turn, game_state)
+            heapq.heappush(queue, (turn, index))
+
+
+# A global instance to be used throughout the game
+world_simulator = WorldSimulator([MonsterRecovery()])